@@ -1,7 +1,9 @@
 import json
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, current_app, request, jsonify, session
 from entity.processors.client.client_processor_new import ClientProcessorNew
-from utils.request import standard_json_response
+from entity.processors.client.parse_cache import ParseCache
+from entity.processors.timeline import paginate
+from utils.request import get_page_args, standard_json_response
 import traceback
 
 """
@@ -38,40 +40,55 @@ def upload_file():
         if file.filename and not allowed_file(file.filename):
             return None, -1, f'文件 {file.filename} 非日志文件，请勿上传'
     
+    # 直接把上传文件的二进制流交给解析器分块读取，不再整体读入内存
+    file_streams = [file.stream for file in files if file.filename]
+    return _parse_client_logs(file_streams)
+
+@client_bp.route('/upload_stream', methods=['POST'])
+@standard_json_response
+def upload_stream():
+    """
+    以请求体为日志内容的流式上传，适用于超大日志文件
+    请求体为原始日志字节，文件名通过 filename 参数传入
+    """
+    filename = request.args.get('filename', '')
+    if filename and not allowed_file(filename):
+        return None, -1, f'文件 {filename} 非日志文件，请勿上传'
+    return _parse_client_logs([request.stream])
+
+def _parse_client_logs(file_streams):
+    """
+    解析客户端日志二进制流并保存到session，同一份日志已解析过时直接读取解析缓存
+    """
     try:
-        # 合并所有文件内容
-        all_file_contents = []
-        for file in files:
-            if file.filename:  # 确保文件不为空
+        print('开始解析')
+        parse_cache = ParseCache(current_app.config['PARSE_CACHE_DIR'], current_app.config['PARSE_CACHE_MAX_BYTES'])
+        with parse_cache.prepare(file_streams) as (cache_key, file_streams):
+            clientreq = parse_cache.load(cache_key)
+            if clientreq is not None:
+                print('命中解析缓存')
+            else:
+                # 添加详细的错误处理
                 try:
-                    file_content = file.read().decode('gb2312', errors='ignore')  # 忽略无法解码的字符
-                    all_file_contents.append(file_content)
-                except UnicodeDecodeError as e:
-                    print(f"文件 {file.filename} 解码失败")
+                    clientreq = ClientProcessorNew(file_streams, isJupyter=False)
+                    print('ClientProcessorNew 实例化成功')
+                except Exception as e:
+                    print(f"ClientProcessorNew 实例化失败")
                     print("错误堆栈:")
                     print(traceback.format_exc())
-                    return None, -1, f'文件 {file.filename} 解析失败'
-        
-        print('开始解析')
-        
-        # 添加详细的错误处理
-        try:
-            clientreq = ClientProcessorNew(all_file_contents, isJupyter=False)
-            print('ClientProcessorNew 实例化成功')
-        except Exception as e:
-            print(f"ClientProcessorNew 实例化失败")
-            print("错误堆栈:")
-            print(traceback.format_exc())
-            return None, -1, f'处理器初始化失败: {str(e)}'
-        
-        try:
-            clientreq.parse()
-            print('解析完成')
-        except Exception as e:
-            print(f"解析过程失败")
-            print("错误堆栈:")
-            print(traceback.format_exc())
-            return None, -1, f'文件解析失败: {str(e)}'
+                    return None, -1, f'处理器初始化失败: {str(e)}'
+
+                try:
+                    clientreq.parse()
+                    print('解析完成')
+                except Exception as e:
+                    print(f"解析过程失败")
+                    print("错误堆栈:")
+                    print(traceback.format_exc())
+                    return None, -1, f'文件解析失败: {str(e)}'
+
+                # 后台写入缓存，响应不等待序列化；web模式下之后的请求使用session中的副本，不会再修改该处理器
+                parse_cache.store(cache_key, clientreq, background=True)
         
         session['clientPropcessor'] = clientreq
         print("解析完成", "解析失败日志行数:", len(clientreq.state.illegal_reqs))
@@ -91,7 +108,13 @@ def filter_log_list():
         content = request.args.get('content', "")
         start_time = request.args.get('startTime', "")
         end_time = request.args.get('endTime', "")
-        return clientreq.filter_log_list(content, start_time, end_time)
+        try:
+            page = get_page_args()
+            result = clientreq.filter_log_list(content, start_time, end_time)
+            # 指定了 offset、limit 或 cursor 时只返回一页，并附带总数和下一页的游标
+            return result if page is None else paginate(result, *page)
+        except ValueError as e:
+            return None, -1, str(e)
     else:
         return None, -1, '请先上传客户端全量日志'
 
@@ -104,6 +127,20 @@ def query_fetch_statistics():
     else:
         return None, -1, '请先上传客户端全量日志'
 
+@client_bp.route('/request_latency', methods=['GET'])
+@standard_json_response
+def get_request_latency():
+    """获取请求耗时分位数、耗时分布和最慢请求"""
+    clientreq = session.get('clientPropcessor')
+    if clientreq:
+        protocol = request.args.get('protocol', "")
+        servicename = request.args.get('servicename', "")
+        action = request.args.get('action', "")
+        top = request.args.get('top', 20, type=int)
+        return clientreq.get_request_latency(protocol, servicename, action, top)
+    else:
+        return None, -1, '请先上传客户端全量日志'
+
 @client_bp.route('/query_accounts_logs', methods=['GET'])
 @standard_json_response
 def query_accounts_logs():
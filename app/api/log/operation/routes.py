@@ -1,6 +1,7 @@
 from flask import Blueprint, request, session
 from entity.processors.operation.operation_processor import OperationProcessor
-from utils.request import standard_json_response
+from entity.processors.timeline import paginate
+from utils.request import get_page_args, standard_json_response
 import traceback
 
 """
@@ -87,6 +88,12 @@ def filter_log_list():
         content = request.args.get('content', "")
         start_time = request.args.get('startTime', "")
         end_time = request.args.get('endTime', "")
-        return operationProcessor.filter_log_list(content, start_time, end_time)
+        try:
+            page = get_page_args()
+            result = operationProcessor.filter_log_list(content, start_time, end_time)
+            # 指定了 offset、limit 或 cursor 时只返回一页，并附带总数和下一页的游标
+            return result if page is None else paginate(result, *page)
+        except ValueError as e:
+            return None, -1, str(e)
     else:
         return None, -1, '请先上传客户端操作日志'
@@ -1,7 +1,8 @@
-from flask import Blueprint, render_template, session
+from flask import Blueprint, render_template, request, session
 from .client.routes import client_bp
 from .operation.routes import operation_bp
-from utils.request import standard_json_response
+from entity.processors.timeline import merge_by_time, paginate
+from utils.request import get_page_args, standard_json_response, wants_stream
 
 log_bp = Blueprint('log', __name__, url_prefix='/log')
 
@@ -31,3 +32,28 @@ def status():
             "session_dir": session.get('_permanent', False)
         }
     }
+
+@log_bp.route('/timeline', methods=['GET'])
+@standard_json_response
+def timeline():
+    """
+    客户端全量日志与操作日志按时间交错合并后的日志列表，过滤和分页参数与各自的 filter_log_list 一致；
+    只上传了其中一种日志时只返回该日志
+    """
+    processors = [session.get('clientPropcessor'), session.get('operationProcessor')]
+    processors = [processor for processor in processors if processor]
+    if not processors:
+        return None, -1, '请先上传客户端全量日志或操作日志'
+    content = request.args.get('content', "")
+    start_time = request.args.get('startTime', "")
+    end_time = request.args.get('endTime', "")
+    try:
+        page = get_page_args()
+        # 各自过滤后的结果仍按时间排序，直接归并，时间相同时客户端日志在前
+        merged = merge_by_time(*(processor.filter_log_list(content, start_time, end_time) for processor in processors))
+        if page is None:
+            # 流式返回时边归并边输出
+            return merged if wants_stream() else list(merged)
+        return paginate(list(merged), *page)
+    except ValueError as e:
+        return None, -1, str(e)
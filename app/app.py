@@ -1,3 +1,4 @@
+import multiprocessing
 import os
 import sys
 
@@ -16,7 +17,8 @@ if sys.platform == 'win32':
 from flask import Flask, jsonify, send_from_directory, request
 from flask_session import Session
 from api.log.routes import log_bp
-from utils.request import CustomJSONEncoder
+from utils.request import CodecJSONProvider
+from utils.compression import compress_response
 import mimetypes
 from api.updates.routes import updates_bp
 
@@ -81,8 +83,20 @@ app.config['SESSION_FILE_THRESHOLD'] = 500  # 单个session文件的最大大小
 
 print(f"Session存储路径: {session_dir}")
 
-# 配置自定义JSON编码器
-app.json_encoder = CustomJSONEncoder
+# 解析结果缓存：同一份日志重复上传时直接读取，多个worker进程共用同一目录；上限为0时不启用
+app.config['PARSE_CACHE_DIR'] = os.environ.get(
+    'LOG_ANALYZER_PARSE_CACHE_DIR',
+    os.path.join(os.path.dirname(session_dir), 'log_analyzer_parse_cache' if os.environ.get('FLASK_ENV') == 'production' else 'parse_cache'),
+)
+app.config['PARSE_CACHE_MAX_BYTES'] = int(os.environ.get('LOG_ANALYZER_PARSE_CACHE_MB', '2048')) * 1024 * 1024
+
+# 配置JSON编解码
+app.json = CodecJSONProvider(app)
+
+# 响应压缩：按 Accept-Encoding 选择 gzip 或 deflate，级别为0时不压缩，小于下限的响应不压缩
+app.config['COMPRESS_LEVEL'] = int(os.environ.get('LOG_ANALYZER_COMPRESS_LEVEL', '6'))
+app.config['COMPRESS_MIN_BYTES'] = int(os.environ.get('LOG_ANALYZER_COMPRESS_MIN_BYTES', '1024'))
+app.after_request(compress_response)
 
 Session(app)
 
@@ -101,6 +115,8 @@ app.register_blueprint(updates_bp)  # 添加更新路由
 debug_mode = os.getenv('FLASK_ENV', 'development').lower() in ('development')
 
 if __name__ == '__main__':
+    # 打包为可执行文件时，多文件并行解析的子进程需要
+    multiprocessing.freeze_support()
     print("🚀 启动Log Analyzer...")
     print("🌐 启动Flask服务器...")
     app.run(debug=debug_mode, host='0.0.0.0', port=5000)
@@ -3,20 +3,28 @@
 负责账户信息查询和处理
 """
 
-import json
 import re
 from typing import Dict, List, Any, Optional
 import pandas as pd
 
-from .models import ProcessingState, RequestPairsDict
+from .. import codec
+from .models import ProcessingState, RequestPairsDict, ParseCursor, RequestKind
 
 
 class AccountProcessor:
     """账户查询处理器类"""
+
+    # 需要的请求，请求统计时按请求原文筛选后登记
+    UPLOAD_FUND_INFO = RequestKind("upload_fund_info", contains=("upload_fund_info",))
+    # 不带with_permission的list_account_portfolio请求是投后分析发起的，需要过滤
+    LIST_ACCOUNT_PORTFOLIO = RequestKind("list_account_portfolio", contains=("list_account_portfolio", "with_permission"))
+    REQUEST_KINDS = (UPLOAD_FUND_INFO, LIST_ACCOUNT_PORTFOLIO)
     
     def __init__(self, state: ProcessingState, req_pairs: RequestPairsDict):
         self.state = state
         self.req_pairs = req_pairs
+        # 已处理到的位置，跟踪模式下再次解析只处理新增部分
+        self.cursor = ParseCursor()
         self.query_accounts = {}
         self.query_accounts_df = {}
     
@@ -26,7 +34,7 @@ class AccountProcessor:
         """
         # 处理账户查询结果
         for query_time, user_account_str in self.query_accounts.items():
-            user_account_dict = json.loads(user_account_str)["result"]["data"]["account_fn"]["list_account_portfolio"]["edges"]
+            user_account_dict = codec.loads(user_account_str)["result"]["data"]["account_fn"]["list_account_portfolio"]["edges"]
             df_user_account = self._handle_once_account_query(user_account_dict)
             self.query_accounts_df[query_time] = df_user_account
             self._update_fund_mappings(df_user_account)
@@ -96,41 +104,39 @@ class AccountProcessor:
         """
         处理upload_fund_info请求
         """
-        for key, value in self.req_pairs.items():
-            if "upload_fund_info" in json.dumps(value["request"]):
-                request = value["request"]
-                response = value["response"]
+        for key in self.cursor.new_kind_keys(self.state.route_index, self.UPLOAD_FUND_INFO.name):
+            value = self.req_pairs[key]
+            request = value["request"]
+            response = value["response"]
+            
+            if "error" not in response.keys():
+                query_string = request["params"]["query"]
+                match = re.search(r',fund_token:"([^"]+)"', query_string)
+                token_a = ""
+                if match:
+                    token_a = match.group(1)
                 
-                if "error" not in response.keys():
-                    query_string = request["params"]["query"]
-                    match = re.search(r',fund_token:"([^"]+)"', query_string)
-                    token_a = ""
-                    if match:
-                        token_a = match.group(1)
-                    
-                    token_b = response["result"]["data"]["account_fn"]["upload_fund_info"]["fund_info"][0]["fund_token"]
-                    permission_code = response["result"]["data"]["account_fn"]["upload_fund_info"]["fund_info"][0]["permission_code"]
-                    fund_name = response["result"]["data"]["account_fn"]["upload_fund_info"]["fund_info"][0]["account_name"]
-                    
-                    self.state.client_fundtoken_mapping[token_b] = token_a
-                    self.state.client_permissioncode_mapping[token_b] = f'fund_name:{fund_name},permission_code:{permission_code}'
+                token_b = response["result"]["data"]["account_fn"]["upload_fund_info"]["fund_info"][0]["fund_token"]
+                permission_code = response["result"]["data"]["account_fn"]["upload_fund_info"]["fund_info"][0]["permission_code"]
+                fund_name = response["result"]["data"]["account_fn"]["upload_fund_info"]["fund_info"][0]["account_name"]
+                
+                self.state.client_fundtoken_mapping[token_b] = token_a
+                self.state.client_permissioncode_mapping[token_b] = f'fund_name:{fund_name},permission_code:{permission_code}'
     
     def _process_list_account_portfolio(self) -> None:
         """
         处理list_account_portfolio请求
         """
-        for key, value in self.req_pairs.items():
-            checkstr = json.dumps(value["request"])
-            # 不带with_permission的list_account_portfolio请求是投后分析发起的，需要过滤
-            if "list_account_portfolio" in checkstr and "with_permission" in checkstr:
-                request = value["request"]
-                response = value["response"]
-                rsp_time = value["rsp_time"]
-                
-                user_account_dict = response["result"]["data"]["account_fn"]["list_account_portfolio"]["edges"]
-                df_user_account = self._handle_once_account_query(user_account_dict)
-                self.query_accounts_df[rsp_time] = df_user_account
-                self._update_fund_mappings(df_user_account)
+        for key in self.cursor.new_kind_keys(self.state.route_index, self.LIST_ACCOUNT_PORTFOLIO.name):
+            value = self.req_pairs[key]
+            request = value["request"]
+            response = value["response"]
+            rsp_time = value["rsp_time"]
+            
+            user_account_dict = response["result"]["data"]["account_fn"]["list_account_portfolio"]["edges"]
+            df_user_account = self._handle_once_account_query(user_account_dict)
+            self.query_accounts_df[rsp_time] = df_user_account
+            self._update_fund_mappings(df_user_account)
     
     def handle_account_query(self, req_time: str = "") -> Optional[pd.DataFrame]:
         """
@@ -6,14 +6,20 @@
 from typing import Dict, List, Any, Optional, Tuple
 import pandas as pd
 from datetime import datetime
-from .models import ProcessingState, RequestPairsDict
-import json
+from .. import codec
+from .models import ProcessingState, RequestPairsDict, ParseCursor, RequestKind
 
 class AlgorithmProcessor:
     """算法交易处理器类"""
+    # 需要的请求，请求统计时按路由字段筛选后登记，只解码算法单相关的请求
+    NEW_INSTMANAGE = RequestKind("new_instmanage", protocol="json", method="new_instmanage")
+    REQUEST_KINDS = (NEW_INSTMANAGE,)
+
     def __init__(self, state: ProcessingState, req_pairs: RequestPairsDict):
         self.state = state
         self.req_pairs = req_pairs
+        # 已处理到的位置，跟踪模式下再次解析只处理新增部分
+        self.cursor = ParseCursor()
         self.algorithm_list: List[Dict[str, Any]] = []
         self.algorithm_detail_dict: Dict[str, Dict[str, Any]] = {}
         self.algorithm_query_dict: Dict[str, List[Dict[str, Any]]] = {}
@@ -24,104 +30,97 @@ class AlgorithmProcessor:
         """
         解析算法订单相关数据
         """
-        self.algorithm_list = []
-        self.algorithm_detail_dict = {}
-        self.algorithm_query_dict = {}
-        self.query_algorithm_df = {}
-        self.algorithm_push = {}
-        for key, value in self.req_pairs.items():
-            protocol = value.get("protocol", "")
-            request = value["request"]
-            response = value["response"]
+        for key in self.cursor.new_kind_keys(self.state.route_index, self.NEW_INSTMANAGE.name):
+            value = self.req_pairs[key]
             req_time = value["req_time"]
             rsp_time = value["rsp_time"]
-            if protocol == "json":
-                if request.get("method") == "new_instmanage":
-                    dict_inst_type = ["普通","条件单","算法单"]
-                    dict_init_desc = ["启动","暂停"]
-                    dict_expire_desc = ["撤单","不撤"]
-                    dict_special_desc = ["跟限价委托", "不委托"]
-                    action = request["params"].get("action")
-                    if action == "query" and "instructionid" not in request["params"]:
-                        query_data = response["result"]["instructions"]
-                        format_query_data = []
-                        for item in query_data:
-                            instanceid = item["instructionid"]
-                            fund = ""
-                            fund_token = item.get("fund_token", "")
-                            if hasattr(self.state, "client_fundtoken_mapping") and fund_token in self.state.client_fundtoken_mapping:
-                                mapped = self.state.client_fundtoken_mapping[fund_token]
-                                if mapped in self.state.fundtoken_dict:
-                                    fund = self.state.fundtoken_dict[mapped]
-                            format_query_data.append({
-                                "rsp_time": rsp_time,
-                                "fund": fund,
-                                "inst_id": instanceid,
-                                "inst_type": dict_inst_type[item["instructiontype"]],
-                                "algorithm": item["instructionparam"]["algorithmtype"],
-                                "security": item["security"],
-                                "side": item["side"],
-                                "总数": item["qty"],
-                                "剩余": item["qtyleft"],
-                                "成交": item["qtytrade"],
-                                "撤销": item["qtycancel"],
-                                "状态": item["statusmsg"],
-                            })
-                        self.algorithm_query_dict[rsp_time] = format_query_data
-                        df_algorithm = pd.DataFrame(format_query_data) if format_query_data else ""
-                        query_index = rsp_time + "|" + str(len(format_query_data))
-                        self.query_algorithm_df[query_index] = df_algorithm
-                    if action == "new":
-                        instanceid = response["result"]["instructionid"]
-                        fundtoken = request["params"]["fund_token"]
-                        fund = self.state.fundtoken_dict.get(fundtoken, "")
-                        new_algorithm = {
-                            "rsp_time": rsp_time,
-                            "fund": fund,
-                            "inst_id": instanceid,
-                            "inst_type": dict_inst_type[request["params"]["instructiontype"]],
-                            "security": request["params"]["security"],
-                            "side": request["params"]["side"],
-                            "qty": request["params"]["qty"],
-                            "price": request["params"]["price"],
-                            "ptype": request["params"]["pricetype"],
-                            "pimit": request["params"]["pricelimit"],
-                            "创建后": dict_init_desc[request["params"]["initflag"]],
-                            "到期后": dict_expire_desc[request["params"]["expirerevokeflag"]],
-                            "取价失败后": dict_special_desc[request["params"]["specialdeal"]],
-                        }
-                        self.algorithm_list.append(new_algorithm)
-                        dict_eop_desc = ["忽略","暂停","废单"]
-                        dict_expre2_desc = ["不继续委托", "继续委托"]
-                        algorithm_params = request["params"]["instructionparam"]["algorithm"]
-                        new_algorithm_detail = {
-                            "algorithm": request["params"]["instructionparam"]["algorithmtype"],
-                            "交易失败": dict_eop_desc[request["params"]["instructionparam"]["tradeerrop"]],
-                            "到期后": dict_expre2_desc[request["params"]["instructionparam"]["tradeexpireoperation"]],
-                        }
-                        new_algorithm_detail.update({k: v for k, v in algorithm_params.items() if v is not None})
-                        if "starttime" in new_algorithm_detail:
-                            new_algorithm_detail["starttime"] = datetime.fromtimestamp(new_algorithm_detail["starttime"]).strftime("%Y-%m-%d %H:%M:%S")
-                        if "endtime" in new_algorithm_detail:
-                            new_algorithm_detail["endtime"] = datetime.fromtimestamp(new_algorithm_detail["endtime"]).strftime("%Y-%m-%d %H:%M:%S")
-                        if "needreprice" in new_algorithm_detail and new_algorithm_detail["needreprice"] != "1":
-                            new_algorithm_detail.pop("repricetype", None)
-                            new_algorithm_detail.pop("reprice", None)
-                        if "pricelimittype" not in new_algorithm_detail:
-                            new_algorithm_detail.pop("pricefloatuplimit", None)
-                            new_algorithm_detail.pop("pricefloatdownlimit", None)
-                            new_algorithm_detail.pop("priceuplimit", None)
-                            new_algorithm_detail.pop("pricedownlimit", None)
-                        new_algorithm_detail.pop("timelimit", None)
-                        self.algorithm_detail_dict[instanceid] = new_algorithm_detail
+            request = value["request"]
+            response = value["response"]
+            dict_inst_type = ["普通","条件单","算法单"]
+            dict_init_desc = ["启动","暂停"]
+            dict_expire_desc = ["撤单","不撤"]
+            dict_special_desc = ["跟限价委托", "不委托"]
+            action = request["params"].get("action")
+            if action == "query" and "instructionid" not in request["params"]:
+                query_data = response["result"]["instructions"]
+                format_query_data = []
+                for item in query_data:
+                    instanceid = item["instructionid"]
+                    fund = ""
+                    fund_token = item.get("fund_token", "")
+                    if hasattr(self.state, "client_fundtoken_mapping") and fund_token in self.state.client_fundtoken_mapping:
+                        mapped = self.state.client_fundtoken_mapping[fund_token]
+                        if mapped in self.state.fundtoken_dict:
+                            fund = self.state.fundtoken_dict[mapped]
+                    format_query_data.append({
+                        "rsp_time": rsp_time,
+                        "fund": fund,
+                        "inst_id": instanceid,
+                        "inst_type": dict_inst_type[item["instructiontype"]],
+                        "algorithm": item["instructionparam"]["algorithmtype"],
+                        "security": item["security"],
+                        "side": item["side"],
+                        "总数": item["qty"],
+                        "剩余": item["qtyleft"],
+                        "成交": item["qtytrade"],
+                        "撤销": item["qtycancel"],
+                        "状态": item["statusmsg"],
+                    })
+                self.algorithm_query_dict[rsp_time] = format_query_data
+                df_algorithm = pd.DataFrame(format_query_data) if format_query_data else ""
+                query_index = rsp_time + "|" + str(len(format_query_data))
+                self.query_algorithm_df[query_index] = df_algorithm
+            if action == "new":
+                instanceid = response["result"]["instructionid"]
+                fundtoken = request["params"]["fund_token"]
+                fund = self.state.fundtoken_dict.get(fundtoken, "")
+                new_algorithm = {
+                    "rsp_time": rsp_time,
+                    "fund": fund,
+                    "inst_id": instanceid,
+                    "inst_type": dict_inst_type[request["params"]["instructiontype"]],
+                    "security": request["params"]["security"],
+                    "side": request["params"]["side"],
+                    "qty": request["params"]["qty"],
+                    "price": request["params"]["price"],
+                    "ptype": request["params"]["pricetype"],
+                    "pimit": request["params"]["pricelimit"],
+                    "创建后": dict_init_desc[request["params"]["initflag"]],
+                    "到期后": dict_expire_desc[request["params"]["expirerevokeflag"]],
+                    "取价失败后": dict_special_desc[request["params"]["specialdeal"]],
+                }
+                self.algorithm_list.append(new_algorithm)
+                dict_eop_desc = ["忽略","暂停","废单"]
+                dict_expre2_desc = ["不继续委托", "继续委托"]
+                algorithm_params = request["params"]["instructionparam"]["algorithm"]
+                new_algorithm_detail = {
+                    "algorithm": request["params"]["instructionparam"]["algorithmtype"],
+                    "交易失败": dict_eop_desc[request["params"]["instructionparam"]["tradeerrop"]],
+                    "到期后": dict_expre2_desc[request["params"]["instructionparam"]["tradeexpireoperation"]],
+                }
+                new_algorithm_detail.update({k: v for k, v in algorithm_params.items() if v is not None})
+                if "starttime" in new_algorithm_detail:
+                    new_algorithm_detail["starttime"] = datetime.fromtimestamp(new_algorithm_detail["starttime"]).strftime("%Y-%m-%d %H:%M:%S")
+                if "endtime" in new_algorithm_detail:
+                    new_algorithm_detail["endtime"] = datetime.fromtimestamp(new_algorithm_detail["endtime"]).strftime("%Y-%m-%d %H:%M:%S")
+                if "needreprice" in new_algorithm_detail and new_algorithm_detail["needreprice"] != "1":
+                    new_algorithm_detail.pop("repricetype", None)
+                    new_algorithm_detail.pop("reprice", None)
+                if "pricelimittype" not in new_algorithm_detail:
+                    new_algorithm_detail.pop("pricefloatuplimit", None)
+                    new_algorithm_detail.pop("pricefloatdownlimit", None)
+                    new_algorithm_detail.pop("priceuplimit", None)
+                    new_algorithm_detail.pop("pricedownlimit", None)
+                new_algorithm_detail.pop("timelimit", None)
+                self.algorithm_detail_dict[instanceid] = new_algorithm_detail
 
         # 处理推送数据
         self._handle_algorithm_push()
 
 
     def _handle_algorithm_push(self):
-        for req_time, raw_response in self.state.algorithm_push_raw:
-            response_json = json.loads(raw_response)
+        for req_time, raw_response in self.cursor.new_items("algorithm_push_raw", self.state.algorithm_push_raw):
+            response_json = codec.loads(raw_response)
             response_dict = response_json["params"]
             response_dict["req_time"] = req_time
             action = response_dict["action"]
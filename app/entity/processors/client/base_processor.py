@@ -3,15 +3,25 @@
 负责日志解析、请求对匹配和基础工具方法
 """
 
-import json
+import itertools
+import os
 import traceback
-from typing import Dict, List, Any, Optional, Union, Tuple
+from typing import BinaryIO, Dict, Iterable, List, Any, Optional, Union, Tuple
 
+from .. import codec
+from ..text_index import INDEX_MIN_RECORDS, build_index, filter_records
+from ..timeline import merge_by_time
+from . import log_time
+from .line_reader import ByteRangeReader, find_lines_end, iter_stream_lines, iter_stream_line_refs
+from .line_tokenizer import (
+    tokenize_line, LINE_NEW_TRANSMIT, LINE_TIMEOUT, LINE_SKIPPED, LINE_MALFORMED
+)
+from .raw_lines import LineRef
 from .models import (
-    RequestPair, ProcessingConfig, ProcessingState, 
+    RequestPair, ProcessingConfig, ProcessingState, ParseCursor,
     RequestPairsDict, FundTokenMapping, FundMapping,
     ParsedRequestResponseList, ParsedPushDataList,
-    ParsedRequestResponse, ParsedPushData
+    ParsedRequestResponse, ParsedPushData, LOG_LIST_SOURCES
 )
 
 
@@ -22,6 +32,9 @@ class BaseProcessor:
         self.config = ProcessingConfig()
         self.state = ProcessingState(isJupyter)
         self.req_pairs: RequestPairsDict = {}
+        # 分段解析模式，见 begin_partial
+        self.partial = False
+        self.username_candidate = None
         
     def format_size(self, size: float) -> str:
         """
@@ -82,36 +95,32 @@ class BaseProcessor:
                 return True
         return False
     
-    def parse_line(self, line: str) -> str:
+    def parse_line(self, line: str, ref: Optional[LineRef] = None) -> str:
         """
         解析单行日志
         
         Args:
             line: 日志行内容
+            ref: 该行在本地日志文件中的位置，给出时诊断列表只记录位置
             
         Returns:
             处理结果
         """
+        kind, req_time, req_type, req_id, payload_start = tokenize_line(line)
+        raw_line = line if ref is None else ref
+
         # 处理特殊日志行
-        if "new_transmit_" in line:
-            self.state.new_transmit_reqs.append(line)
+        if kind == LINE_NEW_TRANSMIT:
+            self.state.new_transmit_reqs.append(raw_line)
             return ""
-        elif "|timeout|" in line:
-            self.state.timeout_reqs.append(line)
+        elif kind == LINE_TIMEOUT:
+            self.state.timeout_reqs.append(raw_line)
             return ""
-        elif "|" not in line:
-            self.state.skipped_reqs.append(line)
+        elif kind == LINE_SKIPPED:
+            self.state.skipped_reqs.append(raw_line)
             return ""
-
-        try:
-            # 解析日志行基本信息
-            parts = line.split('|')
-            req_time = parts[1]
-            req_type = parts[2]
-            log_level = parts[3]
-            req_id = parts[4]
-        except Exception as e:
-            print(f"parse line error: {e}")
+        elif kind == LINE_MALFORMED:
+            self.state.malformed_lines += 1
             return ""
         
         # 记录日志时间范围
@@ -121,12 +130,32 @@ class BaseProcessor:
         
         # 处理有请求ID的日志行
         if req_id != "":
-            self._process_request_response(line, req_id, req_type, req_time)
+            self._process_request_response(line, req_id, req_type, req_time, payload_start, raw_line)
         # 查询账户，没有req_id，特殊处理
         else:
-            self._process_special_lines(line, req_type, req_time)
+            self._process_special_lines(line, req_type, req_time, payload_start, raw_line)
     
-    def _process_request_response(self, line: str, req_id: str, req_type: str, req_time: str) -> str:
+    def _payload_of(self, line: str, req_type: str, payload_start: int, marker_type: str) -> str:
+        """
+        截取日志行中的请求/响应内容
+
+        分词时已经按行类型定位过内容起始位置，类型一致时直接切片，否则按标记查找
+
+        Args:
+            line: 日志行
+            req_type: 行类型
+            payload_start: 分词得到的内容起始位置
+            marker_type: 需要的内容标记类型，request或response
+
+        Returns:
+            内容字符串
+        """
+        if req_type == marker_type and payload_start >= 0:
+            return line[payload_start:]
+        return line.split(self.config.split_map[marker_type])[1]
+
+    def _process_request_response(self, line: str, req_id: str, req_type: str, req_time: str, payload_start: int = -1,
+                                  raw_line: Union[str, LineRef, None] = None) -> str:
         """
         处理请求响应对
 
@@ -135,38 +164,52 @@ class BaseProcessor:
             req_id: 请求ID
             req_type: 请求类型
             req_time: 请求时间
+            payload_start: 分词得到的内容起始位置
+            raw_line: 记录到诊断列表的原始行，为行文本或行位置，默认为line
 
         Returns:
             处理结果
         """
         if req_id not in self.req_pairs.keys():
-            self.req_pairs[req_id] = {
-                "request": "", "response": "", 
-                "req_time": "", "rsp_time": "", "protocol": ""
-            }
+            self.req_pairs[req_id] = RequestPair()
+        pair = self.req_pairs[req_id]
 
         try:
             # 解析请求/响应内容
-            split_line = line.split(self.config.split_map[req_type])
-            req_split = split_line[1] if (len(split_line) > 1 and len(split_line[1]) > 2) else '{}'
+            # 未知的行类型按非法请求记录
+            if req_type not in self.config.split_map:
+                raise KeyError(req_type)
+            req_split = line[payload_start:] if payload_start >= 0 else ""
+            req_split = req_split if len(req_split) > 2 else '{}'
+            truncated = "******" in req_split
             req_split = req_split.replace("******", "}]}}}},")
             req_split = req_split.replace("\r\n", "")
-            req_json = json.loads(req_split)
+            # 保存去掉行尾空白的原文；校验和解码仍用原来的文本，失败时的异常信息与原实现一致
+            payload = req_split.rstrip()
 
-            self.req_pairs[req_id][req_type] = req_json
-            self.req_pairs[req_id][self.config.req_time_map[req_type]] = req_time
+            # 完整的JSON对象/数组只校验语法、延迟到首次访问再解码，被截断修补过或形状不完整的内容立即解码；
+            # 校验或解码失败时请求对不写入任何字段，按非法请求记录整行
+            if truncated or payload[:1] not in ("{", "[") or payload[-1:] not in ("}", "]"):
+                pair.set_payload(req_type, payload, codec.loads(req_split))
+            else:
+                codec.validate(req_split)
+                pair.set_payload(req_type, payload)
+            pair[self.config.req_time_map[req_type]] = req_time
 
             # 设置协议类型
             if req_type == "request":
                 self._set_protocol_type(req_id, line)
 
-            # 提取用户名
-            if self.state.username == "":
-                self._extract_username(req_split, req_json)
+            # 提取用户名，分段解析时先记下候选，合并时按日志顺序再提取
+            if self.state.username == "" and "useraccount" in req_split:
+                if self.partial:
+                    self._defer_username(req_id, req_type, pair)
+                else:
+                    self._extract_username(req_split, pair[req_type])
 
         except Exception as e:
             self.state.illegal_reqs.append({
-                "line": line,
+                "line": line if raw_line is None else raw_line,
                 "e": e,
                 "traceback_exc": traceback.format_exc(),
             })
@@ -201,7 +244,23 @@ class BaseProcessor:
             username_list = self._find_key_in_dict(req_json, "useraccount")
             self.state.username = username_list
     
-    def _process_special_lines(self, line: str, req_type: str, req_time: str) -> str:
+    def _defer_username(self, req_id: str, req_type: str, pair: RequestPair) -> None:
+        """
+        分段解析时记录本段第一条含useraccount的内容，不解码
+
+        串行解析只会在之前的日志都没有提取到用户名时才解码这条内容，是否解码要到合并时才能确定
+
+        Args:
+            req_id: 请求ID
+            req_type: request或response
+            pair: 请求对
+        """
+        self.username_candidate = (req_id, req_type, pair.raw_text(req_type))
+        # 标记为已有候选，本段后续的内容不再记录
+        self.state.username = None
+
+    def _process_special_lines(self, line: str, req_type: str, req_time: str, payload_start: int = -1,
+                               raw_line: Union[str, LineRef, None] = None) -> str:
         """
         处理特殊日志行
         
@@ -209,15 +268,17 @@ class BaseProcessor:
             line: 日志行
             req_type: 请求类型
             req_time: 请求时间
+            payload_start: 分词得到的内容起始位置
+            raw_line: 记录到诊断列表的原始行，为行文本或行位置，默认为line
             
         Returns:
             处理结果
         """
         if "query accout result" in line:
             try:
-                req_split = line.split(self.config.split_map['request'])[1]
+                req_split = self._payload_of(line, req_type, payload_start, "request")
                 # 适配一下logbody有多条的情况
-                logbody = json.loads(req_split)["params"]["logbody"]
+                logbody = codec.loads(req_split)["params"]["logbody"]
                 user_account_str = ""
                 for item in logbody:
                     if item["event"] == "query accout result!":
@@ -230,29 +291,29 @@ class BaseProcessor:
         # 集中交易、篮子交易推送，没有req_id，特殊处理
         # 这里解析用到了fundtoken_dict数据，得先保存，后续解析
         elif "basket_order_push" in line:
-            request_str = line.split(self.config.split_map["response"])[1]
+            request_str = self._payload_of(line, req_type, payload_start, "response")
             self.state.basketorder_push_raw.append([req_time, request_str])
             self.state.basketorder_push_cnts += 1
         # 算法交易推送
         elif self._is_altorithm_push(line, self.config.possible_algorithm_pushkey):
-            request_str = line.split(self.config.split_map["response"])[1]
+            request_str = self._payload_of(line, req_type, payload_start, "response")
             self.state.algorithm_push_raw.append([req_time, request_str])
         # 组合条件推送
         elif "grade_instruction" in line:
-            request_str = line.split(self.config.split_map["response"])[1]
+            request_str = self._payload_of(line, req_type, payload_start, "response")
             self.state.gradecondition_push_instruction.append([req_time, request_str])
         elif "grade_condition" in line:
-            request_str = line.split(self.config.split_map["response"])[1]
+            request_str = self._payload_of(line, req_type, payload_start, "response")
             self.state.gradecondition_push_condition.append([req_time, request_str])
         elif "grade_order" in line:
-            request_str = line.split(self.config.split_map["response"])[1]
+            request_str = self._payload_of(line, req_type, payload_start, "response")
             self.state.gradecondition_push_order.append([req_time, request_str])
         else:
             if req_type == "response":
-                request_str = line.split(self.config.split_map["response"])[1]
+                request_str = self._payload_of(line, req_type, payload_start, "response")
                 self.state.response_without_reqid.append([req_time, request_str])
             else:
-                self.state.lines_without_reqid.append(line)
+                self.state.lines_without_reqid.append(line if raw_line is None else raw_line)
                 # break
     
     def _process_account_query(self, line: str, req_time: str) -> str:
@@ -268,7 +329,7 @@ class BaseProcessor:
         """
         try:
             req_split = line.split(self.config.split_map['request'])[1]
-            logbody = json.loads(req_split)["params"]["logbody"]
+            logbody = codec.loads(req_split)["params"]["logbody"]
             user_account_str = ""
             for item in logbody:
                 if item["event"] == "query accout result!":
@@ -325,41 +386,208 @@ class BaseProcessor:
         # 这里需要存储到条件推送模块中
         return ""
     
-    def parse(self, file_list: List[str]) -> None:
+    def parse(self, file_list: List[Union[str, BinaryIO]]) -> None:
         """
         解析日志文件列表
-        
+
         Args:
-            file_list: 文件内容列表
-            mode: 模式，jupyter或web
+            file_list: jupyter模式下为文件路径列表；web模式下为文件内容或上传文件的二进制流
         """
         self.req_pairs = {}
-        
+        self.reset_log_list()
+
+        for file in file_list:
+            self.parse_file(file)
+
+        # 清理空请求
+        self._clean_empty_requests()
+        self._report_malformed_lines()
+
+    def parse_file(self, file: Union[str, BinaryIO]) -> None:
+        """
+        解析单个日志文件，结果累加到当前的请求对和状态中
+
+        Args:
+            file: jupyter模式下为文件路径；web模式下为文件内容或上传文件的二进制流
+        """
         if self.state.isJupyter:
-            for file in file_list:
-                with open(file, "r", encoding="gb2312", errors="ignore") as f:
-                    for line in f:
-                        self.parse_line(line)
+            with open(file, "rb") as f:
+                self.parse_stream(f, path=file)
+        elif isinstance(file, str):
+            for line in file.split("\n"):
+                self.parse_line(line)
         else:
-            for file_content in file_list:
-                for line in file_content.split("\n"):
-                    self.parse_line(line)
-        
+            self.parse_stream(file)
+
+    def begin_partial(self) -> None:
+        """
+        进入分段解析模式（一个文件或文件中按行切出的一段），解析结果由 merge_partials 按日志顺序合并
+
+        用户ID和日志结束时间初始化为None，用来区分本段没有写入和写入了空值
+        """
+        self.partial = True
+        self.username_candidate = None
+        self.state.userid = None
+        self.state.log_end_time = None
+
+    def merge_partials(self, partials: Iterable["BaseProcessor"]) -> None:
+        """
+        按日志顺序合并分段解析的结果，与依次解析整个日志的结果一致
+
+        Args:
+            partials: 各分段单独解析后的处理器，按文件及段在文件中的顺序排列
+        """
+        self.req_pairs = {}
+        self.reset_log_list()
+
+        for partial in partials:
+            self._merge_partial(partial)
+
         # 清理空请求
         self._clean_empty_requests()
+        self._report_malformed_lines()
+
+    def _merge_partial(self, partial: "BaseProcessor") -> None:
+        """
+        合并一个分段的解析结果
+
+        Args:
+            partial: 单独解析该分段的处理器
+        """
+        # 请求ID按首次出现的顺序加入，跨分段的请求对用后面分段写入的字段覆盖
+        for req_id, pair in partial.req_pairs.items():
+            if req_id in self.req_pairs:
+                self.req_pairs[req_id].merge_from(pair)
+            else:
+                self.req_pairs[req_id] = pair
+
+        self._merge_partial_state(partial)
+
+    def _merge_partial_state(self, partial: "BaseProcessor") -> None:
+        """
+        合并一个分段解析得到的状态：用户信息、日志时间范围和按行追加的列表
+
+        Args:
+            partial: 单独解析该分段的处理器
+        """
+        state, other = self.state, partial.state
+        if state.username == "" and partial.username_candidate is not None:
+            self._resolve_username(partial)
+
+        if state.log_begin_time == "":
+            state.log_begin_time = other.log_begin_time
+        if other.log_end_time is not None:
+            state.log_end_time = other.log_end_time
+        if other.userid is not None:
+            state.userid = other.userid
+        state.basketorder_push_cnts += other.basketorder_push_cnts
+        state.malformed_lines += other.malformed_lines
+        for name in ProcessingState.PARSE_LIST_FIELDS:
+            getattr(state, name).extend(getattr(other, name))
+
+    def parse_tail(self, path: str, offset: int = 0) -> Tuple[int, List[str]]:
+        """
+        增量解析本地日志文件从offset开始新写入的完整行，用于跟踪仍在写入的日志
+
+        末尾没有换行符的半行留到下次解析；此前只有请求的请求对在响应写入后补全，
+        补全或新增的完整请求对追加到 req_pairs 末尾，仍不完整的保留在 state.removed_reqs 中等待后续内容
+
+        Args:
+            path: 日志文件路径
+            offset: 上次解析结束的字节偏移，从头解析时为0
+
+        Returns:
+            (下次解析的起始偏移, 本次新增的完整请求对的请求ID列表)
+        """
+        size = os.path.getsize(path)
+        if size < offset:
+            raise ValueError(f"日志文件比上次解析时小，可能已被截断或轮转，需要重新解析: {path}")
+
+        partial = BaseProcessor(self.state.isJupyter)
+        partial.config = self.config
+        partial.begin_partial()
+        with open(path, "rb") as f:
+            end = find_lines_end(f, offset, size)
+            if end == offset:
+                return offset, []
+            partial.parse_stream(ByteRangeReader(f, offset, end), False, path, offset)
+
+        self._merge_partial_state(partial)
+        completed = []
+        pending = self.state.removed_reqs
+        for req_id, pair in partial.req_pairs.items():
+            if req_id in self.req_pairs:
+                # 已经完整的请求对再次出现时按串行解析的规则覆盖，各模块不会重复处理；日志列表中的记录随之失效
+                self.req_pairs[req_id].merge_from(pair)
+                self.reset_log_list()
+                continue
+            if req_id in pending:
+                pending[req_id].merge_from(pair)
+                pair = pending.pop(req_id)
+            if pair.is_empty("request") or pair.is_empty("response"):
+                pending[req_id] = pair
+            else:
+                self.req_pairs[req_id] = pair
+                completed.append(req_id)
+        return end, completed
+
+    def _resolve_username(self, partial: "BaseProcessor") -> None:
+        """
+        之前的分段都没有提取到用户名时，按串行解析的方式解码该分段记下的候选内容并提取
+
+        Args:
+            partial: 单独解析该分段的处理器
+        """
+        req_id, req_type, raw = partial.username_candidate
+        pair = partial.req_pairs[req_id]
+        if pair.raw_text(req_type) is not raw:
+            # 该内容在本段后面被覆盖过，用临时请求对解码原内容
+            pair = RequestPair()
+            pair.set_payload(req_type, raw)
+        req_json = pair[req_type]
+        self.state.username = self._find_key_in_dict(req_json, "useraccount")
+
+    def parse_stream(self, stream: BinaryIO, last: bool = True, path: Optional[str] = None, offset: int = 0) -> None:
+        """
+        分块读取二进制流并逐行解析，整个文件不会同时驻留内存
+
+        Args:
+            stream: 二进制流
+            last: 是否为文件的最后一段，按换行切分出的中间分段传False；web模式下最后一段与 str.split("\\n") 一致，
+                产出末尾的空段，本地日志文件与以文本方式逐行读取一致，不产出
+            path: 流为本地日志文件时的文件路径，给出时诊断列表只记录行位置
+            offset: 流的起点在文件中的字节偏移
+        """
+        if path is None:
+            for line in iter_stream_lines(stream, self.config.encoding, self.config.read_chunk_size, keep_empty_tail=last):
+                self.parse_line(line)
+            return
+
+        raw_lines = self.state.raw_lines
+        file_no = raw_lines.register(path, self.config.encoding)
+        for line, start, length in iter_stream_line_refs(stream, offset, self.config.encoding, self.config.read_chunk_size):
+            self.parse_line(line, raw_lines.make_ref(file_no, start, length))
     
+    def _report_malformed_lines(self) -> None:
+        """
+        解析结束后汇总输出分隔符不足的日志行数，逐行解析时不输出
+        """
+        if self.state.malformed_lines:
+            print(f"parse line error: {self.state.malformed_lines} 行日志行分隔符不足")
+
     def _clean_empty_requests(self) -> None:
         """
         清理空的请求对
         """
-        self.state.removed_reqs = {
-            key: value for key, value in self.req_pairs.items() 
-            if (len(json.dumps(value["request"])) <= 2 or len(json.dumps(value["response"])) <= 2)
-        }
-        self.req_pairs = {
-            key: value for key, value in self.req_pairs.items() 
-            if (len(json.dumps(value["request"])) > 2 and len(json.dumps(value["response"])) > 2)
-        }
+        removed_reqs = {}
+        req_pairs = {}
+        for key, value in self.req_pairs.items():
+            if value.is_empty("request") or value.is_empty("response"):
+                removed_reqs[key] = value
+            else:
+                req_pairs[key] = value
+        self.state.removed_reqs = removed_reqs
+        self.req_pairs = req_pairs
     
     def get_fund_by_fund_token(self, fund_token: str) -> str:
         """
@@ -388,17 +616,7 @@ class BaseProcessor:
         Returns:
             请求ID列表
         """
-        request_statics = self.state.request_statics
-        if protocol in request_statics.keys():
-            if servicename in request_statics[protocol].keys():
-                if cmd in request_statics[protocol][servicename].keys():
-                    return [d["key"] for d in request_statics[protocol][servicename][cmd]]
-                else:
-                    return []
-            else:
-                return []
-        else:
-            return []
+        return list(self.state.route_index.keys(protocol, servicename, cmd))
     
     def get_request_and_response(self, req_id: str) -> Dict[str, Any]:
         """
@@ -423,7 +641,8 @@ class BaseProcessor:
                 return True
         return False
 
-    def _handle_query_result(self, protocol: str, servicename: str, cmd: str, resultkey: str) -> Dict[str, Any]:
+    def _handle_query_result(self, protocol: str, servicename: str, cmd: str, resultkey: str,
+                             req_list: Optional[List[str]] = None) -> Dict[str, Any]:
         """
         处理查询结果
         
@@ -432,11 +651,13 @@ class BaseProcessor:
             servicename: 服务名称
             cmd: 命令
             resultkey: 结果键
+            req_list: 只处理其中的请求ID，默认为该路由的全部请求
             
         Returns:
             查询结果
         """
-        req_list = self.get_request_list(protocol, servicename, cmd)
+        if req_list is None:
+            req_list = self.get_request_list(protocol, servicename, cmd)
         rsp_query_data = {}
         for key in req_list:
             reqs = self.req_pairs[key]
@@ -462,252 +683,211 @@ class BaseProcessor:
                 rsp_query_data[rsp_time] = raw_querydata
         return rsp_query_data
 
-    def parse_and_split_request_pairs(self) -> Tuple[ParsedRequestResponseList, ParsedRequestResponseList]:
+    def parse_and_split_request_pairs(self, pairs: Optional[Iterable[Tuple[str, RequestPair]]] = None
+                                      ) -> Tuple[ParsedRequestResponseList, ParsedRequestResponseList]:
         """
         将请求问答对拆分为独立的请求数组和响应数组
         
+        Args:
+            pairs: 只拆分其中的(请求ID, 请求对)，默认为全部请求对
+
         Returns:
             (requests, responses) 元组，包含请求记录列表和响应记录列表
         """
         requests = []
         responses = []
+        if pairs is None:
+            pairs = self.req_pairs.items()
         
-        for req_id, item in self.req_pairs.items():
-            request = item.get("request", {})
-            response = item.get("response", {})
-            req_time = item.get("req_time", "")
-            rsp_time = item.get("rsp_time", "")
-            protocol = item.get("protocol", "")
+        for req_id, item in pairs:
+            req_time = item.req_time
+            rsp_time = item.rsp_time
+            protocol = item.protocol
             
-            # 解析servicename和action
-            servicename, action = self._parse_servicename_and_action(request, protocol)
+            # 请求统计时已登记到路由索引的请求对直接读取分类结果
+            try:
+                servicename, action = item.classify()
+            except Exception as e:
+                print(f"解析servicename和action失败: {e}")
+                servicename, action = "", ""
             
-            # 创建请求记录
-            if request:
+            # 创建请求记录，内容始终为日志原文，与是否解码过无关
+            if not item.is_empty("request"):
                 requests.append(ParsedRequestResponse(
                     id=req_id,
-                    content=json.dumps(request, ensure_ascii=False),
+                    content=item.text("request"),
                     time=req_time,
                     servicename=servicename,
                     action=action,
                     record_type="request",
-                    protocol=protocol
+                    protocol=protocol,
+                    time_us=item.req_micros
                 ))
             
             # 创建响应记录
-            if response:
+            if not item.is_empty("response"):
                 responses.append(ParsedRequestResponse(
                     id=req_id,
-                    content=json.dumps(response, ensure_ascii=False),
+                    content=item.text("response"),
                     time=rsp_time,
                     servicename=servicename,
                     action=action,
                     record_type="response",
-                    protocol=protocol
+                    protocol=protocol,
+                    time_us=item.rsp_micros
                 ))
         
         return requests, responses
 
-    def parse_push_data(self) -> ParsedPushDataList:
+    def parse_push_data(self, cursor: Optional[ParseCursor] = None) -> ParsedPushDataList:
         """
         解析推送数据和response_without_reqid，转换为统一的数据结构
         
+        Args:
+            cursor: 只解析各推送列表中该游标上次之后新增的部分，默认为全部
+
         Returns:
             解析后的推送数据列表
         """
         push_data = []
+        if cursor is None:
+            cursor = ParseCursor()
         
         # 解析篮子订单推送
-        for req_time, request_str in self.state.basketorder_push_raw:
+        for req_time, request_str in cursor.new_items("basketorder_push_raw", self.state.basketorder_push_raw):
             try:
                 push_data.append(ParsedPushData(
                     content=request_str,
                     time=req_time,
+                    time_us=log_time.micros_of(req_time),
                     push_type="basket_order_push"
                 ))
             except Exception as e:
                 print(f"解析篮子订单推送失败: {e}")
         
         # 解析算法推送
-        for req_time, request_str in self.state.algorithm_push_raw:
+        for req_time, request_str in cursor.new_items("algorithm_push_raw", self.state.algorithm_push_raw):
             try:
                 push_data.append(ParsedPushData(
                     content=request_str,
                     time=req_time,
+                    time_us=log_time.micros_of(req_time),
                     push_type="algorithm_push"
                 ))
             except Exception as e:
                 print(f"解析算法推送失败: {e}")
         
         # 解析条件推送指令
-        for req_time, request_str in self.state.gradecondition_push_instruction:
+        for req_time, request_str in cursor.new_items("gradecondition_push_instruction", self.state.gradecondition_push_instruction):
             try:
                 push_data.append(ParsedPushData(
                     content=request_str,
                     time=req_time,
+                    time_us=log_time.micros_of(req_time),
                     push_type="gradecondition_push_instruction"
                 ))
             except Exception as e:
                 print(f"解析条件推送指令失败: {e}")
         
         # 解析条件推送条件
-        for req_time, request_str in self.state.gradecondition_push_condition:
+        for req_time, request_str in cursor.new_items("gradecondition_push_condition", self.state.gradecondition_push_condition):
             try:
                 push_data.append(ParsedPushData(
                     content=request_str,
                     time=req_time,
+                    time_us=log_time.micros_of(req_time),
                     push_type="gradecondition_push_condition"
                 ))
             except Exception as e:
                 print(f"解析条件推送条件失败: {e}")
         
         # 解析条件推送订单
-        for req_time, request_str in self.state.gradecondition_push_order:
+        for req_time, request_str in cursor.new_items("gradecondition_push_order", self.state.gradecondition_push_order):
             try:
                 push_data.append(ParsedPushData(
                     content=request_str,
                     time=req_time,
+                    time_us=log_time.micros_of(req_time),
                     push_type="gradecondition_push_order"
                 ))
             except Exception as e:
                 print(f"解析条件推送订单失败: {e}")
         
         # 解析无请求ID的响应
-        for req_time, request_str in self.state.response_without_reqid:
+        for req_time, request_str in cursor.new_items("response_without_reqid", self.state.response_without_reqid):
             try:
                 push_data.append(ParsedPushData(
                     content=request_str,
                     time=req_time,
+                    time_us=log_time.micros_of(req_time),
                     push_type="response_push"
                 ))
             except Exception as e:
                 print(f"解析无请求ID响应失败: {e}")
         
         # 按时间排序
-        push_data.sort(key=lambda x: x.time)
+        push_data.sort(key=lambda x: x.time_us)
         
         return push_data
 
-    def parse_log_list(self) -> None:
+
+    def reset_log_list(self) -> None:
         """
-        解析日志列表，使用三指针算法对三个列表按time字段进行合并排序
+        清除已生成的日志列表，下次过滤时重新生成
         """
-        # 如果缓存中存在了，则不需要重新解析
-        # if len(self.state.parsed_log_list) > 0:
-        #     return
-        request_records, response_records = self.parse_and_split_request_pairs()
-        push_data = self.parse_push_data()
-        
-        # 使用三指针算法对三个列表按time字段进行合并排序
-        self.state.parsed_log_list = self._merge_sorted_lists_by_time(
-            request_records, response_records, push_data
-        )
+        self.state.parsed_log_list = []
+        self.state.log_list_cursor = ParseCursor()
+        self.state.log_list_parts = {source: [] for source in LOG_LIST_SOURCES}
+        self.state.log_list_index = None
 
-    def _merge_sorted_lists_by_time(self, 
-                                   request_records: ParsedRequestResponseList,
-                                   response_records: ParsedRequestResponseList, 
-                                   push_data: ParsedPushDataList) -> List[Union[ParsedRequestResponse, ParsedPushData]]:
+    def parse_log_list(self) -> None:
         """
-        使用三指针算法对三个列表按time字段进行合并排序
-        
-        Args:
-            request_records: 请求记录列表
-            response_records: 响应记录列表
-            push_data: 推送数据列表（已经按时间排序）
-            
-        Returns:
-            按时间排序的合并列表
-        """
-        # 对请求和响应记录按time字段进行排序（push_data已经在parse_push_data中排序过了）
-        request_records.sort(key=lambda x: x.time or "")
-        response_records.sort(key=lambda x: x.time or "")
-        
-        # 初始化三个指针
-        i, j, k = 0, 0, 0
-        merged_list = []
-        
-        # 获取列表长度
-        len_requests = len(request_records)
-        len_responses = len(response_records)
-        len_push = len(push_data)
-        
-        # 三指针合并算法
-        while i < len_requests and j < len_responses and k < len_push:
-            # 比较三个列表当前元素的时间
-            req_time = request_records[i].time or ""
-            rsp_time = response_records[j].time or ""
-            push_time = push_data[k].time or ""
-            
-            # 找到时间最小的元素
-            if req_time <= rsp_time and req_time <= push_time:
-                merged_list.append(request_records[i])
-                i += 1
-            elif rsp_time <= req_time and rsp_time <= push_time:
-                merged_list.append(response_records[j])
-                j += 1
-            else:
-                merged_list.append(push_data[k])
-                k += 1
-        
-        # 处理剩余的元素
-        # 处理剩余的请求记录
-        while i < len_requests:
-            merged_list.append(request_records[i])
-            i += 1
-        
-        # 处理剩余的响应记录
-        while j < len_responses:
-            merged_list.append(response_records[j])
-            j += 1
-        
-        # 处理剩余的推送数据
-        while k < len_push:
-            merged_list.append(push_data[k])
-            k += 1
-        
-        return merged_list
+        解析日志列表，请求、响应和各类推送分别按时间排序后k路归并
+
+        结果缓存在 state.parsed_log_list 中，之后只处理新增的请求对和推送（跟踪模式下刷新时追加），
+        没有新增内容时直接返回；请求对只在末尾追加，已有的请求对被覆盖时由 reset_log_list 清除缓存
+        """
+        cursor = self.state.log_list_cursor
+        start = cursor.positions.get("req_pairs", 0)
+        cursor.positions["req_pairs"] = len(self.req_pairs)
+        if start == len(self.req_pairs) and start:
+            # 没有新增的请求对，不再跳过已处理的部分
+            new_requests, new_responses = [], []
+        else:
+            new_pairs = itertools.islice(self.req_pairs.items(), start, None) if start else None
+            new_requests, new_responses = self.parse_and_split_request_pairs(new_pairs)
+        new_push = self.parse_push_data(cursor)
+        if not (new_requests or new_responses or new_push) and self.state.parsed_log_list:
+            return
+
+        # 新增的记录接在已排序的记录之后再稳定排序，与一次生成全部记录后排序的结果一致
+        parts = self.state.log_list_parts
+        parts["request"].extend(new_requests)
+        parts["response"].extend(new_responses)
+        for record in new_push:
+            parts[record.push_type].append(record)
+        for records in parts.values():
+            records.sort(key=lambda x: x.time_us)
+
+        self.state.parsed_log_list = list(merge_by_time(*parts.values()))
+        self.state.log_list_index = None
 
-    def _parse_servicename_and_action(self, request: Dict[str, Any], protocol: str) -> Tuple[str, str]:
+    def search_log_list(self, content: str, lo: int = 0,
+                        hi: Optional[int] = None) -> List[Union[ParsedRequestResponse, ParsedPushData]]:
         """
-        解析请求中的servicename和action
-        
+        按内容过滤日志列表，过滤范围较大时先建立内容索引缩小候选范围，索引在日志列表变化前一直复用
+
         Args:
-            request: 请求内容
-            protocol: 协议类型
-            
+            content: 过滤条件，见 text_index.LogQuery
+            lo: 只过滤 parsed_log_list[lo:hi] 范围内的记录
+            hi: 范围的结束位置，为None时到末尾
+
         Returns:
-            (servicename, action) 元组
-        """
-        servicename = ""
-        action = ""
-        
-        try:
-            if protocol == "pb":
-                if "servicename" in json.dumps(request):
-                    servicename = request.get("servicename", "")
-                    if servicename not in [
-                        "asset-product-api", "asset-institution-api", "asset-index-api",
-                        "rpc.authenticate", "rpc.quota", "rpc.order.manager", "rpc.marketdata",
-                        "rpc.trader.stock", "rpc.risk", "rpc.condition", "rpc.grid", "rpc.subcenter",
-                    ]:
-                        action = request.get("params", {}).get("action", "")
-                    else:
-                        action = request.get("method", "")
-            
-            elif protocol == "json":
-                if "servicename" in json.dumps(request):
-                    servicename = request.get("servicename", "")
-                else:
-                    servicename = request.get("method", "")
-                action = request.get("params", {}).get("action", "")
-            
-            elif protocol == "json_funid":
-                servicename = request.get("method", "")
-                action = str(request.get("params", {}).get("FunID", ""))
-        
-        except Exception as e:
-            print(f"解析servicename和action失败: {e}")
-            servicename = ""
-            action = ""
-        
-        return servicename, action
+            满足条件的记录，按时间排序
+        """
+        records = self.state.parsed_log_list
+        hi = len(records) if hi is None else hi
+        # 范围较小时逐条匹配已经足够快，不为此建立索引
+        if self.state.log_list_index is None and hi - lo >= INDEX_MIN_RECORDS:
+            self.state.log_list_index = build_index(records)
+        return filter_records(records, content, self.state.log_list_index, lo, hi)
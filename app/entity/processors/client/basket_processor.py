@@ -5,7 +5,8 @@
 
 from typing import Dict, List, Any, Optional
 import pandas as pd
-from .models import ProcessingState, RequestPairsDict, ProcessingConfig
+from .. import codec
+from .models import ProcessingState, RequestPairsDict, ProcessingConfig, ParseCursor
 from .base_processor import BaseProcessor
 
 class BasketProcessor:
@@ -13,6 +14,8 @@ class BasketProcessor:
     def __init__(self, state: ProcessingState, req_pairs: RequestPairsDict, base_processor: BaseProcessor):
         self.state = state
         self.req_pairs = req_pairs
+        # 已处理到的位置，跟踪模式下再次解析只处理新增部分
+        self.cursor = ParseCursor()
         self.base_processor = base_processor
         self.config = ProcessingConfig()
         print(self.config.columns)
@@ -31,15 +34,12 @@ class BasketProcessor:
         self.basketorder_info: Dict[str, Any] = {}
         # 推送数据
         self.basketorder_push = {}
+        # 篮子订单查询
+        self.basketorder_query_dict: Dict[str, Any] = {}
 
 
     def _get_request_list(self, protocol: str, servicename: str, cmd: str) -> List[str]:
-        request_statics = self.state.request_statics
-        if protocol in request_statics.keys():
-            if servicename in request_statics[protocol].keys():
-                if cmd in request_statics[protocol][servicename].keys():
-                    return [d["key"] for d in request_statics[protocol][servicename][cmd]]
-        return []
+        return self.cursor.new_request_keys(self.state.route_index, protocol, servicename, cmd)
 
     def _get_fund_by_fund_token(self, fund_token: str) -> str:
         if fund_token in self.state.fundtoken_dict.keys():
@@ -51,14 +51,6 @@ class BasketProcessor:
         """
         解析篮子订单相关数据，包括推送
         """
-        self.singleorder_list = []
-        self.singleorder_cancellist = []
-        self.basketorder_list = []
-        self.basketorder_op_list = []
-        self.basketorder_detail_dict = {}
-        self.basketorder_info = {}
-        self.basketorder_push = {}
-        self.basketorder_query_dict = {}
         # 篮子订单查询
         req_list = self._get_request_list("json", "basket", "QryBasketOrder")
         for key in req_list:
@@ -143,9 +135,8 @@ class BasketProcessor:
             self.basketorder_op_list.append(handledata)
         # 推送解析
         if hasattr(self.state, "basketorder_push_raw"):
-            for req_time, raw_response in self.state.basketorder_push_raw:
-                import json
-                response_json = json.loads(raw_response)
+            for req_time, raw_response in self.cursor.new_items("basketorder_push_raw", self.state.basketorder_push_raw):
+                response_json = codec.loads(raw_response)
                 response_dict = response_json["params"]["data"]
                 if "MarketID" in response_dict:
                     MarketID = str(response_dict["MarketID"])
@@ -3,11 +3,17 @@
 整合所有模块，提供统一接口
 """
 
+import threading
 import pandas as pd
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, Tuple
 
+from ..text_index import filter_records
+from ..timeline import parse_time_range, time_slice
 from .base_processor import BaseProcessor
+from .parallel_parse import parse_files
+from .module_scheduler import StageTiming, run_stages
 from .statistics_processor import StatisticsProcessor
+from .latency_processor import LatencyProcessor
 from .account_processor import AccountProcessor
 from .fund_processor import FundProcessor
 from .position_processor import PositionProcessor
@@ -20,16 +26,97 @@ from .condition_processor import ConditionProcessor
 from .financing_processor import FinancingProcessor
 
 
+class LazyModule:
+    """
+    按需解析的模块处理器
+
+    作为ClientProcessorNew的类属性使用：首次访问时创建处理器，先解析依赖的模块，再解析截至当前的请求对和推送；
+    处理器随后保存为同名的实例属性，之后的访问不再经过这里。跟踪模式下刷新只更新已经解析过的模块
+    """
+
+    def __init__(self, create: Callable[["ClientProcessorNew"], Any], parse: Tuple[str, ...],
+                 depends: Tuple[str, ...] = ()):
+        """
+        Args:
+            create: 由主处理器创建模块处理器
+            parse: 模块处理器的解析方法名，按顺序调用，重复调用时只处理新增部分
+            depends: 需要先解析的模块
+        """
+        self.create = create
+        self.parse = parse
+        self.depends = depends
+        self.name = ""
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, processor: Optional["ClientProcessorNew"], owner: Optional[type] = None) -> Any:
+        if processor is None:
+            return self
+        with processor._lock:
+            module = processor.__dict__.get(self.name)
+            if module is None:
+                for name in self.depends:
+                    getattr(processor, name)
+                module = self.create(processor)
+                self._parse(module)
+                processor.__dict__[self.name] = module
+        return module
+
+    def update(self, processor: "ClientProcessorNew") -> None:
+        """
+        模块已经解析过时，解析上次之后新增的部分
+        """
+        module = processor.__dict__.get(self.name)
+        if module is not None:
+            self._parse(module)
+
+    def _parse(self, module: Any) -> None:
+        for name in self.parse:
+            getattr(module, name)()
+
+
 class ClientProcessorNew:
     """重构后的客户端处理器主类"""
 
-    def __init__(self, file_list: List[str], isJupyter: bool = True):
+    # 各模块处理器在首次访问时解析；账户模块提供fund_token映射，其他业务模块都依赖它
+    latency_processor = LazyModule(lambda cp: LatencyProcessor(cp.state, cp.req_pairs), ("parse_latency",))
+    account_processor = LazyModule(lambda cp: AccountProcessor(cp.state, cp.req_pairs), ("parse_account_query",))
+    fund_processor = LazyModule(lambda cp: FundProcessor(cp.state, cp.req_pairs), ("parse_fund_query",),
+                                depends=("account_processor",))
+    position_processor = LazyModule(lambda cp: PositionProcessor(cp.state, cp.req_pairs), ("parse_position_query",),
+                                    depends=("account_processor",))
+    order_processor = LazyModule(lambda cp: OrderProcessor(cp.state, cp.req_pairs), ("parse_order_query",),
+                                 depends=("account_processor",))
+    trade_processor = LazyModule(lambda cp: TradeProcessor(cp.state, cp.req_pairs), ("parse_trade_query",),
+                                 depends=("account_processor",))
+    ipo_processor = LazyModule(lambda cp: IPOProcessor(cp.state, cp.req_pairs),
+                               ("parse_ipo_query", "parse_ipo_lottery_query"), depends=("account_processor",))
+    basket_processor = LazyModule(lambda cp: BasketProcessor(cp.state, cp.req_pairs, cp.base_processor),
+                                  ("parse_basket_query",), depends=("account_processor",))
+    algorithm_processor = LazyModule(lambda cp: AlgorithmProcessor(cp.state, cp.req_pairs), ("parse_algorithm_query",),
+                                     depends=("account_processor",))
+    condition_processor = LazyModule(lambda cp: ConditionProcessor(cp.state, cp.req_pairs, cp.base_processor),
+                                     ("parse_condition_query",), depends=("account_processor",))
+    financing_processor = LazyModule(lambda cp: FinancingProcessor(cp.state, cp.req_pairs), ("parse_financing_query",),
+                                     depends=("account_processor",))
+    # 刷新时按此顺序更新，被依赖的模块在前
+    MODULES = (
+        "latency_processor", "account_processor", "fund_processor", "position_processor", "order_processor",
+        "trade_processor", "ipo_processor", "basket_processor", "algorithm_processor", "condition_processor",
+        "financing_processor",
+    )
+
+    def __init__(self, file_list: List[str], isJupyter: bool = True, follow: bool = False):
         """
         初始化处理器
 
         Args:
-            file_list: 文件内容列表
+            file_list: jupyter模式下为文件路径列表；web模式下为文件内容或上传文件的二进制流
+            follow: 跟踪模式，仅jupyter模式可用；日志仍在写入时，解析后可调用 refresh 只解析新写入的内容
         """
+        if follow and not isJupyter:
+            raise ValueError("跟踪模式只支持jupyter模式的本地日志文件")
         # 设置pandas显示选项
         pd.set_option('display.max_rows', 50)
         pd.set_option('display.max_columns', None)
@@ -44,80 +131,136 @@ class ClientProcessorNew:
         # 存储文件列表
         self.file_list = file_list
 
+        # 跟踪模式下各文件已解析到的字节偏移
+        self.follow = follow
+        self.offsets: Dict[str, int] = {}
+
+        # 模块的解析、刷新和序列化互斥，后台预解析时访问模块会等待正在进行的解析
+        self._lock = threading.RLock()
+        self._warm_up_thread: Optional[threading.Thread] = None
+        # 最近一次预解析中各模块的开始时间和耗时
+        self.module_timings: Dict[str, StageTiming] = {}
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # 锁和线程不能序列化，等正在进行的解析完成后再保存
+        with self._lock:
+            state = self.__dict__.copy()
+        del state["_lock"], state["_warm_up_thread"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+        self._warm_up_thread = None
+
     def parse(self) -> None:
         """
         解析日志文件
         """
-        # 基础解析
-        self.base_processor.parse(self.file_list)
+        if self.follow:
+            # 跟踪模式按完整行解析，记下每个文件解析到的位置
+            for path in self.file_list:
+                self.offsets[path], _ = self.base_processor.parse_tail(path)
+        else:
+            # 基础解析，多个较大的文件在进程池中分别解析后合并
+            parse_files(self.base_processor, self.file_list)
         self.state = self.base_processor.state
         self.req_pairs = self.base_processor.req_pairs
 
-        # 初始化各模块处理器
-        self.statistics_processor = StatisticsProcessor(self.state, self.req_pairs)
-        self.account_processor = AccountProcessor(self.state, self.req_pairs)
-        self.fund_processor = FundProcessor(self.state, self.req_pairs)
-        self.position_processor = PositionProcessor(self.state, self.req_pairs)
-        self.order_processor = OrderProcessor(self.state, self.req_pairs)
-        self.trade_processor = TradeProcessor(self.state, self.req_pairs)
-        self.ipo_processor = IPOProcessor(self.state, self.req_pairs)
-        self.basket_processor = BasketProcessor(self.state, self.req_pairs, self.base_processor)
-        self.algorithm_processor = AlgorithmProcessor(self.state, self.req_pairs)
-        self.condition_processor = ConditionProcessor(self.state, self.req_pairs, self.base_processor)
-        self.financing_processor = FinancingProcessor(self.state, self.req_pairs)
+        # 上传文件的二进制流解析后即释放，避免随session一起序列化
+        self.file_list = [file for file in self.file_list if isinstance(file, str)]
 
-        # 统计处理
-        self.statistics_processor.parse_request_statistics()
+        # 统计处理，遍历请求对时把各模块订阅的请求一并分发；其他模块在首次访问时解析
+        self.statistics_processor = StatisticsProcessor(self.state, self.req_pairs, self.base_processor.config.encoding)
+        self.statistics_processor.subscribe(AccountProcessor.REQUEST_KINDS)
+        self.statistics_processor.subscribe(AlgorithmProcessor.REQUEST_KINDS)
+        with self._lock:
+            for name in self.MODULES:
+                self.__dict__.pop(name, None)
+            self.statistics_processor.parse_request_statistics()
 
-        # 账户查询处理
-        self.account_processor.parse_account_query()
-
-        # 资金查询处理
-        self.fund_processor.parse_fund_query()
+    def refresh(self) -> List[str]:
+        """
+        跟踪模式下解析各文件上次之后新写入的完整行，增量更新请求对、请求统计、推送和已解析模块的结果
 
-        # 持仓查询处理
-        self.position_processor.parse_position_query()
+        耗时与新写入的内容成正比；响应晚于请求写入时，请求对在响应写入后的刷新中补全
 
-        # 委托查询处理
-        self.order_processor.parse_order_query()
+        Returns:
+            本次新增的完整请求对的请求ID列表
+        """
+        if not self.follow:
+            raise ValueError("只有跟踪模式的处理器可以增量刷新")
+        with self._lock:
+            completed = []
+            for path in self.file_list:
+                self.offsets[path], keys = self.base_processor.parse_tail(path, self.offsets.get(path, 0))
+                completed.extend(keys)
 
-        # 成交查询处理
-        self.trade_processor.parse_trade_query()
+            self.statistics_processor.update_request_statistics((key, self.req_pairs[key]) for key in completed)
+            for name in self.MODULES:
+                getattr(type(self), name).update(self)
+        return completed
 
-        # 新股申购查询处理
-        self.ipo_processor.parse_ipo_query()
-        self.ipo_processor.parse_ipo_lottery_query()
+    def warm_up(self, background: bool = True) -> None:
+        """
+        解析尚未访问过的模块，查看之前提前完成
 
-        # 篮子交易查询处理
-        self.basket_processor.parse_basket_query()
+        按各模块声明的依赖依次解析，账户模块在其他业务模块之前；
+        各模块的开始时间和耗时记录在 module_timings 中，可用 show_module_timings 查看
 
-        # 算法交易查询处理
-        self.algorithm_processor.parse_algorithm_query()
+        Args:
+            background: 在后台线程中解析并立即返回，期间访问某个模块会等待它解析完成；
+                web模式下每个请求使用从session读取的副本，后台解析的结果不会保留，只适用于jupyter模式
+        """
+        if background:
+            if self._warm_up_thread is None or not self._warm_up_thread.is_alive():
+                self._warm_up_thread = threading.Thread(target=self.warm_up, args=(False,), daemon=True)
+                self._warm_up_thread.start()
+            return
+        stages = {name: (lambda name=name: getattr(self, name)) for name in self.MODULES}
+        depends = {name: getattr(type(self), name).depends for name in self.MODULES}
+        self.module_timings = run_stages(stages, depends)
 
-        # 条件交易查询处理
-        self.condition_processor.parse_condition_query()
+    def show_module_timings(self) -> pd.DataFrame:
+        """
+        Jupyter友好：显示最近一次预解析中各模块的开始时间和耗时，已经解析过的模块耗时接近0
 
-        # 融资融券相关解析
-        self.financing_processor.parse_financing_query()
+        Returns:
+            各模块耗时DataFrame，按开始时间排列
+        """
+        df = pd.DataFrame([vars(timing) for timing in self.module_timings.values()],
+                          columns=["name", "start", "seconds"])
+        df = df.sort_values("start").reset_index(drop=True)
+        if len(df) > 0:
+            wall = (df["start"] + df["seconds"]).max()
+            print(f"预解析总耗时 {wall:.3f}s，各模块耗时合计 {df['seconds'].sum():.3f}s")
+        return df
 
     def filter_log_list(self, content: str = "", start_time: str = "", end_time: str = "") -> List[Any]:
         """
-        过滤日志列表
+        过滤日志列表，日志列表在首次调用时生成，之后的调用直接复用（跟踪模式下只追加刷新后新增的内容）
+
+        start_time、end_time 为空时该端不限，时间范围和 content 同时指定时返回两者都满足的记录
+
+        content 中 ~ 分隔或条件，各项按子串匹配；以 expr: 开头时另外支持 & 连接与条件，! 开头为不包含，/.../ 为正则表达式，
+        例如 expr:600001&!资金不足~/cond\d+/
         """
         self.base_processor.parse_log_list()
-        if len(self.state.parsed_log_list) == 0:
+        records = self.state.parsed_log_list
+        if len(records) == 0:
             return []
-        result = []
-        if start_time == "" and end_time == "":
-            result = self.state.parsed_log_list
-
-        if start_time != "" and end_time != "":
-            result = [log for log in self.state.parsed_log_list if log.time >= start_time and log.time <= end_time]
-
+        time_range = parse_time_range(start_time, end_time)
+        if time_range is None:
+            # 输入不是日志时间格式时按字符串比较
+            result = [log for log in records
+                      if (start_time == "" or log.time >= start_time) and (end_time == "" or log.time <= end_time)]
+            return filter_records(result, content) if content != "" else result
+
+        # 日志列表按时间排序，二分查找时间范围后只在范围内按内容过滤
+        lo, hi = time_slice(records, *time_range)
         if content != "":
-            subStrList = content.split("~")
-            result = [log for log in self.state.parsed_log_list if any(subStr in log.content for subStr in subStrList)]
-        return result
+            return self.base_processor.search_log_list(content, lo, hi)
+        return records if lo == 0 and hi == len(records) else records[lo:hi]
 
     def show_request_statics(self) -> List[Dict[str, Any]]:
         """
@@ -186,6 +329,22 @@ class ClientProcessorNew:
         """
         return self.account_processor.get_all_accounts()
     
+    def get_request_latency(self, protocol: str = "", servicename: str = "", action: str = "",
+                            top: int = 20) -> Dict[str, Any]:
+        """
+        获取请求耗时分位数、耗时分布和最慢请求
+
+        Args:
+            protocol: 协议类型，为空时不筛选
+            servicename: 服务名称，为空时不筛选
+            action: 动作，为空时不筛选
+            top: 最慢请求的数量
+
+        Returns:
+            耗时统计结果
+        """
+        return self.latency_processor.get_latency_report(protocol, servicename, action, top)
+
     def export_statistics_to_dataframe(self) -> pd.DataFrame:
         """
         导出统计数据到DataFrame
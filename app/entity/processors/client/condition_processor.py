@@ -5,8 +5,9 @@
 
 from typing import Dict, List, Any, Optional
 import pandas as pd
-from .models import ProcessingState, RequestPairsDict, ProcessingConfig
-import json
+from .. import codec
+from . import log_time
+from .models import ProcessingState, RequestPairsDict, ProcessingConfig, ParseCursor
 from .base_processor import BaseProcessor
 
 class ConditionProcessor:
@@ -14,6 +15,8 @@ class ConditionProcessor:
     def __init__(self, state: ProcessingState, req_pairs: RequestPairsDict, base_processor: BaseProcessor):
         self.state = state
         self.req_pairs = req_pairs
+        # 已处理到的位置，跟踪模式下再次解析只处理新增部分
+        self.cursor = ParseCursor()
         self.base_processor = base_processor
         self.gradecondition_create: List[Dict[str, Any]] = []
         self.gradecondition_info: Dict[str, Any] = {}
@@ -27,13 +30,9 @@ class ConditionProcessor:
         解析条件单相关数据，包括推送
         """
         print("开始解析条件单数据...")
-        self.gradecondition_create = []
-        self.gradecondition_info = {}
-        self.gradecondition_push = {}
-        self.gradecondition_query_dict = {}
-        self.query_gradecondition_df = {}
+        route_index = self.state.route_index
         # 1. 新建母单
-        req_list = self.base_processor.get_request_list("json", "rpc.gradecondition", "create_gradecondition")
+        req_list = self.cursor.new_request_keys(route_index, "json", "rpc.gradecondition", "create_gradecondition")
         print(f"找到条件单创建请求数量: {len(req_list)}")
         for key in req_list:
             item = self.req_pairs[key]
@@ -60,7 +59,7 @@ class ConditionProcessor:
         # 2. 母单操作
         operation_cmd = ["delete_gradecondition", "pause_gradecondition", "modify_gradecondition", "activate_gradecondition", "cancel_gradecondition"]
         for action in operation_cmd:
-            operation_reqs = self.base_processor.get_request_list("json", "rpc.gradecondition", action)
+            operation_reqs = self.cursor.new_request_keys(route_index, "json", "rpc.gradecondition", action)
             for request_key in operation_reqs:
                 operation_req = self.req_pairs[request_key]
                 request = operation_req["request"]["params"]
@@ -82,16 +81,16 @@ class ConditionProcessor:
         # 3. 推送数据解析
         # 假设 self.state.gradecondition_push_instruction/condition/order 为推送原始数据列表
         if hasattr(self.state, "gradecondition_push_instruction"):
-            for rsp_time, rsp_data in self.state.gradecondition_push_instruction:
-                pushdata = json.loads(rsp_data)["params"]
+            for rsp_time, rsp_data in self.cursor.new_items("gradecondition_push_instruction", self.state.gradecondition_push_instruction):
+                pushdata = codec.loads(rsp_data)["params"]
                 pushdata["rsp_time"] = rsp_time
                 order_no = pushdata["order_no"]
                 if order_no not in self.gradecondition_push:
                     self.gradecondition_push[order_no] = {"grade_instruction":[],"grade_condition":{},"grade_order":{}}
                 self.gradecondition_push[order_no]["grade_instruction"].append(pushdata)
         if hasattr(self.state, "gradecondition_push_condition"):
-            for rsp_time, rsp_data in self.state.gradecondition_push_condition:
-                pushdata = json.loads(rsp_data)["params"]
+            for rsp_time, rsp_data in self.cursor.new_items("gradecondition_push_condition", self.state.gradecondition_push_condition):
+                pushdata = codec.loads(rsp_data)["params"]
                 pushdata["rsp_time"] = rsp_time
                 order_no = pushdata["order_no"]
                 symbol = pushdata["symbol"]
@@ -101,8 +100,8 @@ class ConditionProcessor:
                     self.gradecondition_push[order_no]["grade_condition"][symbol] = []
                 self.gradecondition_push[order_no]["grade_condition"][symbol].append(pushdata)
         if hasattr(self.state, "gradecondition_push_order"):
-            for rsp_time, rsp_data in self.state.gradecondition_push_order:
-                pushdata = json.loads(rsp_data)["params"]
+            for rsp_time, rsp_data in self.cursor.new_items("gradecondition_push_order", self.state.gradecondition_push_order):
+                pushdata = codec.loads(rsp_data)["params"]
                 order_no = pushdata["order_no"]
                 symbol = pushdata["data"]["SecurityID"]
                 orderdata = pushdata["data"]
@@ -113,9 +112,14 @@ class ConditionProcessor:
                     self.gradecondition_push[order_no]["grade_order"][symbol] = []
                 self.gradecondition_push[order_no]["grade_order"][symbol].append(orderdata)
         # 4. 查询母单
-        self.gradecondition_query_dict = self.base_processor._handle_query_result("json", "rpc.gradecondition", "query_gradecondition", "data")
+        req_list = self.cursor.new_request_keys(route_index, "json", "rpc.gradecondition", "query_gradecondition")
+        query_dict = self.base_processor._handle_query_result("json", "rpc.gradecondition", "query_gradecondition", "data", req_list)
         columns_gradecondition_querydata = ["rsp_time", "fund", "order_from", "order_no", "create_time", "update_time", "status_msg", "price_type", "side", "note"]
-        for rsp_time, query_data in self.gradecondition_query_dict.items():
+        for rsp_time, query_data in query_dict.items():
+            # 同一时间的多次查询只保留第一次
+            if rsp_time in self.gradecondition_query_dict:
+                continue
+            self.gradecondition_query_dict[rsp_time] = query_data
             df_query_gradecondition = ""
             if len(query_data) > 0:
                 df_query_gradecondition = pd.DataFrame(query_data, columns=columns_gradecondition_querydata)
@@ -129,7 +133,7 @@ class ConditionProcessor:
         """
         df_gradecondition_create = pd.DataFrame(self.gradecondition_create, columns=self.config.columns["gradecondition_create"])
         df_gradecondition_create.rename(columns = {"algorithm_type":"algorithm", "start_monitor_time":"开始监控", "end_monitor_time":"结束监控"}, inplace=True)
-        df_gradecondition_create = df_gradecondition_create.sort_values(by='rsp_time', ascending=True).dropna(axis=1, how="all")
+        df_gradecondition_create = df_gradecondition_create.sort_values(by='rsp_time', ascending=True, key=log_time.micros_series).dropna(axis=1, how="all")
 
         gradecondition_operations = []
         for order_no, order_operations in self.gradecondition_info.items():
@@ -137,7 +141,7 @@ class ConditionProcessor:
             for item in operations:
                 gradecondition_operations.append(item)
         df_gradecondition_operations = pd.DataFrame(gradecondition_operations, columns=self.config.columns["gradecondition_operate"])
-        df_gradecondition_operations = df_gradecondition_operations.sort_values(by='rsp_time', ascending=True).dropna(axis=1, how="all")
+        df_gradecondition_operations = df_gradecondition_operations.sort_values(by='rsp_time', ascending=True, key=log_time.micros_series).dropna(axis=1, how="all")
         if len(gradecondition_operations) > 0:
             df_gradecondition_operations["action"] = df_gradecondition_operations["action"].apply(lambda x: x.split('_')[0])
         return {
@@ -197,7 +201,7 @@ class ConditionProcessor:
             # 母单操作
             operations = self.gradecondition_info[order_no]["operations"]
             df_gradecondition_operations = pd.DataFrame(operations, columns=self.config.columns["gradecondition_operate"])
-            df_gradecondition_operations = df_gradecondition_operations.sort_values(by='rsp_time', ascending=True).dropna(axis=1, how="all")
+            df_gradecondition_operations = df_gradecondition_operations.sort_values(by='rsp_time', ascending=True, key=log_time.micros_series).dropna(axis=1, how="all")
             if len(operations) > 0:
                 df_gradecondition_operations["action"] = df_gradecondition_operations["action"].apply(lambda x: x.split('_')[0])
             # 处理NaN值，转换为None
@@ -309,7 +313,7 @@ class ConditionProcessor:
         if order_no in self.gradecondition_info:
             req_id = self.gradecondition_info[order_no]["req_id"]
         if req_id != "" and req_id in self.req_pairs:
-            return self.req_pairs[req_id]
+            return self.req_pairs[req_id].to_dict()
         return None
 
     def get_querycondition_data(self, querytime: str =  None) -> Any:
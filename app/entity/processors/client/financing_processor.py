@@ -3,7 +3,7 @@
 负责融资融券相关的日志解析、数据处理与展示
 """
 from typing import Dict, List, Any, Optional
-from .models import ProcessingState, RequestPairsDict
+from .models import ProcessingState, RequestPairsDict, ParseCursor
 
 class FinancingProcessor:
     """
@@ -12,6 +12,8 @@ class FinancingProcessor:
     def __init__(self, state: ProcessingState, req_pairs: RequestPairsDict):
         self.state = state
         self.req_pairs = req_pairs
+        # 已处理到的位置，跟踪模式下再次解析只处理新增部分
+        self.cursor = ParseCursor()
         # 可融资标的券
         self.finable_security_dict: Dict[str, Dict[str, Any]] = {}
         self.finable_querytime_reqid: Dict[str, str] = {}
@@ -21,9 +23,6 @@ class FinancingProcessor:
         """
         解析可融资标的券相关数据
         """
-        self.finable_security_dict = {}
-        self.finable_querytime_reqid = {}
-        self.finable_security_failed = []
         rzrq_reqlist = self._get_request_list("json_funid", "stockrzrq", "501005")
         for key in rzrq_reqlist:
             value = self.req_pairs[key]
@@ -56,17 +55,7 @@ class FinancingProcessor:
                 self.finable_security_failed.append(result)
 
     def _get_request_list(self, protocol: str, servicename: str, cmd: str) -> List[str]:
-        request_statics = self.state.request_statics
-        if protocol in request_statics.keys():
-            if servicename in request_statics[protocol].keys():
-                if cmd in request_statics[protocol][servicename].keys():
-                    return [d["key"] for d in request_statics[protocol][servicename][cmd]]
-                else:
-                    return []
-            else:
-                return []
-        else:
-            return []
+        return self.cursor.new_request_keys(self.state.route_index, protocol, servicename, cmd)
 
     def _get_fund_by_fund_token(self, fund_token: str) -> str:
         return self.state.fundtoken_dict.get(fund_token, fund_token)
@@ -85,7 +74,12 @@ class FinancingProcessor:
         querydatadict = self.finable_security_dict.get(fundkey, {})
         querytime_list = list(querydatadict.keys())
         # 按时间倒序排列
-        sorted_querytime_list = sorted(querytime_list, key=lambda item: item.split('|')[0], reverse=True)
+        # 按解析时转换好的响应时间微秒数排序
+        sorted_querytime_list = sorted(
+            querytime_list,
+            key=lambda item: self.req_pairs[self.finable_querytime_reqid[item.split('|')[0]]].rsp_micros,
+            reverse=True,
+        )
         if not sorted_querytime_list:
             sorted_querytime_list.append("空")
         return sorted_querytime_list 
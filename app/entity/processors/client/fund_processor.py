@@ -6,7 +6,7 @@
 from typing import Dict, List, Any, Optional
 import pandas as pd
 
-from .models import FundQueryResult, ProcessingState, RequestPairsDict
+from .models import FundQueryResult, ProcessingState, RequestPairsDict, ParseCursor
 
 
 class FundProcessor:
@@ -15,6 +15,8 @@ class FundProcessor:
     def __init__(self, state: ProcessingState, req_pairs: RequestPairsDict):
         self.state = state
         self.req_pairs = req_pairs
+        # 已处理到的位置，跟踪模式下再次解析只处理新增部分
+        self.cursor = ParseCursor()
         
         # 资金查询数据存储
         self.query_account_asset_dict = {}
@@ -138,7 +140,7 @@ class FundProcessor:
     
     def _get_request_list(self, protocol: str, servicename: str, cmd: str) -> List[str]:
         """
-        获取请求列表
+        获取上次解析之后新增的请求列表
         
         Args:
             protocol: 协议类型
@@ -148,18 +150,8 @@ class FundProcessor:
         Returns:
             请求ID列表
         """
-        request_statics = self.state.request_statics
-        if protocol in request_statics.keys():
-            if servicename in request_statics[protocol].keys():
-                if cmd in request_statics[protocol][servicename].keys():
-                    return [d["key"] for d in request_statics[protocol][servicename][cmd]]
-                else:
-                    return []
-            else:
-                return []
-        else:
-            return []
-    
+        return self.cursor.new_request_keys(self.state.route_index, protocol, servicename, cmd)
+
     def _get_fund_by_fund_token(self, fund_token: str) -> str:
         """
         根据fund_token获取账户名称
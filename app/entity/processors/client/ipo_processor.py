@@ -5,13 +5,15 @@
 
 from typing import Dict, List, Any, Optional
 
-from .models import ProcessingState, RequestPairsDict
+from .models import ProcessingState, RequestPairsDict, ParseCursor
 
 class IPOProcessor:
     """新股申购处理器类"""
     def __init__(self, state: ProcessingState, req_pairs: RequestPairsDict):
         self.state = state
         self.req_pairs = req_pairs
+        # 已处理到的位置，跟踪模式下再次解析只处理新增部分
+        self.cursor = ParseCursor()
         self.ipo_query_list: List[Dict[str, Any]] = []
         self.ipo_lottery_list: List[Dict[str, Any]] = []
 
@@ -19,7 +21,6 @@ class IPOProcessor:
         """
         解析新股申购额度查询
         """
-        self.ipo_query_list = []
         for protocol, service, funid in [
             ("json_funid", "stockths", "503002"),
             ("json_funid", "stockrzrq", "501022")
@@ -59,7 +60,6 @@ class IPOProcessor:
         """
         解析新股中签明细查询
         """
-        self.ipo_lottery_list = []
         for protocol, service, funid in [
             ("json_funid", "stockths", "503003"),
             ("json_funid", "stockrzrq", "501023")
@@ -96,12 +96,7 @@ class IPOProcessor:
                 self.ipo_lottery_list.append(query)
 
     def _get_request_list(self, protocol: str, servicename: str, cmd: str) -> List[str]:
-        request_statics = self.state.request_statics
-        if protocol in request_statics.keys():
-            if servicename in request_statics[protocol].keys():
-                if cmd in request_statics[protocol][servicename].keys():
-                    return [d["key"] for d in request_statics[protocol][servicename][cmd]]
-        return []
+        return self.cursor.new_request_keys(self.state.route_index, protocol, servicename, cmd)
 
     def _get_fund_by_fund_token(self, fund_token: str) -> str:
         if fund_token in self.state.fundtoken_dict.keys():
@@ -0,0 +1,174 @@
+"""
+请求耗时处理器模块
+负责按路由统计请求到响应的耗时，提供分位数、耗时分布和最慢请求
+"""
+
+from typing import Dict, List, Any
+import numpy as np
+
+from . import log_time
+from .models import ProcessingState, RequestPair, RequestPairsDict, ParseCursor, RouteKey
+
+# 耗时分布的区间上界（毫秒），最后一个区间没有上界
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+_BUCKET_EDGES_US = np.array(LATENCY_BUCKETS_MS, dtype=np.int64) * 1000
+PERCENTILES = (50, 90, 99)
+
+
+class LatencyProcessor:
+    """请求耗时处理器类"""
+
+    def __init__(self, state: ProcessingState, req_pairs: RequestPairsDict):
+        self.state = state
+        self.req_pairs = req_pairs
+        # 已处理到的位置，跟踪模式下再次解析只处理新增部分
+        self.cursor = ParseCursor()
+        # 各路由的耗时（微秒）和对应的请求ID，顺序一致；请求或响应时间无法解析的请求对不计入
+        self.rtt_us: Dict[RouteKey, np.ndarray] = {}
+        self.rtt_req_ids: Dict[RouteKey, List[str]] = {}
+
+    def parse_latency(self) -> None:
+        """
+        按路由索引计算新增请求对的耗时，需在请求统计之后调用
+        """
+        route_index = self.state.route_index
+        for route in route_index:
+            keys = self.cursor.new_request_keys(route_index, *route)
+            if keys:
+                self._append(route, keys)
+
+    def _append(self, route: RouteKey, keys: List[str]) -> None:
+        """
+        计算一批请求对的耗时并追加到路由的耗时数组
+
+        Args:
+            route: 路由
+            keys: 请求ID列表
+        """
+        pairs = [self.req_pairs[key] for key in keys]
+        req_us, rsp_us = RequestPair.micros_arrays(pairs)
+        valid = (req_us != log_time.UNKNOWN_MICROS) & (rsp_us != log_time.UNKNOWN_MICROS)
+        rtt = (rsp_us - req_us)[valid]
+        if not valid.all():
+            keys = [key for key, ok in zip(keys, valid.tolist()) if ok]
+        if route in self.rtt_us:
+            self.rtt_us[route] = np.concatenate((self.rtt_us[route], rtt))
+            self.rtt_req_ids[route].extend(keys)
+        else:
+            self.rtt_us[route] = rtt
+            self.rtt_req_ids[route] = keys
+
+    def _select_routes(self, protocol: str = "", servicename: str = "", action: str = "") -> List[RouteKey]:
+        """
+        按协议、服务名、动作筛选路由，为空的条件不筛选
+        """
+        return [
+            route for route in self.rtt_us
+            if (not protocol or route[0] == protocol)
+            and (not servicename or route[1] == servicename)
+            and (not action or route[2] == action)
+        ]
+
+    def get_latency_summary(self, protocol: str = "", servicename: str = "", action: str = "") -> List[Dict[str, Any]]:
+        """
+        获取各路由的耗时分位数
+
+        Args:
+            protocol: 协议类型，为空时不筛选
+            servicename: 服务名称，为空时不筛选
+            action: 动作，为空时不筛选
+
+        Returns:
+            各路由的请求数、平均、p50/p90/p99和最大耗时（毫秒），按p99从大到小排列
+        """
+        summary = []
+        for route in self._select_routes(protocol, servicename, action):
+            rtt = self.rtt_us[route]
+            if len(rtt) == 0:
+                continue
+            percentiles = np.percentile(rtt, PERCENTILES) / 1000
+            item = {
+                "protocol": route[0],
+                "servicename": route[1],
+                "action": route[2],
+                "counts": int(len(rtt)),
+                "avg_ms": round(float(rtt.mean()) / 1000, 3),
+            }
+            for percentile, value in zip(PERCENTILES, percentiles.tolist()):
+                item[f"p{percentile}_ms"] = round(value, 3)
+            item["max_ms"] = round(int(rtt.max()) / 1000, 3)
+            summary.append(item)
+        summary.sort(key=lambda item: item["p99_ms"], reverse=True)
+        return summary
+
+    def get_latency_histogram(self, protocol: str = "", servicename: str = "", action: str = "") -> List[Dict[str, Any]]:
+        """
+        获取筛选出的路由合计的耗时分布
+
+        Returns:
+            按LATENCY_BUCKETS_MS划分的各区间请求数，le_ms为区间上界（含），最后一个区间为None
+        """
+        counts = np.zeros(len(_BUCKET_EDGES_US) + 1, dtype=np.int64)
+        for route in self._select_routes(protocol, servicename, action):
+            buckets = np.searchsorted(_BUCKET_EDGES_US, self.rtt_us[route], side="left")
+            counts += np.bincount(buckets, minlength=len(counts))
+        edges = list(LATENCY_BUCKETS_MS) + [None]
+        return [{"le_ms": edge, "count": int(count)} for edge, count in zip(edges, counts.tolist())]
+
+    def get_slowest_requests(self, top: int = 20, protocol: str = "", servicename: str = "",
+                             action: str = "") -> List[Dict[str, Any]]:
+        """
+        获取筛选出的路由中耗时最长的请求
+
+        Args:
+            top: 返回的请求数
+
+        Returns:
+            按耗时从大到小排列的请求ID、路由、请求/响应时间和耗时（毫秒）
+        """
+        routes = [route for route in self._select_routes(protocol, servicename, action) if len(self.rtt_us[route])]
+        if not routes or top <= 0:
+            return []
+        rtt = np.concatenate([self.rtt_us[route] for route in routes])
+        # 各路由在合并数组中的起始位置，用于由下标找回路由
+        starts = np.cumsum([0] + [len(self.rtt_us[route]) for route in routes[:-1]])
+        top = min(top, len(rtt))
+        indexes = np.argpartition(rtt, len(rtt) - top)[len(rtt) - top:]
+        indexes = indexes[np.argsort(rtt[indexes], kind="stable")[::-1]]
+
+        result = []
+        for index in indexes.tolist():
+            route_no = int(np.searchsorted(starts, index, side="right")) - 1
+            route = routes[route_no]
+            req_id = self.rtt_req_ids[route][index - int(starts[route_no])]
+            pair = self.req_pairs[req_id]
+            result.append({
+                "req_id": req_id,
+                "protocol": route[0],
+                "servicename": route[1],
+                "action": route[2],
+                "req_time": pair.req_time,
+                "rsp_time": pair.rsp_time,
+                "rtt_ms": round(int(rtt[index]) / 1000, 3),
+            })
+        return result
+
+    def get_latency_report(self, protocol: str = "", servicename: str = "", action: str = "",
+                           top: int = 20) -> Dict[str, Any]:
+        """
+        获取耗时分位数、耗时分布和最慢请求
+
+        Args:
+            protocol: 协议类型，为空时不筛选
+            servicename: 服务名称，为空时不筛选
+            action: 动作，为空时不筛选
+            top: 最慢请求的数量
+
+        Returns:
+            {"summary": 各路由分位数, "histogram": 耗时分布, "slowest": 最慢请求}
+        """
+        return {
+            "summary": self.get_latency_summary(protocol, servicename, action),
+            "histogram": self.get_latency_histogram(protocol, servicename, action),
+            "slowest": self.get_slowest_requests(top, protocol, servicename, action),
+        }
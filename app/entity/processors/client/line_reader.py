@@ -0,0 +1,148 @@
+"""
+日志行读取模块
+按固定大小分块读取二进制流，增量解码后逐行产出，内存占用与日志大小无关；
+大文件可按换行对齐切分为多个字节范围，分别读取
+"""
+
+import codecs
+import os
+from typing import BinaryIO, Iterator, List, Tuple
+
+
+class ByteRangeReader:
+    """把文件限定为 [start, end) 字节范围的只读流"""
+
+    def __init__(self, file: BinaryIO, start: int, end: int):
+        file.seek(start)
+        self._file = file
+        self._left = end - start
+
+    def read(self, size: int = -1) -> bytes:
+        if self._left <= 0:
+            return b""
+        if size < 0 or size > self._left:
+            size = self._left
+        data = self._file.read(size)
+        self._left -= len(data)
+        return data
+
+
+def split_line_ranges(path: str, parts: int) -> List[Tuple[int, int]]:
+    """
+    把文件按字节大致等分，每个边界后移到下一个换行符之后，保证不切断日志行
+
+    gb2312、gbk、utf-8编码的多字节字符中不会出现换行符的字节，按字节对齐不会切断字符
+
+    Args:
+        path: 文件路径
+        parts: 期望的分段数
+
+    Returns:
+        [(起始字节, 结束字节), ...]，首尾相接覆盖整个文件，行很长时实际分段数可能更少
+    """
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, "rb") as f:
+        for i in range(1, parts):
+            target = size * i // parts
+            if target <= bounds[-1]:
+                continue
+            f.seek(target - 1)
+            # 从目标位置前一个字节开始读到行尾，目标位置恰好是行首时边界不动
+            f.readline()
+            bound = f.tell()
+            if bounds[-1] < bound < size:
+                bounds.append(bound)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def find_lines_end(file: BinaryIO, start: int, end: int, chunk_size: int = 64 * 1024) -> int:
+    """
+    查找 [start, end) 字节范围内最后一个换行符之后的位置，用于跳过正在写入的半行
+
+    Args:
+        file: 以二进制方式打开的文件
+        start: 范围起点
+        end: 范围终点
+        chunk_size: 从后向前每次读取的字节数
+
+    Returns:
+        最后一个完整行的结束位置，范围内没有换行符时返回start
+    """
+    while end > start:
+        begin = max(start, end - chunk_size)
+        file.seek(begin)
+        newline = file.read(end - begin).rfind(b"\n")
+        if newline >= 0:
+            return begin + newline + 1
+        end = begin
+    return start
+
+
+def iter_stream_lines(stream: BinaryIO, encoding: str = "gb2312", chunk_size: int = 1024 * 1024,
+                      keep_empty_tail: bool = False) -> Iterator[str]:
+    """
+    分块读取二进制流并逐行产出
+
+    行尾不含换行符；流以换行结尾时，换行之后的空段默认不产出，与以文本方式逐行读取文件一致
+
+    Args:
+        stream: 二进制流（request.stream、上传的临时文件、本地文件或其中的一段字节范围）
+        encoding: 日志编码
+        chunk_size: 每次读取的字节数
+        keep_empty_tail: 末尾的空段也产出，与 str.split("\\n") 的切分结果一致；
+            按换行切分出的中间分段以换行结尾，不应产出
+
+    Returns:
+        日志行迭代器
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="ignore")
+    pending = ""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        lines = (pending + decoder.decode(chunk)).split("\n")
+        # 最后一段可能是被截断的半行，留到下一块拼接
+        pending = lines.pop()
+        yield from lines
+    pending += decoder.decode(b"", final=True)
+    if pending or keep_empty_tail:
+        yield pending
+
+
+def iter_stream_line_refs(stream: BinaryIO, offset: int = 0, encoding: str = "gb2312",
+                          chunk_size: int = 1024 * 1024) -> Iterator[Tuple[str, int, int]]:
+    """
+    分块读取本地文件的二进制流，逐行产出文本和该行在文件中的位置
+
+    按字节切分后逐行解码，换行符不会出现在多字节字符中；与以文本方式读取文件一样，
+    CRLF行尾的\r不计入行内容，诊断列表中记录的行与LF行尾的日志一致，文件以换行结尾时不产出之后的空段
+
+    Args:
+        stream: 本地文件或其中一段字节范围的二进制流
+        offset: 流的起点在文件中的字节偏移
+        encoding: 日志编码
+        chunk_size: 每次读取的字节数
+
+    Returns:
+        (行文本, 字节偏移, 字节长度) 迭代器，行文本和长度均不含行尾的换行符
+    """
+    pending = b""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            size = len(line)
+            if line.endswith(b"\r"):
+                line = line[:-1]
+            yield line.decode(encoding, errors="ignore"), offset, len(line)
+            offset += size + 1
+    if pending:
+        if pending.endswith(b"\r"):
+            pending = pending[:-1]
+        yield pending.decode(encoding, errors="ignore"), offset, len(pending)
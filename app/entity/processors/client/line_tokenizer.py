@@ -0,0 +1,65 @@
+"""
+日志行头部分词模块
+一次扫描定位头部字段和请求/响应内容起始位置，内容只返回偏移量，不做整行split
+
+日志行格式：
+    线程号|时间|request/response|日志级别|请求ID|url...&send={...}
+"""
+
+import re
+from typing import Tuple
+
+# 行类型
+LINE_NORMAL = 0
+LINE_NEW_TRANSMIT = 1
+LINE_TIMEOUT = 2
+LINE_SKIPPED = 3
+LINE_MALFORMED = 4
+
+# 各类型对应的内容标记
+PAYLOAD_MARKERS = {
+    "request": "&send=",
+    "response": "&recv=",
+}
+
+# 头部字段：线程号|时间|类型|日志级别|请求ID，请求ID截止到第五个分隔符或行尾
+_HEADER_PATTERN = re.compile(r"[^|]*\|([^|]*)\|([^|]*)\|[^|]*\|([^|]*)")
+
+LineTokens = Tuple[int, str, str, str, int]
+
+_NO_HEADER = ("", "", "", -1)
+
+
+def tokenize_line(line: str) -> LineTokens:
+    """
+    一次扫描定位日志行头部字段和内容起始位置
+
+    特殊标记（new_transmit_、|timeout|）与原实现一样在整行中查找；
+    头部字段由预编译正则匹配得到，内容标记从请求ID之后查找，不对整行做split
+
+    Args:
+        line: 日志行
+
+    Returns:
+        (行类型, 时间, 类型, 请求ID, 内容起始位置)
+        请求ID截止到第五个分隔符，没有时截止到行尾；没有内容标记时内容起始位置为-1；
+        特殊行、跳过和分隔符不足的行不返回头部字段
+    """
+    if "new_transmit_" in line:
+        return (LINE_NEW_TRANSMIT,) + _NO_HEADER
+    if "|timeout|" in line:
+        return (LINE_TIMEOUT,) + _NO_HEADER
+    match = _HEADER_PATTERN.match(line)
+    if match is None:
+        if "|" not in line:
+            return (LINE_SKIPPED,) + _NO_HEADER
+        return (LINE_MALFORMED,) + _NO_HEADER
+
+    req_time, req_type, req_id = match.groups()
+    marker = PAYLOAD_MARKERS.get(req_type)
+    if marker is None:
+        return LINE_NORMAL, req_time, req_type, req_id, -1
+    payload_start = line.find(marker, match.end())
+    if payload_start >= 0:
+        payload_start += len(marker)
+    return LINE_NORMAL, req_time, req_type, req_id, payload_start
@@ -0,0 +1,193 @@
+"""
+日志时间转换模块
+日志时间形如 20250415 09:03:21.058，解析时转换为从1970-01-01 00:00:00起算的微秒整数（按日志中的本地时间计算，不做时区换算），
+排序和范围比较直接使用整数，展示时再还原为原格式的字符串
+"""
+
+import re
+from datetime import date
+from typing import Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+LOG_TIME_FORMAT = "%Y%m%d %H:%M:%S.%f"
+# 无法解析的时间对应的整数，排在所有时间之前
+UNKNOWN_MICROS = -1
+
+_MICROS_PER_DAY = 86400 * 1000000
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+# 精确到毫秒的标准格式，只有这种格式的时间能从整数还原为相同的字符串
+_CANONICAL = re.compile(r"(\d{8}) ([01]\d|2[0-3]):([0-5]\d):([0-5]\d)\.(\d{3})")
+# 范围查询等输入允许省略或延长小数部分
+_LOOSE = re.compile(r"(\d{8}) ([01]\d|2[0-3]):([0-5]\d):([0-5]\d)(?:\.(\d{1,6}))?")
+
+# 操作日志的时间，毫秒和微秒以冒号分隔，形如 20250415 09:03:21:058:965
+_OPERATION = re.compile(r"(\d{8}) ([01]\d|2[0-3]):([0-5]\d):([0-5]\d):(\d{3})(?::(\d{3}))?")
+
+# 日期部分的取值很少，按日期缓存当天零点的微秒数和日期字符串
+_DAY_MICROS = {}
+_DAY_TEXT = {}
+# 相邻日志行大多落在同一秒内，按精确到秒的前缀缓存微秒数，超过上限时清空
+_SECOND_MICROS = {}
+_SECOND_CACHE_LIMIT = 65536
+
+LogTime = Union[int, str]
+
+
+def _day_micros(day: str) -> Optional[int]:
+    micros = _DAY_MICROS.get(day)
+    if micros is None and day not in _DAY_MICROS:
+        try:
+            ordinal = date(int(day[:4]), int(day[4:6]), int(day[6:])).toordinal()
+        except ValueError:
+            micros = None
+        else:
+            micros = (ordinal - _EPOCH_ORDINAL) * _MICROS_PER_DAY
+            _DAY_TEXT[micros // _MICROS_PER_DAY] = day
+        _DAY_MICROS[day] = micros
+    return micros
+
+
+def _to_micros(match: "re.Match") -> Optional[int]:
+    day, hour, minute, second, fraction = match.groups()
+    midnight = _day_micros(day)
+    if midnight is None:
+        return None
+    micros = midnight + ((int(hour) * 60 + int(minute)) * 60 + int(second)) * 1000000
+    if fraction:
+        micros += int(fraction.ljust(6, "0"))
+    return micros
+
+
+def pack(text: str) -> LogTime:
+    """
+    把日志中的时间转换为存储形式
+
+    Args:
+        text: 日志时间
+
+    Returns:
+        标准格式的时间为微秒整数，其他内容（空字符串、格式不同的时间）原样返回
+    """
+    if len(text) != 21 or text[17] != ".":
+        return text
+    millis = text[18:]
+    if not (millis.isascii() and millis.isdigit()):
+        return text
+    prefix = text[:17]
+    base = _SECOND_MICROS.get(prefix)
+    if base is None:
+        match = _CANONICAL.fullmatch(prefix + ".000")
+        base = None if match is None else _to_micros(match)
+        if base is None:
+            return text
+        if len(_SECOND_MICROS) >= _SECOND_CACHE_LIMIT:
+            _SECOND_MICROS.clear()
+        _SECOND_MICROS[prefix] = base
+    return base + int(millis) * 1000
+
+
+def render(value: LogTime) -> str:
+    """
+    把存储形式还原为日志中的时间字符串
+
+    Args:
+        value: pack的结果
+
+    Returns:
+        时间字符串
+    """
+    if isinstance(value, str):
+        return value
+    day, rest = divmod(value, _MICROS_PER_DAY)
+    text = _DAY_TEXT.get(day)
+    if text is None:
+        text = date.fromordinal(day + _EPOCH_ORDINAL).strftime("%Y%m%d")
+        _DAY_TEXT[day] = text
+    seconds, micros = divmod(rest, 1000000)
+    minutes, second = divmod(seconds, 60)
+    hour, minute = divmod(minutes, 60)
+    return "%s %02d:%02d:%02d.%03d" % (text, hour, minute, second, micros // 1000)
+
+
+def micros_of(value: LogTime) -> int:
+    """
+    获取存储形式对应的微秒数
+
+    Args:
+        value: pack的结果
+
+    Returns:
+        微秒数，无法解析时为UNKNOWN_MICROS
+    """
+    if isinstance(value, str):
+        micros = to_micros(value)
+        return UNKNOWN_MICROS if micros is None else micros
+    return value
+
+
+def micros_array(values: Sequence[LogTime]) -> np.ndarray:
+    """
+    批量获取存储形式对应的微秒数
+
+    Args:
+        values: pack的结果列表
+
+    Returns:
+        int64数组，无法解析的时间为UNKNOWN_MICROS
+    """
+    if all(type(value) is int for value in values):
+        return np.array(values, dtype=np.int64)
+    return np.fromiter((micros_of(value) for value in values), dtype=np.int64, count=len(values))
+
+
+def to_micros(text: str) -> Optional[int]:
+    """
+    把时间字符串转换为微秒数，小数部分可以省略或为1到6位
+
+    Args:
+        text: 时间字符串
+
+    Returns:
+        微秒数，格式不符时返回None
+    """
+    match = _LOOSE.fullmatch(text.strip()) if text else None
+    return None if match is None else _to_micros(match)
+
+
+def operation_micros(text: str) -> int:
+    """
+    把操作日志的时间转换为微秒数，用于与客户端日志按时间合并
+
+    Args:
+        text: 操作日志时间，形如 20250415 09:03:21:058:965，微秒部分可以省略
+
+    Returns:
+        微秒数，格式不符时为UNKNOWN_MICROS
+    """
+    match = _OPERATION.fullmatch(text.strip()) if text else None
+    if match is None:
+        return UNKNOWN_MICROS
+    day, hour, minute, second, millis, micros = match.groups()
+    midnight = _day_micros(day)
+    if midnight is None:
+        return UNKNOWN_MICROS
+    return (midnight + ((int(hour) * 60 + int(minute)) * 60 + int(second)) * 1000000
+            + int(millis) * 1000 + int(micros or 0))
+
+
+def micros_series(values: pd.Series) -> pd.Series:
+    """
+    批量把时间字符串列转换为微秒数，可直接作为 DataFrame.sort_values 的key
+
+    Args:
+        values: 时间字符串列
+
+    Returns:
+        同索引的int64列，无法解析的时间为UNKNOWN_MICROS
+    """
+    parsed = pd.to_datetime(values, format=LOG_TIME_FORMAT, errors="coerce")
+    micros = parsed.to_numpy(dtype="datetime64[us]").astype(np.int64)
+    micros[parsed.isna().to_numpy()] = UNKNOWN_MICROS
+    return pd.Series(micros, index=values.index, name=values.name)
@@ -3,18 +3,276 @@
 定义日志解析处理过程中使用的各种数据结构
 """
 
-from typing import Dict, List, Optional, Any, Union
+import os
+import re
+from collections.abc import MutableMapping
+from typing import Dict, Iterable, List, Optional, Any, Sequence, Union, Tuple
 from dataclasses import dataclass
 
+from .. import codec
+from . import log_time
+from .raw_lines import RawLineList, RawLineStore
+from .route_scan import scan_route_fields, classify_route, classify_request
 
-@dataclass
-class RequestPair:
-    """请求对数据结构"""
-    request: Dict[str, Any]
-    response: Dict[str, Any]
-    req_time: str
-    rsp_time: str
-    protocol: str
+# 序列化后长度不超过2的内容：{}、[]、""以及一位整数，视为空内容
+_EMPTY_PAYLOAD = re.compile(r'\s*(?:\{\s*\}|\[\s*\]|""|-?\d)\s*')
+
+
+class RequestPair(MutableMapping):
+    """
+    请求对数据结构
+
+    请求/响应内容保存日志中的原始文本，首次通过 pair["request"] / pair["response"] 访问时才解码并缓存解码结果，
+    原文在解码后仍然保留，日志列表的内容和按内容匹配始终使用原文，不随是否解码过而变化；
+    请求的路由字段在写入时定向扫描，统计和分类不需要解码
+
+    请求对数量与日志行数同级，字段全部放在__slots__中，不为每个请求对创建实例字典和存放原文/解码结果的字典；
+    请求/响应时间写入时转换为微秒整数保存（见log_time.pack），读取 req_time / rsp_time 时再还原为字符串
+    """
+
+    __slots__ = ("_req_time", "_rsp_time", "protocol", "route_fields", "_request_raw", "_response_raw",
+                 "_request_value", "_response_value", "route_key")
+
+    PAYLOAD_KEYS = ("request", "response")
+    FIELD_KEYS = ("request", "response", "req_time", "rsp_time", "protocol")
+    # 请求/响应对应的原文和解码结果字段，解码结果为None表示尚未解码
+    _RAW_SLOTS = {"request": "_request_raw", "response": "_response_raw"}
+    _VALUE_SLOTS = {"request": "_request_value", "response": "_response_value"}
+
+    def __init__(self):
+        self._req_time = ""
+        self._rsp_time = ""
+        self.protocol = ""
+        self.route_fields = None
+        # 登记到路由索引后的 (协议, 服务名, 动作)，同一路由的请求对共用一个元组
+        self.route_key = None
+        self._request_raw = ""
+        self._response_raw = ""
+        self._request_value = None
+        self._response_value = None
+
+    def __getstate__(self) -> Tuple[Any, ...]:
+        # 按字段顺序保存为元组，序列化结果比默认的 (None, 字段字典) 更小
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state: Tuple[Any, ...]) -> None:
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    @property
+    def req_time(self) -> str:
+        return log_time.render(self._req_time)
+
+    @req_time.setter
+    def req_time(self, value: str) -> None:
+        self._req_time = log_time.pack(value)
+
+    @property
+    def rsp_time(self) -> str:
+        return log_time.render(self._rsp_time)
+
+    @rsp_time.setter
+    def rsp_time(self, value: str) -> None:
+        self._rsp_time = log_time.pack(value)
+
+    @property
+    def req_micros(self) -> int:
+        """请求时间的微秒数，无法解析时为log_time.UNKNOWN_MICROS"""
+        return log_time.micros_of(self._req_time)
+
+    @property
+    def rsp_micros(self) -> int:
+        """响应时间的微秒数，无法解析时为log_time.UNKNOWN_MICROS"""
+        return log_time.micros_of(self._rsp_time)
+
+    @staticmethod
+    def micros_arrays(pairs: Sequence["RequestPair"]) -> Tuple[Any, Any]:
+        """
+        批量获取请求/响应时间的微秒数，用于耗时等向量化计算
+
+        Args:
+            pairs: 请求对列表
+
+        Returns:
+            (请求时间数组, 响应时间数组)，均为int64数组，无法解析的时间为log_time.UNKNOWN_MICROS
+        """
+        return (log_time.micros_array([pair._req_time for pair in pairs]),
+                log_time.micros_array([pair._rsp_time for pair in pairs]))
+
+    def raw_text(self, req_type: str) -> str:
+        """
+        获取写入时的原文，未写入时为空字符串
+
+        Args:
+            req_type: request或response
+        """
+        return getattr(self, self._RAW_SLOTS[req_type])
+
+    def payload_length(self, req_type: str, encoding: str = "gb2312") -> int:
+        """
+        写入时原文按日志编码的字节数，不需要重新序列化
+
+        Args:
+            req_type: request或response
+            encoding: 日志编码
+
+        Returns:
+            原文的字节数
+        """
+        raw = getattr(self, self._RAW_SLOTS[req_type])
+        # 纯ASCII的原文字节数等于字符数，不需要编码
+        if raw.isascii():
+            return len(raw)
+        return len(raw.encode(encoding, errors="ignore"))
+
+    def set_payload(self, req_type: str, raw: str, decoded: Any = None) -> None:
+        """
+        写入请求或响应原文
+
+        Args:
+            req_type: request或response
+            raw: 内容原文
+            decoded: 已解码的内容，为None时延迟到首次访问再解码，此时原文须为已校验过的合法JSON
+        """
+        if req_type == "request":
+            self.route_fields = scan_route_fields(raw)
+        setattr(self, self._RAW_SLOTS[req_type], raw)
+        setattr(self, self._VALUE_SLOTS[req_type], decoded)
+
+    def has_payload(self, req_type: str) -> bool:
+        """是否写入过请求或响应内容"""
+        return self.raw_text(req_type) != ""
+
+    def merge_from(self, other: "RequestPair") -> None:
+        """
+        用另一个请求对中写入过的字段覆盖当前字段，用于合并分段解析的结果
+
+        请求/响应写入时总会同时写入对应时间，协议只会写入非空值，
+        因此按写入过的内容覆盖，与把两段日志依次写入同一个请求对的结果一致
+
+        Args:
+            other: 后续日志解析得到的同一请求ID的请求对
+        """
+        for req_type, time_key in (("request", "_req_time"), ("response", "_rsp_time")):
+            if not other.has_payload(req_type):
+                continue
+            for slots in (self._RAW_SLOTS, self._VALUE_SLOTS):
+                setattr(self, slots[req_type], getattr(other, slots[req_type]))
+            setattr(self, time_key, getattr(other, time_key))
+            if req_type == "request":
+                self.route_fields = other.route_fields
+                self.route_key = None
+        if other.protocol != "":
+            self.protocol = other.protocol
+
+    def payload(self, req_type: str) -> Any:
+        """
+        获取解码后的请求或响应，结果会缓存
+
+        Args:
+            req_type: request或response
+
+        Returns:
+            解码后的内容，未写入时为空字符串
+        """
+        value = getattr(self, self._VALUE_SLOTS[req_type])
+        if value is not None:
+            return value
+        raw = getattr(self, self._RAW_SLOTS[req_type])
+        if raw == "":
+            return ""
+        # 延迟解码的原文在写入前已经校验过，解码不会失败
+        value = codec.loads(raw)
+        setattr(self, self._VALUE_SLOTS[req_type], value)
+        return value
+
+    def text(self, req_type: str) -> str:
+        """
+        获取请求或响应的文本，即写入时的原文，与是否解码过无关
+        """
+        return getattr(self, self._RAW_SLOTS[req_type])
+
+    def is_decoded(self, req_type: str) -> bool:
+        """内容是否已经解码"""
+        return getattr(self, self._VALUE_SLOTS[req_type]) is not None
+
+    def is_empty(self, req_type: str) -> bool:
+        """
+        内容是否为空，按原文判断，与 len(codec.dumps(内容)) <= 2 的判断一致
+        """
+        raw = getattr(self, self._RAW_SLOTS[req_type])
+        return raw == "" or _EMPTY_PAYLOAD.fullmatch(raw) is not None
+
+    def payload_size(self, encoding: str = "gb2312") -> int:
+        """请求和响应写入时原文按日志编码的总字节数"""
+        return self.payload_length("request", encoding) + self.payload_length("response", encoding)
+
+    def route(self) -> Optional[Tuple[str, str]]:
+        """
+        由路由字段得到(servicename, action)，字段不足以确定时返回None，需解码请求后按原逻辑处理
+        """
+        fields = self.route_fields
+        if fields is None:
+            return None
+        # 扫描到servicename字段时原文必然包含servicename，否则才查找原文，funid协议不需要
+        has_servicename = "servicename" in fields or (
+            self.protocol != "json_funid" and "servicename" in self.text("request"))
+        return classify_route(self.protocol, fields, has_servicename)
+
+    def classify(self) -> Tuple[str, str]:
+        """
+        获取请求的(servicename, action)：已登记到路由索引时直接读取，否则先用路由字段，不足以确定时解码请求
+
+        Returns:
+            (servicename, action)；请求缺少分类所需字段时抛出异常
+        """
+        if self.route_key is not None:
+            return self.route_key[1], self.route_key[2]
+        route = self.route()
+        if route is not None:
+            return route
+        raw = self.raw_text("request")
+        return classify_request(self.protocol, self.payload("request"), raw)
+
+    def request_field(self, name: str) -> Any:
+        """
+        读取请求顶层字段（servicename、method），扫描结果可用时不解码
+        """
+        if self.route_fields is not None:
+            return self.route_fields.get(name)
+        request = self.payload("request")
+        return request.get(name) if isinstance(request, dict) else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为普通字典，内容会被解码"""
+        return {key: self[key] for key in self.FIELD_KEYS}
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.PAYLOAD_KEYS:
+            return self.payload(key)
+        if key in self.FIELD_KEYS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in self.PAYLOAD_KEYS:
+            self.set_payload(key, codec.dumps(value), value)
+        elif key in self.FIELD_KEYS:
+            setattr(self, key, value)
+        else:
+            raise KeyError(key)
+
+    def __delitem__(self, key: str) -> None:
+        raise TypeError("RequestPair的字段不能删除")
+
+    def __iter__(self):
+        return iter(self.FIELD_KEYS)
+
+    def __len__(self) -> int:
+        return len(self.FIELD_KEYS)
+
+    def __repr__(self) -> str:
+        return "RequestPair(req_time=%r, rsp_time=%r, protocol=%r)" % (self.req_time, self.rsp_time, self.protocol)
 
 
 @dataclass
@@ -227,6 +485,7 @@ class ParsedRequestResponse:
     record_type: str  # 记录类型：request 或 response
     protocol: str  # 协议类型：pb, json, json_funid
     type: str = "client"
+    time_us: int = log_time.UNKNOWN_MICROS  # 时间的微秒数，用于排序和范围过滤
 
 
 @dataclass
@@ -236,7 +495,14 @@ class ParsedPushData:
     time: str  # 时间戳
     push_type: str  # 推送类型：basket_order_push, algorithm_push, gradecondition_push_instruction, gradecondition_push_condition, gradecondition_push_order, response_without_reqid
     type: str = "client"
+    time_us: int = log_time.UNKNOWN_MICROS  # 时间的微秒数，用于排序和范围过滤
+
 
+# 日志列表的记录来源，时间相同时按此顺序排列：请求、响应，再按类型依次为各类推送
+LOG_LIST_SOURCES = (
+    "request", "response", "basket_order_push", "algorithm_push", "gradecondition_push_instruction",
+    "gradecondition_push_condition", "gradecondition_push_order", "response_push",
+)
 
 # 类型别名定义
 RequestPairsDict = Dict[str, RequestPair]
@@ -265,6 +531,15 @@ class ProcessingConfig:
         
         # 跳过词汇
         self.skip_word = ['|timeout|']
+
+        # 日志编码与流式读取的分块大小
+        self.encoding = "gb2312"
+        self.read_chunk_size = 1024 * 1024
+
+        # 并行解析：进程数（为1时不并行），启用并行的最少文件总字节数，大文件切分后每段的最少字节数
+        self.parse_workers = min(4, os.cpu_count() or 1)
+        self.parse_pool_min_bytes = 32 * 1024 * 1024
+        self.parse_shard_min_bytes = 16 * 1024 * 1024
         
         # 显示列配置
         self.columns = {
@@ -288,8 +563,149 @@ class ProcessingConfig:
         ]
 
 
+# (协议, 服务名, 动作)
+RouteKey = Tuple[str, str, str]
+
+
+@dataclass(frozen=True)
+class RequestKind:
+    """
+    模块订阅的一类请求
+
+    请求统计遍历请求对时逐个判断一次，命中的请求ID按名称登记到路由索引，
+    模块只读取登记的请求，不再各自遍历全部请求对
+    """
+    # 名称，各模块之间唯一
+    name: str
+    # 协议，为空时不限
+    protocol: str = ""
+    # 请求顶层的method字段，为空时不限
+    method: str = ""
+    # 请求原文需要同时包含的子串
+    contains: Tuple[str, ...] = ()
+
+    def matches(self, pair: RequestPair, text: str) -> bool:
+        """
+        判断请求对是否属于该类
+
+        Args:
+            pair: 请求对
+            text: 请求原文，contains为空时不使用
+        """
+        if self.protocol and pair.protocol != self.protocol:
+            return False
+        if self.method and pair.request_field("method") != self.method:
+            return False
+        return all(part in text for part in self.contains)
+
+
+class RouteEntry:
+    """路由索引中一个路由的请求ID列表和内容总字节数"""
+
+    __slots__ = ("route", "keys", "total_lens")
+
+    def __init__(self, route: RouteKey):
+        self.route = route
+        self.keys: List[str] = []
+        self.total_lens = 0
+
+
+class RouteIndex:
+    """
+    请求路由索引：(协议, 服务名, 动作) -> 请求ID列表
+
+    请求对在请求统计时分类一次后登记，分类结果同时记在请求对的route_key上，拆分日志列表时直接读取；
+    各模块和get_request_list按路由取请求ID，请求数和内容总字节数随登记累加，展示统计时直接读取。
+    无法按路由区分的请求由模块声明为RequestKind，在同一遍历中按类别登记。
+    各路由和类别的请求ID列表只在末尾追加
+    """
+
+    PROTOCOLS = ("pb", "json", "json_funid")
+
+    def __init__(self):
+        self.routes: Dict[RouteKey, RouteEntry] = {}
+        # 协议 -> 服务名 -> 动作列表，按首次出现的顺序，遍历路由时按此顺序
+        self.tree: Dict[str, Dict[str, List[str]]] = {protocol: {} for protocol in self.PROTOCOLS}
+        # 各模块订阅的请求类别名称 -> 请求ID列表
+        self.kinds: Dict[str, List[str]] = {}
+
+    def add(self, route: RouteKey, key: str, size: int) -> RouteKey:
+        """
+        登记请求对
+
+        Args:
+            route: 路由
+            key: 请求ID
+            size: 请求和响应原文的总字节数
+
+        Returns:
+            索引中保存的路由元组，同一路由的请求对共用
+        """
+        entry = self.routes.get(route)
+        if entry is None:
+            entry = self.routes[route] = RouteEntry(route)
+            protocol, servicename, action = route
+            self.tree.setdefault(protocol, {}).setdefault(servicename, []).append(action)
+        entry.keys.append(key)
+        entry.total_lens += size
+        return entry.route
+
+    def keys(self, protocol: str, servicename: str, action: str) -> Sequence[str]:
+        """
+        获取路由的请求ID列表，返回索引内部的列表，调用方不应修改
+
+        Returns:
+            请求ID列表，路由不存在时为空
+        """
+        entry = self.routes.get((protocol, servicename, action))
+        return () if entry is None else entry.keys
+
+    def add_kind(self, name: str, key: str) -> None:
+        """
+        把请求ID登记到订阅的请求类别下
+
+        Args:
+            name: RequestKind的名称
+            key: 请求ID
+        """
+        keys = self.kinds.get(name)
+        if keys is None:
+            keys = self.kinds[name] = []
+        keys.append(key)
+
+    def kind_keys(self, name: str) -> Sequence[str]:
+        """
+        获取请求类别下的请求ID列表，返回索引内部的列表，调用方不应修改
+        """
+        return self.kinds.get(name, ())
+
+    def totals(self, route: RouteKey) -> Tuple[int, int]:
+        """
+        获取路由的 (请求数, 内容总字节数)
+        """
+        entry = self.routes[route]
+        return len(entry.keys), entry.total_lens
+
+    def __iter__(self) -> Iterable[RouteKey]:
+        for protocol, services in self.tree.items():
+            for servicename, actions in services.items():
+                for action in actions:
+                    yield protocol, servicename, action
+
+    def __len__(self) -> int:
+        return len(self.routes)
+
+
 class ProcessingState:
     """处理状态类"""
+
+    # 解析日志行时按行追加的列表，分段解析的结果按日志顺序拼接
+    PARSE_LIST_FIELDS = (
+        "illegal_reqs", "timeout_reqs", "skipped_reqs", "new_transmit_reqs",
+        "response_without_reqid", "lines_without_reqid",
+        "basketorder_push_raw", "algorithm_push_raw",
+        "gradecondition_push_instruction", "gradecondition_push_condition", "gradecondition_push_order",
+    )
     
     def __init__(self, isJupyter: bool = True):
         self.isJupyter = isJupyter
@@ -299,17 +715,22 @@ class ProcessingState:
         self.counts_json = 0
         self.counts_funid = 0
         
-        # 请求统计
-        self.request_statics = {"pb": {}, "json": {}, "json_funid": {}}
+        # 请求统计：(协议, 服务名, 动作) -> 请求ID列表及内容总字节数
+        self.route_index = RouteIndex()
         
-        # 异常请求
-        self.illegal_reqs = []
-        self.timeout_reqs = []
-        self.skipped_reqs = []
-        self.new_transmit_reqs = []
+        # 异常请求，jupyter模式下原始行只记录在日志文件中的位置，读取时从raw_lines取出文本
+        self.raw_lines = RawLineStore()
+        self.illegal_reqs = RawLineList(self.raw_lines, key="line")
+        self.timeout_reqs = RawLineList(self.raw_lines)
+        self.skipped_reqs = RawLineList(self.raw_lines)
+        self.new_transmit_reqs = RawLineList(self.raw_lines)
         self.response_without_reqid = []
-        self.lines_without_reqid = []
+        self.lines_without_reqid = RawLineList(self.raw_lines)
         self.skipped_reqpairs = {}
+        # 分隔符不足、无法取得头部字段的日志行数，解析结束后汇总输出
+        self.malformed_lines = 0
+        # 请求或响应为空的请求对，跟踪模式下等待后续日志补全
+        self.removed_reqs = {}
         
         # 用户信息
         self.userid = ""
@@ -331,5 +752,47 @@ class ProcessingState:
         self.gradecondition_push_condition = []
         self.gradecondition_push_order = []
 
-        # 日志列表
+        # 按时间排序的日志列表，首次过滤时生成，之后只追加跟踪模式下新增的请求对和推送
         self.parsed_log_list = []
+        # 生成日志列表时已处理到的位置，以及各记录来源分别按时间排序的记录
+        self.log_list_cursor = ParseCursor()
+        self.log_list_parts: Dict[str, List[Any]] = {source: [] for source in LOG_LIST_SOURCES}
+        # 日志列表的内容索引，日志列表变化后在下次按内容过滤时重新建立
+        self.log_list_index = None
+
+
+class ParseCursor:
+    """
+    记录处理器已处理到的位置
+
+    路由索引中各路由和请求类别的请求列表、推送列表在跟踪模式下只会在末尾追加，
+    处理器通过游标只取上次之后新增的部分，重复调用解析方法即为增量处理
+    """
+
+    def __init__(self):
+        self.positions: Dict[Any, int] = {}
+
+    def new_items(self, name: Any, items: Sequence[Any]) -> Sequence[Any]:
+        """
+        获取列表中上次之后新增的元素
+
+        Args:
+            name: 列表名称，同一处理器内唯一
+            items: 只在末尾追加的列表
+        """
+        start = self.positions.get(name, 0)
+        self.positions[name] = len(items)
+        return items[start:] if start else items
+
+    def new_request_keys(self, route_index: RouteIndex, protocol: str, servicename: str, cmd: str) -> List[str]:
+        """
+        获取路由索引中指定路由上次之后新增的请求ID
+        """
+        keys = route_index.keys(protocol, servicename, cmd)
+        return list(self.new_items((protocol, servicename, cmd), keys))
+
+    def new_kind_keys(self, route_index: RouteIndex, name: str) -> List[str]:
+        """
+        获取路由索引中订阅的请求类别上次之后新增的请求ID
+        """
+        return list(self.new_items(name, route_index.kind_keys(name)))
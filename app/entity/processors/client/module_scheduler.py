@@ -0,0 +1,66 @@
+"""
+模块调度
+按声明的依赖关系依次运行一组阶段，依赖在前，记录每个阶段的开始时间和耗时
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Tuple
+
+
+@dataclass
+class StageTiming:
+    """阶段耗时"""
+    name: str
+    start: float  # 相对调度开始的秒数
+    seconds: float
+
+
+def _check_depends(stages: Dict[str, Callable[[], Any]], depends: Dict[str, Tuple[str, ...]]) -> List[str]:
+    """
+    检查依赖并返回一个满足依赖的顺序
+
+    Returns:
+        阶段名列表，依赖在前；依赖不存在或存在循环依赖时抛出ValueError
+    """
+    order: List[str] = []
+    visiting = set()
+    done = set()
+
+    def visit(name: str) -> None:
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"阶段存在循环依赖: {name}")
+        visiting.add(name)
+        for dep in depends.get(name, ()):
+            if dep not in stages:
+                raise ValueError(f"阶段 {name} 依赖的 {dep} 不存在")
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+        order.append(name)
+
+    for name in stages:
+        visit(name)
+    return order
+
+
+def run_stages(stages: Dict[str, Callable[[], Any]], depends: Dict[str, Tuple[str, ...]]) -> Dict[str, StageTiming]:
+    """
+    按依赖关系依次运行各阶段
+
+    Args:
+        stages: 阶段名到无参函数的映射，没有依赖关系的阶段按插入顺序运行
+        depends: 阶段名到其依赖阶段的映射，未列出的阶段没有依赖
+
+    Returns:
+        各阶段的耗时，按运行顺序排列；某个阶段抛出异常时不再运行之后的阶段
+    """
+    timings: Dict[str, StageTiming] = {}
+    origin = time.perf_counter()
+    for name in _check_depends(stages, depends):
+        start = time.perf_counter()
+        stages[name]()
+        timings[name] = StageTiming(name, start - origin, time.perf_counter() - start)
+    return timings
@@ -0,0 +1,218 @@
+"""
+并行解析模块
+日志按文件、大文件再按换行对齐的字节范围切分为多个分段，每个分段在独立进程中解析出部分结果
+（请求对、推送、特殊行、时间范围等），再在主进程按分段在文件中的顺序合并；
+请求/响应落在不同分段或不同文件时在合并时配对，推送等列表按日志顺序拼接，结果与依次解析各文件一致
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import BinaryIO, List, Optional, Union
+
+from .base_processor import BaseProcessor
+from .line_reader import ByteRangeReader, split_line_ranges
+from .models import ProcessingConfig
+
+
+@dataclass
+class ParseJob:
+    """解析任务：一个文件，或文件中按换行对齐的一段"""
+    is_jupyter: bool
+    content: Optional[str] = None  # web模式下直接传入的文件内容（或其中按行切出的一段）
+    path: str = ""  # 文件路径，上传流会先写入临时文件
+    start: int = 0  # 字节范围起点
+    end: int = -1  # 字节范围终点，-1表示到文件末尾
+    last: bool = True  # 是否为文件的最后一段
+
+
+def _file_size(file: Union[str, BinaryIO], is_jupyter: bool) -> int:
+    """
+    估算文件大小，无法获取时按0计算
+    """
+    try:
+        if is_jupyter:
+            return os.path.getsize(file)
+        if isinstance(file, str):
+            return len(file)
+        position = file.tell()
+        end = file.seek(0, os.SEEK_END)
+        file.seek(position)
+        return end - position
+    except (AttributeError, OSError, ValueError):
+        return 0
+
+
+def _shard_count(config: ProcessingConfig, size: int) -> int:
+    """
+    单个文件切分的段数：每段不小于 parse_shard_min_bytes，且不超过进程数
+    """
+    return max(1, min(config.parse_workers, size // config.parse_shard_min_bytes))
+
+
+def plan_shards(config: ProcessingConfig, file_list: List[Union[str, BinaryIO]], is_jupyter: bool) -> Optional[List[int]]:
+    """
+    规划每个文件切分的段数，不需要使用进程池时返回None
+
+    允许多进程、文件总量达到 parse_pool_min_bytes 且总段数不少于2时使用进程池
+
+    Args:
+        config: 处理配置
+        file_list: 文件列表
+        is_jupyter: 是否jupyter模式
+
+    Returns:
+        与文件列表对应的段数列表，或None
+    """
+    if config.parse_workers <= 1:
+        return None
+    sizes = [_file_size(file, is_jupyter) for file in file_list]
+    if sum(sizes) < config.parse_pool_min_bytes:
+        return None
+    counts = [_shard_count(config, size) for size in sizes]
+    return counts if sum(counts) >= 2 else None
+
+
+def _spool(stream: BinaryIO, chunk_size: int) -> str:
+    """
+    把上传文件的二进制流写入临时文件，子进程按路径读取
+
+    Returns:
+        临时文件路径
+    """
+    with tempfile.NamedTemporaryFile(prefix="log_analyzer_", suffix=".log", delete=False) as f:
+        shutil.copyfileobj(stream, f, chunk_size)
+        return f.name
+
+
+def _split_text(content: str, parts: int) -> List[str]:
+    """
+    按换行把文件内容切成多段，各段依次按 split("\\n") 得到的行与整体切分的结果一致
+    """
+    pieces = []
+    start = 0
+    for i in range(1, parts):
+        newline = content.find("\n", max(start, len(content) * i // parts))
+        if newline < 0:
+            break
+        pieces.append(content[start:newline])
+        start = newline + 1
+    pieces.append(content[start:])
+    return pieces
+
+
+def _parse_job(job: ParseJob) -> BaseProcessor:
+    """
+    在子进程中解析一个分段
+
+    Args:
+        job: 解析任务
+
+    Returns:
+        分段解析模式的处理器，包含该分段的请求对和状态
+    """
+    processor = BaseProcessor(job.is_jupyter)
+    processor.begin_partial()
+    if job.content is not None:
+        processor.parse_file(job.content)
+    else:
+        with open(job.path, "rb") as f:
+            stream = f if job.end < 0 else ByteRangeReader(f, job.start, job.end)
+            # 本地日志文件记录诊断行的位置，上传流落盘的临时文件解析后会删除，仍保存文本
+            path = job.path if job.is_jupyter else None
+            processor.parse_stream(stream, job.last, path, job.start)
+    return processor
+
+
+def _plan_jobs(config: ProcessingConfig, file_list: List[Union[str, BinaryIO]], is_jupyter: bool,
+               shard_counts: List[int], spooled_paths: List[str]) -> List[ParseJob]:
+    """
+    按文件顺序生成解析任务，上传流写入临时文件，临时文件路径追加到spooled_paths
+    """
+    jobs = []
+    for file, parts in zip(file_list, shard_counts):
+        if not is_jupyter and isinstance(file, str):
+            jobs.extend(ParseJob(False, content=piece) for piece in _split_text(file, parts))
+            continue
+        if is_jupyter:
+            path = file
+        else:
+            path = _spool(file, config.read_chunk_size)
+            spooled_paths.append(path)
+        if parts == 1:
+            jobs.append(ParseJob(is_jupyter, path=path))
+            continue
+        ranges = split_line_ranges(path, parts)
+        jobs.extend(
+            ParseJob(is_jupyter, path=path, start=start, end=end, last=(i == len(ranges) - 1))
+            for i, (start, end) in enumerate(ranges)
+        )
+    return jobs
+
+
+def _pool_context():
+    """
+    进程池的启动方式：不使用fork，web模式下主进程中有请求线程和后台写入解析缓存的线程，
+    fork出的子进程可能继承其他线程持有的锁而卡死；Windows不支持forkserver，使用spawn
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    # forkserver进程预先导入本模块（及pandas等依赖），子进程由它fork后不必各自导入
+    context.set_forkserver_preload([__name__])
+    return context
+
+
+def parse_in_pool(processor: BaseProcessor, file_list: List[Union[str, BinaryIO]],
+                  shard_counts: Optional[List[int]] = None) -> None:
+    """
+    各分段在独立进程中解析，结果按日志顺序合并到processor
+
+    进程池不可用时（如运行环境不允许创建子进程）在当前进程逐个解析后同样合并
+
+    Args:
+        processor: 接收解析结果的处理器
+        file_list: jupyter模式下为文件路径列表；web模式下为文件内容或上传文件的二进制流
+        shard_counts: 每个文件切分的段数，默认不切分
+    """
+    config = processor.config
+    is_jupyter = processor.state.isJupyter
+    if shard_counts is None:
+        shard_counts = [1] * len(file_list)
+    spooled_paths = []
+    try:
+        jobs = _plan_jobs(config, file_list, is_jupyter, shard_counts, spooled_paths)
+        try:
+            with ProcessPoolExecutor(max_workers=min(config.parse_workers, len(jobs)),
+                                     mp_context=_pool_context()) as executor:
+                partials = list(executor.map(_parse_job, jobs))
+        except (OSError, BrokenProcessPool) as e:
+            print(f"进程池解析失败，改为在当前进程解析: {e}")
+            partials = [_parse_job(job) for job in jobs]
+
+        processor.merge_partials(partials)
+    finally:
+        for path in spooled_paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def parse_files(processor: BaseProcessor, file_list: List[Union[str, BinaryIO]]) -> None:
+    """
+    解析日志文件列表，满足条件时使用进程池，否则依次解析
+
+    Args:
+        processor: 接收解析结果的处理器
+        file_list: jupyter模式下为文件路径列表；web模式下为文件内容或上传文件的二进制流
+    """
+    shard_counts = plan_shards(processor.config, file_list, processor.state.isJupyter)
+    if shard_counts is None:
+        processor.parse(file_list)
+    else:
+        parse_in_pool(processor, file_list, shard_counts)
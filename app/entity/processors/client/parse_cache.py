@@ -0,0 +1,233 @@
+"""
+解析结果缓存模块
+以上传日志内容的哈希和解析器版本为键，把解析完成的处理器序列化保存到本地目录；
+同一份日志再次上传时直接反序列化，不再重新解析。写入先落临时文件再原子替换，多个进程共用同一目录也不会读到写了一半的缓存；
+上传接口在后台线程中写入，响应不等待序列化完成
+"""
+
+import gc
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Iterator, List, Optional, Tuple, Union
+
+# 解析逻辑或解析结果的数据结构变化时递增，旧版本的缓存自然失效
+PARSER_VERSION = "1"
+
+_SUFFIX = ".pkl"
+_TEMP_SUFFIX = ".tmp"
+# 进程异常退出残留的临时文件，超过该时间后在淘汰时清理
+_STALE_TEMP_SECONDS = 3600
+
+
+# 垃圾回收的开关是进程全局的，后台写入与请求线程中的读取可能同时暂停，按计数在最后一个结束时恢复
+_gc_lock = threading.Lock()
+_gc_pauses = 0
+_gc_was_enabled = False
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """
+    序列化/反序列化期间暂停垃圾回收：解析结果包含数百万个对象，逐个创建时会反复触发分代回收，耗时成倍增加
+
+    多个线程同时暂停时，只有第一个暂停的线程记录暂停前的状态，最后一个结束的线程按该状态恢复
+    """
+    global _gc_pauses, _gc_was_enabled
+    with _gc_lock:
+        if _gc_pauses == 0:
+            _gc_was_enabled = gc.isenabled()
+            gc.disable()
+        _gc_pauses += 1
+    try:
+        yield
+    finally:
+        with _gc_lock:
+            _gc_pauses -= 1
+            if _gc_pauses == 0 and _gc_was_enabled:
+                gc.enable()
+
+
+def _seekable(stream: BinaryIO) -> bool:
+    try:
+        return stream.seekable()
+    except (AttributeError, OSError, ValueError):
+        return False
+
+
+class ParseCache:
+    """
+    按内容寻址的解析结果缓存
+
+    缓存文件总大小超过上限时按最近使用时间淘汰，命中时刷新文件的修改时间
+    """
+
+    def __init__(self, directory: str, max_bytes: int, chunk_size: int = 1024 * 1024):
+        """
+        Args:
+            directory: 缓存目录
+            max_bytes: 缓存文件总大小上限，不大于0时不启用缓存
+            chunk_size: 计算哈希时每次读取的字节数
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @contextmanager
+    def prepare(self, file_list: List[Union[str, BinaryIO]]) -> Iterator[Tuple[Optional[str], List[Union[str, BinaryIO]]]]:
+        """
+        计算日志内容的缓存键
+
+        可定位的二进制流读完后回到原位置；不可定位的流（如请求体）边计算边写入临时文件，以临时文件代替原流，退出时删除
+
+        Args:
+            file_list: 文件内容或上传文件的二进制流
+
+        Returns:
+            (缓存键, 可供解析的文件列表)，未启用缓存时缓存键为None、文件列表不变
+        """
+        if not self.enabled:
+            yield None, file_list
+            return
+
+        digest = hashlib.sha256(("log-analyzer parse cache " + PARSER_VERSION).encode())
+        prepared = []
+        spooled = []
+        try:
+            for file in file_list:
+                file_hash = hashlib.sha256()
+                if isinstance(file, str):
+                    file_hash.update(file.encode("utf-8", errors="surrogatepass"))
+                    prepared.append(file)
+                elif _seekable(file):
+                    position = file.tell()
+                    for chunk in iter(lambda: file.read(self.chunk_size), b""):
+                        file_hash.update(chunk)
+                    file.seek(position)
+                    prepared.append(file)
+                else:
+                    temp = tempfile.TemporaryFile(prefix="log_analyzer_")
+                    spooled.append(temp)
+                    for chunk in iter(lambda: file.read(self.chunk_size), b""):
+                        file_hash.update(chunk)
+                        temp.write(chunk)
+                    temp.seek(0)
+                    prepared.append(temp)
+                # 按文件分别计算后再组合，文件边界不同的上传不会得到相同的键
+                digest.update(file_hash.digest())
+            yield digest.hexdigest(), prepared
+        finally:
+            for temp in spooled:
+                temp.close()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def load(self, key: Optional[str]) -> Optional[Any]:
+        """
+        读取缓存的解析结果
+
+        Args:
+            key: prepare得到的缓存键
+
+        Returns:
+            解析完成的处理器，未命中或缓存无法读取时返回None
+        """
+        if key is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f, _gc_paused():
+                processor = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            # 依赖库升级等原因导致无法反序列化时丢弃该缓存，按未命中处理
+            print(f"解析缓存读取失败，重新解析: {e}")
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return processor
+
+    def store(self, key: Optional[str], processor: Any, background: bool = False) -> Optional[threading.Thread]:
+        """
+        保存解析结果，写入失败时只打印错误，不影响本次上传
+
+        Args:
+            key: prepare得到的缓存键
+            processor: 解析完成的处理器，后台写入期间不能再修改
+            background: 在后台线程中序列化并写入，立即返回；进程在写入完成前退出时，残留的临时文件在之后淘汰时清理
+
+        Returns:
+            后台写入的线程，未启用缓存或在当前线程中写入时为None
+        """
+        if key is None:
+            return None
+        if background:
+            thread = threading.Thread(target=self.store, args=(key, processor), name="parse-cache-store", daemon=True)
+            thread.start()
+            return thread
+        temp_path = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(prefix="." + key, suffix=_TEMP_SUFFIX, dir=self.directory)
+            with os.fdopen(fd, "wb") as f, _gc_paused():
+                pickle.dump(processor, f, protocol=pickle.HIGHEST_PROTOCOL)
+            if os.path.getsize(temp_path) > self.max_bytes:
+                self._remove(temp_path)
+                return None
+            os.replace(temp_path, self._path(key))
+            temp_path = None
+            self.evict()
+        except Exception as e:
+            print(f"解析缓存写入失败: {e}")
+            if temp_path is not None:
+                self._remove(temp_path)
+        return None
+
+    def evict(self) -> None:
+        """
+        缓存文件总大小超过上限时，从最久未使用的开始删除
+        """
+        entries = []
+        now = time.time()
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if name.endswith(_SUFFIX):
+                entries.append((stat.st_mtime, stat.st_size, path))
+            elif name.endswith(_TEMP_SUFFIX) and now - stat.st_mtime > _STALE_TEMP_SECONDS:
+                self._remove(path)
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        # 其他进程可能已经删除或替换了同一文件
+        try:
+            os.remove(path)
+        except OSError:
+            pass
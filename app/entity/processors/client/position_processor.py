@@ -5,9 +5,8 @@
 
 from typing import Dict, List, Any, Optional
 import pandas as pd
-from datetime import datetime
 
-from .models import PositionQueryResult, ProcessingState, RequestPairsDict
+from .models import PositionQueryResult, ProcessingState, RequestPairsDict, ParseCursor
 
 
 class PositionProcessor:
@@ -16,6 +15,8 @@ class PositionProcessor:
     def __init__(self, state: ProcessingState, req_pairs: RequestPairsDict):
         self.state = state
         self.req_pairs = req_pairs
+        # 已处理到的位置，跟踪模式下再次解析只处理新增部分
+        self.cursor = ParseCursor()
         
         # 持仓查询数据存储
         self.query_account_stock_dict = {}
@@ -133,7 +134,7 @@ class PositionProcessor:
     
     def _get_request_list(self, protocol: str, servicename: str, cmd: str) -> List[str]:
         """
-        获取请求列表
+        获取上次解析之后新增的请求列表
         
         Args:
             protocol: 协议类型
@@ -143,18 +144,8 @@ class PositionProcessor:
         Returns:
             请求ID列表
         """
-        request_statics = self.state.request_statics
-        if protocol in request_statics.keys():
-            if servicename in request_statics[protocol].keys():
-                if cmd in request_statics[protocol][servicename].keys():
-                    return [d["key"] for d in request_statics[protocol][servicename][cmd]]
-                else:
-                    return []
-            else:
-                return []
-        else:
-            return []
-    
+        return self.cursor.new_request_keys(self.state.route_index, protocol, servicename, cmd)
+
     def _get_fund_by_fund_token(self, fund_token: str) -> str:
         """
         根据fund_token获取账户名称
@@ -215,20 +206,18 @@ class PositionProcessor:
         
         querydatadict = typequerydict[querytype][fund]
         querytime_list = []
+        sort_keys = []
         
         for key, querydata in querydatadict.items():
             querytime = key.split("|")[0]
             reqid = key.split("|")[1]
+            # 查询时间即请求对的响应时间，直接使用解析时转换好的微秒数排序
+            sort_keys.append(self.req_pairs[reqid].rsp_micros)
             self.position_querytime_reqid[querytime] = reqid
             querytime_list.append(f"{querytime}|{len(querydata)}")
         
-        sorted_querytime_list = [
-            item for item in sorted(
-                querytime_list, 
-                key=lambda item: datetime.strptime(item.split('|')[0], '%Y%m%d %H:%M:%S.%f'), 
-                reverse=True
-            )
-        ]
+        order = sorted(range(len(querytime_list)), key=sort_keys.__getitem__, reverse=True)
+        sorted_querytime_list = [querytime_list[i] for i in order]
         return sorted_querytime_list
     def get_position_query_data(self) -> Dict[str, Dict[str, Dict[str, pd.DataFrame]]]:
         """
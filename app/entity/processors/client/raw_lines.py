@@ -0,0 +1,215 @@
+"""
+原始日志行存储模块
+jupyter模式下日志文件本身就在磁盘上，异常、超时、跳过等诊断行只记录 (文件编号, 字节偏移, 字节长度)，
+读取时才通过只读内存映射取出文本，不在内存中保留原始行的副本
+"""
+
+import mmap
+import os
+from collections.abc import MutableSequence
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# 行位置打包为一个整数：文件编号 << 80 | 字节偏移 << 40 | 字节长度，比元组占用更少内存
+LineRef = int
+
+_FIELD_BITS = 40
+_FIELD_MASK = (1 << _FIELD_BITS) - 1
+_FILE_SHIFT = 2 * _FIELD_BITS
+
+
+class RawLineStore:
+    """
+    按位置读取原始日志行
+
+    文件在首次读取时以只读方式内存映射，序列化时只保存登记的文件信息，反序列化后按需重新映射
+    """
+
+    def __init__(self):
+        self._paths: List[str] = []
+        # 文件路径 -> (编码, 大小, 修改时间)，登记时记录，读取时用来确认文件没有变化
+        self._files: Dict[str, Tuple[str, int, int]] = {}
+        self._maps: Dict[str, Any] = {}
+
+    def register(self, path: str, encoding: str) -> int:
+        """
+        登记日志文件
+
+        Args:
+            path: 文件路径
+            encoding: 文件编码
+
+        Returns:
+            文件编号，用于 make_ref
+        """
+        stat = os.stat(path)
+        return self._add(path, (encoding, stat.st_size, stat.st_mtime_ns))
+
+    def _add(self, path: str, info: Tuple[str, int, int]) -> int:
+        if path not in self._files:
+            self._paths.append(path)
+        elif self._files[path] != info:
+            # 跟踪模式下文件追加写入后重新登记，之前的映射不包含新内容
+            view = self._maps.pop(path, None)
+            if view is not None:
+                view.close()
+        self._files[path] = info
+        return self._paths.index(path)
+
+    @staticmethod
+    def make_ref(file_no: int, offset: int, length: int) -> LineRef:
+        """
+        生成行位置
+
+        Args:
+            file_no: register返回的文件编号
+            offset: 行在文件中的字节偏移
+            length: 行的字节长度，不含换行符
+        """
+        return (file_no << _FILE_SHIFT) | (offset << _FIELD_BITS) | length
+
+    def locate(self, ref: LineRef) -> Tuple[str, int, int]:
+        """
+        解析行位置
+
+        Returns:
+            (文件路径, 字节偏移, 字节长度)
+        """
+        return self._paths[ref >> _FILE_SHIFT], (ref >> _FIELD_BITS) & _FIELD_MASK, ref & _FIELD_MASK
+
+    def adopt(self, other: "RawLineStore") -> Dict[int, int]:
+        """
+        登记另一个存储中的文件
+
+        Returns:
+            另一个存储的文件编号到本存储文件编号的映射
+        """
+        return {file_no: self._add(path, other._files[path]) for file_no, path in enumerate(other._paths)}
+
+    def rebase(self, ref: LineRef, mapping: Dict[int, int]) -> LineRef:
+        """按adopt得到的映射转换行位置的文件编号"""
+        return (mapping[ref >> _FILE_SHIFT] << _FILE_SHIFT) | (ref & ((1 << _FILE_SHIFT) - 1))
+
+    def read(self, ref: LineRef) -> str:
+        """
+        读取原始行文本
+
+        Args:
+            ref: 行位置
+
+        Returns:
+            与解析时读到的行相同的文本
+        """
+        path, offset, length = self.locate(ref)
+        encoding = self._files[path][0]
+        return self._map(path)[offset:offset + length].decode(encoding, errors="ignore")
+
+    def _map(self, path: str) -> Any:
+        view = self._maps.get(path)
+        if view is None:
+            _, size, mtime = self._files[path]
+            stat = os.stat(path)
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime):
+                raise ValueError(f"日志文件在解析后被修改，无法读取原始行: {path}")
+            if size == 0:
+                return b""
+            with open(path, "rb") as f:
+                view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[path] = view
+        return view
+
+    def close(self) -> None:
+        """关闭已打开的内存映射，之后读取时会重新打开"""
+        for view in self._maps.values():
+            view.close()
+        self._maps = {}
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"_paths": self._paths, "_files": self._files}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self._paths = state["_paths"]
+        self._files = state["_files"]
+        self._maps = {}
+
+
+class RawLineList(MutableSequence):
+    """
+    原始行列表，元素可以是文本或 LineRef，读取时统一返回文本
+
+    key不为空时元素为字典（如异常记录），字典中key对应的值可以是 LineRef，读取时返回替换为文本的副本
+    """
+
+    def __init__(self, store: RawLineStore, key: Optional[str] = None):
+        self._store = store
+        self._key = key
+        self._items = []
+
+    def _load(self, item: Any) -> Any:
+        if self._key is None:
+            return self._store.read(item) if isinstance(item, int) else item
+        value = item.get(self._key)
+        if isinstance(value, int):
+            item = dict(item)
+            item[self._key] = self._store.read(value)
+        return item
+
+    def _ref_of(self, item: Any) -> Optional[LineRef]:
+        value = item if self._key is None else item.get(self._key)
+        return value if isinstance(value, int) else None
+
+    def locate(self, index: int) -> Optional[Tuple[str, int, int]]:
+        """
+        获取元素对应的原始行位置
+
+        Returns:
+            (文件路径, 字节偏移, 字节长度)，元素直接保存文本时返回None
+        """
+        ref = self._ref_of(self._items[index])
+        return None if ref is None else self._store.locate(ref)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._load(item) for item in self._items[index]]
+        return self._load(self._items[index])
+
+    def __setitem__(self, index, value) -> None:
+        self._items[index] = value
+
+    def __delitem__(self, index) -> None:
+        del self._items[index]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self):
+        for item in self._items:
+            yield self._load(item)
+
+    def insert(self, index: int, value: Any) -> None:
+        self._items.insert(index, value)
+
+    def append(self, value: Any) -> None:
+        self._items.append(value)
+
+    def extend(self, values: Iterable[Any]) -> None:
+        if not isinstance(values, RawLineList):
+            self._items.extend(values)
+            return
+        if values._store is self._store:
+            self._items.extend(values._items)
+            return
+        # 合并分段解析结果时只转换行位置的文件编号，不读取文本
+        mapping = self._store.adopt(values._store)
+        for item in values._items:
+            ref = self._ref_of(item)
+            if ref is not None:
+                ref = self._store.rebase(ref, mapping)
+                if self._key is None:
+                    item = ref
+                else:
+                    item = dict(item)
+                    item[self._key] = ref
+            self._items.append(item)
+
+    def __repr__(self) -> str:
+        return "RawLineList(%d)" % len(self._items)
@@ -0,0 +1,199 @@
+"""
+请求路由字段定向扫描模块
+不解码整段JSON，只用正则定位顶层的servicename、method和params下的action、FunID
+
+扫描结果只在能确认字段位置时使用：同名字段出现多次、取值不是字符串（FunID允许整数）、
+或无法确认字段处于预期层级时返回None，由调用方解码后按原逻辑处理
+"""
+
+import re
+from typing import Any, Dict, Optional, Tuple
+
+from .. import codec
+
+# pb协议中action取method的服务
+PB_METHOD_SERVICES = [
+    "asset-product-api", "asset-institution-api", "asset-index-api",
+    "rpc.authenticate", "rpc.quota", "rpc.order.manager", "rpc.marketdata",
+    "rpc.trader.stock", "rpc.risk", "rpc.condition", "rpc.grid", "rpc.subcenter",
+]
+
+TOP_LEVEL_KEYS = ("servicename", "method")
+PARAMS_KEYS = ("action", "FunID")
+
+_KEY_PATTERNS = {
+    name: re.compile(r'"%s"\s*:\s*' % name)
+    for name in TOP_LEVEL_KEYS + PARAMS_KEYS + ("params",)
+}
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+_INT = re.compile(r'(?:0|-?[1-9]\d*)(?=\s*[,}\]])')
+_BRACKET = re.compile(r'[{}\[\]]')
+
+RouteFields = Dict[str, str]
+
+# 相同的扫描结果共用同一个字典，请求对只持有引用；取值种类由路由决定，超过上限后不再登记
+_SHARED_FIELDS: Dict[Tuple[Tuple[str, str], ...], RouteFields] = {}
+_SHARED_FIELDS_LIMIT = 4096
+
+
+def _depth(raw: str, pos: int) -> int:
+    """
+    计算位置pos处的嵌套层数，去掉字符串后统计括号
+    """
+    skeleton = _STRING.sub("", raw[:pos])
+    return skeleton.count("{") + skeleton.count("[") - skeleton.count("}") - skeleton.count("]")
+
+
+def _find_unique_key(raw: str, name: str):
+    """
+    查找唯一出现的字段
+
+    Returns:
+        (是否确定, 匹配对象)；字段不存在时为(True, None)，出现多次时为(False, None)
+    """
+    if '"%s"' % name not in raw:
+        return True, None
+    pattern = _KEY_PATTERNS[name]
+    match = pattern.search(raw)
+    if match is None:
+        return True, None
+    if pattern.search(raw, match.end()) is not None:
+        return False, None
+    return True, match
+
+
+def _read_value(raw: str, pos: int, allow_int: bool) -> Optional[str]:
+    """
+    读取字段值，只接受字符串，allow_int时也接受整数（返回其字符串形式）
+    """
+    match = _STRING.match(raw, pos)
+    if match is not None:
+        text = match.group()
+        return text[1:-1] if "\\" not in text else codec.loads(text)
+    if allow_int:
+        match = _INT.match(raw, pos)
+        if match is not None:
+            return match.group()
+    return None
+
+
+def scan_route_fields(raw: str) -> Optional[RouteFields]:
+    """
+    扫描请求原文中的路由字段
+
+    Args:
+        raw: 请求原文
+
+    Returns:
+        字段名到值的字典，只包含确认存在的字段，不在字典中的字段在原文中完全不存在；
+        FunID统一为字符串形式；无法确认时返回None。相同结果返回同一个字典，调用方不能修改
+    """
+    fields = {}
+    for name in TOP_LEVEL_KEYS:
+        certain, match = _find_unique_key(raw, name)
+        if not certain:
+            return None
+        if match is None:
+            continue
+        value = _read_value(raw, match.end(), False)
+        if value is None or _depth(raw, match.start()) != 1:
+            return None
+        fields[name] = value
+
+    params_open = -1
+    for name in PARAMS_KEYS:
+        certain, match = _find_unique_key(raw, name)
+        if not certain:
+            return None
+        if match is None:
+            continue
+        if params_open < 0:
+            certain, params = _find_unique_key(raw, "params")
+            if not certain or params is None or raw[params.end():params.end() + 1] != "{":
+                return None
+            if _depth(raw, params.start()) != 1:
+                return None
+            params_open = params.end()
+        # 从params的左括号到字段之间不能有其他括号，保证字段直接位于params下
+        if match.start() < params_open or _BRACKET.search(_STRING.sub("", raw[params_open + 1:match.start()])):
+            return None
+        value = _read_value(raw, match.end(), name == "FunID")
+        if value is None:
+            return None
+        fields[name] = value
+    return _share(fields)
+
+
+def _share(fields: RouteFields) -> RouteFields:
+    key = tuple(fields.items())
+    shared = _SHARED_FIELDS.get(key)
+    if shared is not None:
+        return shared
+    if len(_SHARED_FIELDS) < _SHARED_FIELDS_LIMIT:
+        _SHARED_FIELDS[key] = fields
+    return fields
+
+
+def classify_route(protocol: str, fields: Optional[RouteFields], has_servicename: bool) -> Optional[Tuple[str, str]]:
+    """
+    根据路由字段计算(servicename, action)，与统计处理的原有规则一致
+
+    Args:
+        protocol: 协议类型
+        fields: scan_route_fields的结果
+        has_servicename: 请求原文中是否包含servicename
+
+    Returns:
+        (servicename, action)；所需字段缺失或扫描结果不确定时返回None
+    """
+    if fields is None:
+        return None
+    if protocol == "pb":
+        if not has_servicename:
+            return "", ""
+        servicename = fields.get("servicename")
+        if servicename is None:
+            return None
+        action = fields.get("method" if servicename in PB_METHOD_SERVICES else "action")
+        return None if action is None else (servicename, action)
+    elif protocol == "json":
+        servicename = fields.get("servicename" if has_servicename else "method")
+        action = fields.get("action")
+        if servicename is None or action is None:
+            return None
+        return servicename, action
+    elif protocol == "json_funid":
+        servicename = fields.get("method")
+        action = fields.get("FunID")
+        if servicename is None or action is None:
+            return None
+        return servicename, action
+    return "", ""
+
+
+def classify_request(protocol: str, request: Any, raw: str) -> Tuple[str, str]:
+    """
+    由解码后的请求计算(servicename, action)，路由字段不足以确定时使用
+
+    Args:
+        protocol: 协议类型
+        request: 解码后的请求
+        raw: 请求原文，用于判断是否包含servicename
+
+    Returns:
+        (servicename, action)；请求缺少所需字段时抛出异常
+    """
+    if protocol == "json_funid":
+        return request["method"], str(request["params"]["FunID"])
+    if protocol not in ("pb", "json"):
+        return "", ""
+    has_servicename = "servicename" in raw
+    if protocol == "pb":
+        if not has_servicename:
+            return "", ""
+        servicename = request["servicename"]
+        if servicename in PB_METHOD_SERVICES:
+            return servicename, request["method"]
+        return servicename, request["params"]["action"]
+    servicename = request["servicename"] if has_servicename else request["method"]
+    return servicename, request["params"]["action"]
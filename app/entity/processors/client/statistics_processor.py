@@ -3,105 +3,142 @@
 负责请求统计、数据展示和汇总统计
 """
 
-import json
-from typing import Dict, List, Any
+from typing import Dict, Iterable, List, Any, Optional, Tuple
 import pandas as pd
 
-from .models import StatisticsResult, ProcessingState, RequestPairsDict
+from .models import RequestPair, StatisticsResult, ProcessingState, RequestPairsDict, RouteIndex, RequestKind
 
 
 class StatisticsProcessor:
     """统计处理器类"""
     
-    def __init__(self, state: ProcessingState, req_pairs: RequestPairsDict):
+    def __init__(self, state: ProcessingState, req_pairs: RequestPairsDict, encoding: str = "gb2312"):
         self.state = state
         self.req_pairs = req_pairs
+        # 日志编码，内容长度按原文在日志中的字节数统计
+        self.encoding = encoding
+        # 各模块订阅的请求类别，统计时一并分发
+        self.request_kinds: List[RequestKind] = []
+
+    def subscribe(self, kinds: Iterable[RequestKind]) -> None:
+        """
+        登记模块需要的请求类别，需在请求统计之前调用
+
+        Args:
+            kinds: 请求类别列表
+        """
+        self.request_kinds.extend(kinds)
     
     def parse_request_statistics(self) -> None:
         """
         解析请求统计数据
         """
-        self.state.request_statics = {"pb": {}, "json": {}, "json_funid": {}}
-        request_statics = self.state.request_statics
+        self.state.route_index = RouteIndex()
+        self.update_request_statistics(self.req_pairs.items())
+
+    def update_request_statistics(self, pairs: Iterable[Tuple[str, RequestPair]]) -> None:
+        """
+        把请求对分类后登记到路由索引，并分发给订阅了对应请求类别的模块，跟踪模式下刷新时只传入新增的请求对
+
+        每个请求对只分类一次，路由字段能确定分类时不解码请求；内容长度取写入时的原文按日志编码的字节数，不重新序列化。
+        分类失败后不再统计后续请求对，但仍会分发
+
+        Args:
+            pairs: (请求ID, 请求对) 列表
+        """
+        state = self.state
+        route_index = state.route_index
+        # 按method筛选的类别用字典查找，按原文筛选的类别先只查找第一个子串，大部分请求对不需要逐个判断
+        by_method: Dict[str, List[RequestKind]] = {}
+        by_text: List[Tuple[str, RequestKind]] = []
+        others: List[RequestKind] = []
+        for kind in self.request_kinds:
+            if kind.method:
+                by_method.setdefault(kind.method, []).append(kind)
+            elif kind.contains:
+                by_text.append((kind.contains[0], kind))
+            else:
+                others.append(kind)
+        indexing = True
         
-        for key, item in self.req_pairs.items():
-            self.state.counts += 1
-            request = item["request"]
-            req_time = item["req_time"]
-            req_type = item["protocol"]
-            servicename = ""
-            action = ""
-            
+        for key, item in pairs:
+            if by_method:
+                kinds = by_method.get(item.request_field("method"))
+                if kinds is not None:
+                    self._dispatch(key, item, kinds)
+            if by_text:
+                text = item.text("request")
+                for first, kind in by_text:
+                    if first in text:
+                        self._dispatch(key, item, (kind,), text)
+            if others:
+                self._dispatch(key, item, others)
+            if not indexing:
+                continue
+
+            state.counts += 1
+            req_type = item.protocol
             if req_type == "pb":
-                self.state.counts_pb += 1
-                try:
-                    if "servicename" in json.dumps(request):
-                        servicename = request["servicename"]
-                        if servicename not in [
-                            "asset-product-api", "asset-institution-api", "asset-index-api",
-                            "rpc.authenticate", "rpc.quota", "rpc.order.manager", "rpc.marketdata",
-                            "rpc.trader.stock", "rpc.risk", "rpc.condition", "rpc.grid", "rpc.subcenter",
-                        ]:
-                            action = request["params"]["action"]
-                        else:
-                            action = request["method"]
-                except Exception as e:
-                    print(key, request)
-                    break
+                state.counts_pb += 1
             elif req_type == "json":
-                self.state.counts_json += 1
-                try:
-                    if "servicename" in json.dumps(request):
-                        servicename = request["servicename"]
-                    else:
-                        servicename = request["method"]
-                    action = request["params"]["action"]
-                except Exception as e:
-                    print(key, request)
-                    break
+                state.counts_json += 1
             elif req_type == "json_funid":
-                self.state.counts_funid += 1
-                servicename = request["method"]
-                action = str(request["params"]["FunID"])
-            
-            if servicename not in request_statics[req_type].keys():
-                request_statics[req_type][servicename] = {}
-            if action not in request_statics[req_type][servicename].keys():
-                request_statics[req_type][servicename][action] = []
+                state.counts_funid += 1
             
-            request_statics[req_type][servicename][action].append({
-                "key": key, 
-                "lens": len(json.dumps(item)), 
-                "req_time": req_time
-            })
+            try:
+                servicename, action = item.classify()
+            except Exception as e:
+                print(key, item["request"])
+                indexing = False
+                continue
+            item.route_key = route_index.add((req_type, servicename, action), key, item.payload_size(self.encoding))
+
+    def _dispatch(self, key: str, item: RequestPair, kinds: Iterable[RequestKind], text: Optional[str] = None) -> None:
+        """
+        把请求对登记到其所属的请求类别下
+
+        Args:
+            key: 请求ID
+            item: 请求对
+            kinds: 候选的请求类别
+            text: 已取出的请求原文
+        """
+        for kind in kinds:
+            if kind.contains and text is None:
+                text = item.text("request")
+            if kind.matches(item, text or ""):
+                self.state.route_index.add_kind(kind.name, key)
+
+    def _iter_totals(self) -> Iterable[Tuple[str, str, str, int, int]]:
+        """
+        按路由索引中的顺序遍历各路由的 (协议, 服务名, 动作, 请求数, 内容总字节数)
+        """
+        route_index = self.state.route_index
+        for route in route_index:
+            yield route + route_index.totals(route)
     
     def show_request_statics(self) -> List[StatisticsResult]:
         """
-        展示请求统计数据
+        展示请求统计数据，直接读取各路由累计的请求数和内容字节数
         
         Returns:
             统计结果列表
         """
-        request_statics = self.state.request_statics
-        
         cnt = 0
         sum_requests = []
         
-        for k1, v1 in request_statics.items():
-            for k2, v2 in request_statics[k1].items():
-                for k3, v3 in request_statics[k1][k2].items():
-                    total_lens = sum(d["lens"] for d in v3)
-                    avg_lens = total_lens / len(v3) if len(v3) > 0 else 0
-                    
-                    sum_requests.append({
-                        "protocol": k1, 
-                        "servicename": k2, 
-                        "action": k3, 
-                        "counts": len(v3), 
-                        "avg_lens": self._format_size(avg_lens), 
-                        "total_lens": self._format_size(total_lens)
-                    })
-                    cnt += len(v3)
+        for protocol, servicename, action, counts, total_lens in self._iter_totals():
+            avg_lens = total_lens / counts if counts > 0 else 0
+            
+            sum_requests.append({
+                "protocol": protocol, 
+                "servicename": servicename, 
+                "action": action, 
+                "counts": counts, 
+                "avg_lens": self._format_size(avg_lens), 
+                "total_lens": self._format_size(total_lens)
+            })
+            cnt += counts
         
         print("总请求数：%d. pb请求数：%d, json请求数：%d, funid请求数：%d. 统计请求数：%d, 统计结果:【%s】" % (
             self.state.counts, self.state.counts_pb, self.state.counts_json, 
@@ -180,22 +217,18 @@ class StatisticsProcessor:
         Returns:
             统计数据DataFrame
         """
-        request_statics = self.state.request_statics
         data = []
         
-        for protocol, services in request_statics.items():
-            for servicename, actions in services.items():
-                for action, requests in actions.items():
-                    total_lens = sum(d["lens"] for d in requests)
-                    avg_lens = total_lens / len(requests) if len(requests) > 0 else 0
-                    
-                    data.append({
-                        "protocol": protocol,
-                        "servicename": servicename,
-                        "action": action,
-                        "counts": len(requests),
-                        "avg_lens": self._format_size(avg_lens),
-                        "total_lens": self._format_size(total_lens)
-                    })
+        for protocol, servicename, action, counts, total_lens in self._iter_totals():
+            avg_lens = total_lens / counts if counts > 0 else 0
+            
+            data.append({
+                "protocol": protocol,
+                "servicename": servicename,
+                "action": action,
+                "counts": counts,
+                "avg_lens": self._format_size(avg_lens),
+                "total_lens": self._format_size(total_lens)
+            })
         
         return pd.DataFrame(data) 
@@ -0,0 +1,232 @@
+"""
+JSON编解码模块
+日志解析和接口响应统一使用，安装了msgspec或orjson时自动使用加速实现，否则使用标准库json
+
+各实现的输出保持一致：紧凑格式（无多余空格）、不转义非ASCII字符、numpy/pandas等类型按相同规则转换；
+加速实现无法处理的输入（NaN字面量、超过64位的整数等）自动回退到标准库，解析结果与标准库一致
+
+可通过环境变量 LOG_ANALYZER_JSON_BACKEND 指定实现：msgspec、orjson、json
+"""
+
+import dataclasses
+import json
+import math
+import os
+import re
+from collections.abc import Mapping
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from email.utils import format_datetime
+from typing import Any, Callable, Dict, List, Tuple
+from uuid import UUID
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+def frame_records(df: pd.DataFrame) -> List[Dict[Any, Any]]:
+    """
+    把DataFrame转换为按行的字典列表，结果与 to_dict(orient="records") 相同，缺失值（NaN、None、NaT、NA）为None
+
+    一次取出全部值并向量化地替换缺失值，不逐行经过pandas；行数很少的DataFrame也比 to_dict 快一个数量级
+
+    Args:
+        df: 待转换的DataFrame
+
+    Returns:
+        每行一个字典，键为列名
+    """
+    values = df.to_numpy(dtype=object)
+    if values.size:
+        missing = pd.isna(values)
+        if missing.any():
+            values[missing] = None
+    columns = df.columns.tolist()
+    return [dict(zip(columns, row)) for row in values.tolist()]
+
+
+def to_serializable(obj: Any) -> Any:
+    """
+    把JSON不能直接表示的对象转换为可序列化的结构，作为各实现的default钩子
+
+    Args:
+        obj: 待转换对象
+
+    Returns:
+        可序列化的对象
+    """
+    if isinstance(obj, pd.DataFrame):
+        return frame_records(obj)  # 转为列表形式的字典
+    elif isinstance(obj, pd.Series):
+        return obj.tolist()  # Series转为列表
+    elif isinstance(obj, np.integer):
+        return int(obj)  # 处理numpy整数类型
+    elif isinstance(obj, np.floating):
+        if pd.isna(obj):
+            return None  # 转换 NaN 为 null
+        return float(obj)  # 处理numpy浮点数类型
+    elif isinstance(obj, np.bool_):
+        return bool(obj)
+    elif isinstance(obj, np.ndarray):
+        return obj.tolist()  # numpy数组转为列表
+    elif isinstance(obj, (set, frozenset)):
+        return list(obj)  # set转为列表
+    elif isinstance(obj, Mapping):
+        return dict(obj)
+    elif isinstance(obj, date):
+        # 与flask默认的http日期格式一致
+        if obj is pd.NaT:
+            return None
+        if not isinstance(obj, datetime):
+            obj = datetime.combine(obj, time())
+        if obj.tzinfo is None:
+            obj = obj.replace(tzinfo=timezone.utc)
+        return format_datetime(obj.astimezone(timezone.utc), usegmt=True)
+    elif isinstance(obj, (Decimal, UUID)):
+        return str(obj)
+    elif dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+# 标准库实现
+def _json_loads(data: Any) -> Any:
+    return json.loads(data)
+
+
+def _sanitize(obj: Any, str_keys: bool) -> Any:
+    """
+    把NaN/Infinity转换为null，str_keys时把非字符串键按标准库规则转为字符串，与加速实现的输出保持一致
+    """
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, Mapping):
+        return {
+            (k if not str_keys or isinstance(k, str) else json.dumps(k)): _sanitize(v, str_keys)
+            for k, v in obj.items()
+        }
+    if isinstance(obj, (list, tuple)):
+        return [_sanitize(v, str_keys) for v in obj]
+    return obj
+
+
+def _json_dumps(obj: Any, sort_keys: bool = False) -> str:
+    try:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=sort_keys,
+                          allow_nan=False, default=to_serializable)
+    except (ValueError, TypeError):
+        # 包含NaN或键类型混杂无法排序时，规整后重新序列化
+        obj = _sanitize(to_serializable(obj) if isinstance(obj, (pd.DataFrame, pd.Series, np.ndarray)) else obj,
+                        sort_keys)
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=sort_keys,
+                          default=lambda o: _sanitize(to_serializable(o), sort_keys))
+
+
+def _json_dumps_bytes(obj: Any, sort_keys: bool = False) -> bytes:
+    return _json_dumps(obj, sort_keys).encode("utf-8")
+
+
+# orjson实现
+if orjson is not None:
+    _ORJSON_OPTION = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    # 部分orjson版本把超过64位的整数静默解析为浮点数，这类版本遇到长数字串时交给标准库
+    _ORJSON_LOSSY_INT = isinstance(orjson.loads("18446744073709551616"), float)
+    _LONG_DIGITS = re.compile(r"\d{20}")
+    _LONG_DIGITS_BYTES = re.compile(rb"\d{20}")
+
+    def _orjson_loads(data: Any) -> Any:
+        pattern = _LONG_DIGITS if isinstance(data, str) else _LONG_DIGITS_BYTES
+        if _ORJSON_LOSSY_INT and pattern.search(data):
+            return json.loads(data)
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return json.loads(data)
+
+    def _orjson_dumps_bytes(obj: Any, sort_keys: bool = False) -> bytes:
+        option = _ORJSON_OPTION | orjson.OPT_SORT_KEYS if sort_keys else _ORJSON_OPTION
+        try:
+            return orjson.dumps(obj, default=to_serializable, option=option)
+        except orjson.JSONEncodeError:
+            return _json_dumps_bytes(obj, sort_keys)
+
+    def _orjson_dumps(obj: Any, sort_keys: bool = False) -> str:
+        return _orjson_dumps_bytes(obj, sort_keys).decode("utf-8")
+
+
+# msgspec实现
+if msgspec is not None:
+    _MSGSPEC_DECODER = msgspec.json.Decoder()
+    # 解码为Raw时只校验语法、不构造Python对象，用于只需判断内容是否合法的场景
+    _MSGSPEC_RAW_DECODER = msgspec.json.Decoder(msgspec.Raw)
+    _MSGSPEC_ENCODER = msgspec.json.Encoder(enc_hook=to_serializable)
+    _MSGSPEC_SORTED_ENCODER = msgspec.json.Encoder(enc_hook=to_serializable, order="sorted")
+
+    def _msgspec_loads(data: Any) -> Any:
+        try:
+            return _MSGSPEC_DECODER.decode(data)
+        except msgspec.DecodeError:
+            return json.loads(data)
+
+    def _msgspec_validate(data: Any) -> None:
+        try:
+            _MSGSPEC_RAW_DECODER.decode(data)
+        except msgspec.DecodeError:
+            json.loads(data)
+
+    def _msgspec_dumps_bytes(obj: Any, sort_keys: bool = False) -> bytes:
+        try:
+            return (_MSGSPEC_SORTED_ENCODER if sort_keys else _MSGSPEC_ENCODER).encode(obj)
+        except (TypeError, OverflowError, msgspec.EncodeError):
+            # 非字符串键排序、超长整数等情况回退到标准库
+            return _json_dumps_bytes(obj, sort_keys)
+
+    def _msgspec_dumps(obj: Any, sort_keys: bool = False) -> str:
+        return _msgspec_dumps_bytes(obj, sort_keys).decode("utf-8")
+
+
+# 可用实现，按优先级排列：名称 -> (loads, dumps, dumps_bytes)
+BACKENDS: Dict[str, Tuple[Callable, Callable, Callable]] = {}
+if msgspec is not None:
+    BACKENDS["msgspec"] = (_msgspec_loads, _msgspec_dumps, _msgspec_dumps_bytes)
+if orjson is not None:
+    BACKENDS["orjson"] = (_orjson_loads, _orjson_dumps, _orjson_dumps_bytes)
+BACKENDS["json"] = (_json_loads, _json_dumps, _json_dumps_bytes)
+
+
+def available_backends() -> List[str]:
+    """
+    获取当前环境可用的实现名称，按优先级排列
+    """
+    return list(BACKENDS.keys())
+
+
+BACKEND = os.environ.get("LOG_ANALYZER_JSON_BACKEND", "")
+if BACKEND not in BACKENDS:
+    BACKEND = available_backends()[0]
+
+loads, dumps, dumps_bytes = BACKENDS[BACKEND]
+
+
+def validate(data: Any) -> None:
+    """
+    校验JSON文本，不合法时抛出与 loads 相同的异常；msgspec实现只检查语法，不构造解码结果，比完整解码快数倍
+
+    Args:
+        data: JSON文本
+    """
+    if BACKEND == "msgspec":
+        _msgspec_validate(data)
+    else:
+        loads(data)
@@ -1,5 +1,7 @@
 from dataclasses import dataclass
 
+from ..client import log_time
+
 @dataclass
 class LogLine:
     """日志行"""
@@ -8,6 +10,7 @@ class LogLine:
     time: str = ""
     position: str = ""
     type: str = "operation"
+    time_us: int = log_time.UNKNOWN_MICROS  # 时间的微秒数，用于排序及与客户端日志按时间合并
 
 class ProcessingState:
     """处理状态类"""
@@ -16,5 +19,7 @@ class ProcessingState:
         # 基础统计
         self.counts = 0
 
-        # 日志列表
+        # 日志列表，解析后按时间排序
         self.log_list = []
+        # 日志列表的内容索引，首次按内容过滤时建立
+        self.log_index = None
@@ -1,5 +1,8 @@
 from typing import Dict, List, Any, Optional
 
+from ..client import log_time
+from ..text_index import INDEX_MIN_RECORDS, build_index, filter_records
+from ..timeline import parse_time_range, time_slice
 from .models import LogLine, ProcessingState
 
 class OperationProcessor:
@@ -22,6 +25,9 @@ class OperationProcessor:
         for file_content in self.file_list:
                 for line in file_content.split("\n"):
                     self.parse_line(line)
+        # 按时间稳定排序，多个文件的时间交错时也能与客户端日志按时间合并
+        self.state.log_list.sort(key=lambda log: log.time_us)
+        self.state.log_index = None
 
     def parse_line(self, line: str) -> None:
         """
@@ -46,23 +52,27 @@ class OperationProcessor:
         position = second_last_field.split("-")[0] if "-" in second_last_field else second_last_field
 
         # 解析日志行
-        log_line = LogLine(content=content, type="operation", time=time, position=position)
+        log_line = LogLine(content=content, type="operation", time=time, position=position,
+                           time_us=log_time.operation_micros(time))
         self.state.log_list.append(log_line)
 
     def filter_log_list(self, content: str = "", start_time: str = "", end_time: str = "") -> List[LogLine]:
         """
-        过滤日志列表
+        过滤日志列表，参数的写法见 ClientProcessorNew.filter_log_list
         """
-        if len(self.state.log_list) == 0:
+        records = self.state.log_list
+        if len(records) == 0:
             return []
-        result = []
-        if start_time == "" and end_time == "":
-            result = self.state.log_list
-
-        if start_time != "" and end_time != "":
-            result = [log for log in self.state.log_list if log.time >= start_time and log.time <= end_time]
+        time_range = parse_time_range(start_time, end_time)
+        if time_range is None:
+            # 输入不是日志时间格式时按字符串比较
+            result = [log for log in records
+                      if (start_time == "" or log.time >= start_time) and (end_time == "" or log.time <= end_time)]
+            return filter_records(result, content) if content != "" else result
 
+        lo, hi = time_slice(records, *time_range)
         if content != "":
-            subStrList = content.split("~")
-            result = [log for log in self.state.log_list if any(subStr in log.content for subStr in subStrList)]
-        return result
+            if self.state.log_index is None and hi - lo >= INDEX_MIN_RECORDS:
+                self.state.log_index = build_index(records)
+            return filter_records(records, content, self.state.log_index, lo, hi)
+        return records if lo == 0 and hi == len(records) else records[lo:hi]
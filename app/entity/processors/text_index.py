@@ -0,0 +1,288 @@
+"""
+日志内容检索模块
+解析过滤条件（~分隔的或条件；以 expr: 开头时另外支持&连接的与条件，!开头的排除条件，/.../包围的正则表达式），
+并为日志列表建立三字节组索引：按记录块登记内容中出现的三字节组，检索时先取包含全部所需三字节组的记录块，
+再只对其中的记录逐条验证，结果与逐条匹配全部记录一致
+"""
+
+import re
+from typing import Any, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+# 记录数少于此值时逐条匹配，不建立索引
+INDEX_MIN_RECORDS = 20000
+# 过滤条件以此开头时启用与、排除和正则表达式，否则~分隔的各项都是普通子串
+EXPR_PREFIX = "expr:"
+
+
+class Term:
+    """过滤条件中的一项：子串或正则表达式，可以取反"""
+
+    def __init__(self, text: str, plain: bool = False):
+        """
+        Args:
+            text: 条件文本，!开头表示不包含，/.../包围表示正则表达式
+            plain: 按普通子串匹配，开头的!和包围的/.../都是子串的一部分
+        """
+        self.negate = not plain and text.startswith("!")
+        if self.negate:
+            text = text[1:]
+        self.text = text
+        self.pattern = None
+        if not plain and len(text) >= 2 and text.startswith("/") and text.endswith("/"):
+            try:
+                self.pattern = re.compile(text[1:-1])
+            except re.error as e:
+                raise ValueError(f"正则表达式无效: {text}，{e}")
+            self.literals = _required_literals(self.pattern.pattern)
+        else:
+            self.literals = [text]
+
+    def matches(self, content: str) -> bool:
+        found = self.text in content if self.pattern is None else self.pattern.search(content) is not None
+        return found != self.negate
+
+
+class LogQuery:
+    """
+    日志内容过滤条件
+
+    ~分隔的各项包含任意一项即可，各项都是普通子串，& 和开头的 ! 也按字面匹配，与原来的过滤方式一致。
+
+    以 expr: 开头时，~分隔的各组满足任意一组即可，组内&连接的各项需全部满足，!开头表示不包含，/.../包围表示正则表达式；
+    例如 expr:a&b~!c 表示同时包含a和b，或者不包含c。此时需要查找 ~、& 或开头的 ! 本身时使用正则表达式，例如 expr:/a&b/
+    """
+
+    def __init__(self, content: str):
+        """
+        Args:
+            content: 过滤条件文本
+        """
+        if content.startswith(EXPR_PREFIX):
+            groups = content[len(EXPR_PREFIX):].split("~")
+            self.groups = [[Term(text) for text in group.split("&")] for group in groups]
+        else:
+            self.groups = [[Term(text, plain=True)] for text in content.split("~")]
+
+    def matches(self, content: str) -> bool:
+        return any(all(term.matches(content) for term in group) for group in self.groups)
+
+    def filter(self, records: Iterable[Any]) -> List[Any]:
+        """
+        筛选内容满足条件的记录；只有一项子串或正则表达式、或只有~分隔的子串时直接匹配，不逐项调用matches
+        """
+        terms = [group[0] for group in self.groups if len(group) == 1 and not group[0].negate]
+        if len(terms) == len(self.groups):
+            if len(terms) == 1 and terms[0].pattern is not None:
+                search = terms[0].pattern.search
+                return [record for record in records if search(record.content)]
+            if all(term.pattern is None for term in terms):
+                if len(terms) == 1:
+                    text = terms[0].text
+                    return [record for record in records if text in record.content]
+                texts = [term.text for term in terms]
+                return [record for record in records if any(text in record.content for text in texts)]
+        return [record for record in records if self.matches(record.content)]
+
+
+def _required_literals(pattern: str) -> List[str]:
+    """
+    提取正则表达式匹配时必然出现的字面子串，用于索引缩小候选范围
+
+    只处理顶层的普通字符和转义的符号：含有分支或内联标志时不提取，分组、字符类内的内容跳过，
+    后接 ? * { 的字符可以不出现，从子串中去掉
+
+    Returns:
+        字面子串列表，无法确定时为空
+    """
+    if "|" in pattern or "(?" in pattern:
+        return []
+    literals = []
+    run: List[str] = []
+
+    def flush() -> None:
+        if run:
+            literals.append("".join(run))
+            run.clear()
+
+    i, depth = 0, 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\":
+            escaped = pattern[i + 1:i + 2]
+            if depth == 0 and escaped and not escaped.isalnum():
+                run.append(escaped)
+            else:
+                flush()
+            i += 2
+            continue
+        if ch == "[":
+            # 跳过字符类，其中的 ] 可以转义或紧跟在开头（含取反的^之后）
+            flush()
+            i += 1
+            if pattern[i:i + 1] == "^":
+                i += 1
+            if pattern[i:i + 1] == "]":
+                i += 1
+            while i < len(pattern) and pattern[i] != "]":
+                i += 2 if pattern[i] == "\\" else 1
+        elif ch == "(":
+            flush()
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch in "?*{":
+            if run:
+                run.pop()
+            flush()
+            if ch == "{":
+                i = pattern.find("}", i) if "}" in pattern[i:] else len(pattern)
+        elif ch in "+.^$":
+            flush()
+        elif depth == 0:
+            run.append(ch)
+        i += 1
+    flush()
+    return literals
+
+
+class TrigramIndex:
+    """
+    日志内容的三字节组索引
+
+    内容按UTF-8编码后取每个位置起的三个字节，散列为16位整数；记录按 BLOCK_SIZE 条分块，
+    为每个散列值登记出现过的记录块（按块号排序），散列冲突和分块只会多出候选，验证时排除
+    """
+
+    BLOCK_SIZE = 64
+    HASH_BITS = 16
+    # 建立索引时每次处理的记录块数
+    CHUNK_BLOCKS = 256
+
+    def __init__(self, contents: Sequence[str]):
+        """
+        Args:
+            contents: 各记录的内容，顺序即记录位置
+        """
+        self.size = len(contents)
+        chunk = self.BLOCK_SIZE * self.CHUNK_BLOCKS
+        block_bits = (self.CHUNK_BLOCKS - 1).bit_length()
+        seen = np.zeros(1 << (self.HASH_BITS + block_bits), dtype=bool)
+        hashes, blocks = [], []
+        for base in range(0, self.size, chunk):
+            encoded = [content.encode("utf-8") for content in contents[base:base + chunk]]
+            # 记录之间以\0分隔，跨越记录的三字节组含有\0，不登记
+            data = np.frombuffer(b"\0".join(encoded) + b"\0", dtype=np.uint8)
+            lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)) + 1
+            local = np.repeat(np.arange(len(encoded), dtype=np.int64) // self.BLOCK_SIZE, lengths)[:-2]
+            hashed, valid = self._hash(data)
+            # 用标记数组对(散列值, 块号)去重，按散列值、块号的顺序取出后清除标记
+            seen[(hashed[valid] << block_bits) | local[valid]] = True
+            found = np.flatnonzero(seen)
+            seen[found] = False
+            hashes.append((found >> block_bits).astype(np.int32))
+            blocks.append((found & (self.CHUNK_BLOCKS - 1)).astype(np.int32) + base // self.BLOCK_SIZE)
+        hashes = np.concatenate(hashes) if hashes else np.zeros(0, dtype=np.int32)
+        order = np.argsort(hashes, kind="stable")
+        # 散列值h登记的记录块为 blocks[offsets[h]:offsets[h + 1]]
+        self.blocks = np.concatenate(blocks)[order] if blocks else np.zeros(0, dtype=np.int32)
+        self.offsets = np.searchsorted(hashes[order], np.arange((1 << self.HASH_BITS) + 1)).astype(np.int64)
+
+    @classmethod
+    def _hash(cls, data: np.ndarray):
+        """
+        计算每个位置起的三字节组的散列值
+
+        Returns:
+            (散列值数组, 是否有效的数组)，含有\0的三字节组无效
+        """
+        first, second, third = data[:-2], data[1:-1], data[2:]
+        code = (first.astype(np.uint32) << 16) | (second.astype(np.uint32) << 8) | third.astype(np.uint32)
+        hashed = ((code * np.uint32(2654435761)) >> np.uint32(32 - cls.HASH_BITS)).astype(np.int64)
+        return hashed, (first != 0) & (second != 0) & (third != 0)
+
+    def _literal_blocks(self, literal: str) -> Optional[np.ndarray]:
+        """
+        包含字面子串全部三字节组的记录块，子串不足三个字节时为None（不能缩小范围）
+        """
+        data = np.frombuffer(literal.encode("utf-8"), dtype=np.uint8)
+        if len(data) < 3:
+            return None
+        hashed, valid = self._hash(data)
+        result = None
+        for value in np.unique(hashed[valid]):
+            blocks = self.blocks[self.offsets[value]:self.offsets[value + 1]]
+            result = blocks if result is None else np.intersect1d(result, blocks, assume_unique=True)
+            if len(result) == 0:
+                break
+        return result
+
+    def candidates(self, query: LogQuery, lo: int = 0, hi: Optional[int] = None) -> Optional[np.ndarray]:
+        """
+        可能满足过滤条件的记录位置
+
+        Args:
+            query: 过滤条件
+            lo: 只取位置在 [lo, hi) 范围内的记录
+            hi: 范围的结束位置，为None时到末尾
+
+        Returns:
+            升序的记录位置数组；某一组条件无法用索引缩小范围时为None，需逐条匹配全部记录
+        """
+        union = []
+        for group in query.groups:
+            group_blocks = None
+            for term in group:
+                if term.negate:
+                    continue
+                for literal in term.literals:
+                    blocks = self._literal_blocks(literal)
+                    if blocks is not None:
+                        group_blocks = blocks if group_blocks is None else np.intersect1d(
+                            group_blocks, blocks, assume_unique=True)
+            if group_blocks is None:
+                return None
+            union.append(group_blocks)
+        hi = self.size if hi is None else min(hi, self.size)
+        blocks = np.unique(np.concatenate(union)) if union else np.zeros(0, dtype=np.int32)
+        # 先按块号截取范围内的记录块，再展开为记录位置
+        blocks = blocks[np.searchsorted(blocks, lo // self.BLOCK_SIZE):
+                        np.searchsorted(blocks, (hi + self.BLOCK_SIZE - 1) // self.BLOCK_SIZE)]
+        positions = (blocks[:, None].astype(np.int64) * self.BLOCK_SIZE + np.arange(self.BLOCK_SIZE)).ravel()
+        return positions[(positions >= lo) & (positions < hi)]
+
+
+def build_index(records: Sequence[Any]) -> Optional[TrigramIndex]:
+    """
+    为日志列表建立内容索引，记录数少于 INDEX_MIN_RECORDS 时返回None
+    """
+    if len(records) < INDEX_MIN_RECORDS:
+        return None
+    return TrigramIndex([record.content for record in records])
+
+
+def filter_records(records: Sequence[Any], content: str, index: Optional[TrigramIndex] = None,
+                   lo: int = 0, hi: Optional[int] = None) -> List[Any]:
+    """
+    按内容过滤日志记录
+
+    Args:
+        records: 日志记录列表，记录需有 content 属性
+        content: 过滤条件，见LogQuery
+        index: records 的内容索引，为None或过滤范围少于 INDEX_MIN_RECORDS 条时逐条匹配
+        lo: 只过滤 records[lo:hi] 范围内的记录（如按时间范围二分查找的结果）
+        hi: 范围的结束位置，为None时到末尾
+
+    Returns:
+        满足条件的记录，保持原顺序
+    """
+    query = LogQuery(content)
+    hi = len(records) if hi is None else hi
+    # 范围较小时逐条匹配比查索引快，与是否建立索引使用相同的界限
+    use_index = index is not None and hi - lo >= INDEX_MIN_RECORDS
+    positions = index.candidates(query, lo, hi) if use_index else None
+    # 候选超过范围内记录的四分之一时逐条匹配更快
+    if positions is None or len(positions) > (hi - lo) // 4:
+        return query.filter(records if lo == 0 and hi == len(records) else records[lo:hi])
+    return query.filter(map(records.__getitem__, positions.tolist()))
@@ -0,0 +1,146 @@
+"""
+时间线合并模块
+客户端日志的请求、响应、各类推送以及操作日志各自按时间排序，按时间k路归并为一条时间线；
+按时间范围过滤时在排好序的时间线上二分查找，只取范围内的一段；分页时按偏移量或游标取其中一页
+"""
+
+import base64
+import binascii
+import heapq
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+from .client import log_time
+
+
+def _time_key(record: Any) -> int:
+    return record.time_us
+
+
+def merge_by_time(*sources: Iterable[Any]) -> Iterator[Any]:
+    """
+    按时间归并多个已排序的记录来源，逐条产出，不生成中间的排序副本
+
+    Args:
+        sources: 各自按 time_us 升序排列的记录来源（列表或生成器），记录需有 time_us 属性
+
+    Returns:
+        按 time_us 升序产出记录的迭代器；时间相同时先产出排在前面的来源的记录，同一来源内保持原顺序
+    """
+    return heapq.merge(*sources, key=_time_key)
+
+
+def parse_time_range(start_time: str, end_time: str) -> Optional[Tuple[Optional[int], Optional[int]]]:
+    """
+    把时间范围的起止时间转换为微秒数，可以是客户端日志时间（20250415 09:03:21.058）或操作日志时间
+    （20250415 09:03:21:058:965）的格式
+
+    Args:
+        start_time: 起始时间，为空时不限
+        end_time: 结束时间，为空时不限
+
+    Returns:
+        (起始微秒数, 结束微秒数)，不限的一端为None；任一端无法解析时返回None
+    """
+    bounds = []
+    for text in (start_time, end_time):
+        if text == "":
+            bounds.append(None)
+            continue
+        micros = log_time.to_micros(text)
+        if micros is None:
+            micros = log_time.operation_micros(text)
+            if micros == log_time.UNKNOWN_MICROS:
+                return None
+        bounds.append(micros)
+    return bounds[0], bounds[1]
+
+
+def time_slice(records: Sequence[Any], start_us: Optional[int], end_us: Optional[int]) -> Tuple[int, int]:
+    """
+    在按时间排序的记录中二分查找时间范围
+
+    Args:
+        records: 按 time_us 升序排列的记录
+        start_us: 起始微秒数（含），为None时不限
+        end_us: 结束微秒数（含），为None时不限
+
+    Returns:
+        (lo, hi)，records[lo:hi] 为时间在范围内的记录
+    """
+    lo = 0 if start_us is None else bisect_left(records, start_us, key=_time_key)
+    hi = len(records) if end_us is None else bisect_right(records, end_us, lo=lo, key=_time_key)
+    return lo, hi
+
+
+def encode_cursor(records: Sequence[Any], position: int) -> str:
+    """
+    生成指向 records[position] 的游标
+
+    游标记录该记录的时间和它在同一时间的记录中的序号，不依赖位置本身：跟踪模式下日志列表追加新的记录后，
+    已取出的游标仍指向同一条记录
+
+    Args:
+        records: 按 time_us 升序排列的记录
+        position: 下一页第一条记录的位置
+
+    Returns:
+        不透明的游标字符串
+    """
+    time_us = records[position].time_us
+    skip = position - bisect_left(records, time_us, hi=position, key=_time_key)
+    return base64.urlsafe_b64encode(f"{time_us}:{skip}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(records: Sequence[Any], cursor: str) -> int:
+    """
+    把游标还原为在 records 中的位置
+
+    Args:
+        records: 按 time_us 升序排列的记录
+        cursor: encode_cursor生成的游标
+
+    Returns:
+        游标指向的记录的位置；该时间的记录已少于游标中的序号时为下一个时间的第一条记录
+
+    Raises:
+        ValueError: 游标无效
+    """
+    try:
+        text = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        time_us, skip = (int(value) for value in text.split(":"))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError(f"游标无效: {cursor}")
+    if skip < 0:
+        raise ValueError(f"游标无效: {cursor}")
+    lo = bisect_left(records, time_us, key=_time_key)
+    return min(lo + skip, bisect_right(records, time_us, lo=lo, key=_time_key))
+
+
+def paginate(records: Sequence[Any], offset: int = 0, limit: Optional[int] = None,
+             cursor: str = "") -> Dict[str, Any]:
+    """
+    取按时间排序的记录中的一页
+
+    Args:
+        records: 按 time_us 升序排列的记录（过滤结果）
+        offset: 起始位置，指定 cursor 时忽略
+        limit: 每页记录数，为None时取到末尾
+        cursor: 上一页返回的 nextCursor，从其指向的记录开始
+
+    Returns:
+        {"total": 记录总数, "offset": 本页起始位置, "items": 本页记录,
+         "nextCursor": 下一页的游标，没有下一页时为None}
+
+    Raises:
+        ValueError: 游标无效
+    """
+    total = len(records)
+    start = decode_cursor(records, cursor) if cursor else min(offset, total)
+    end = total if limit is None else min(start + limit, total)
+    return {
+        "total": total,
+        "offset": start,
+        "items": list(records[start:end]),
+        "nextCursor": encode_cursor(records, end) if end < total else None,
+    }
@@ -0,0 +1,73 @@
+"""
+响应压缩
+按请求的 Accept-Encoding 选择 gzip 或 deflate 压缩响应体，配置项：
+COMPRESS_LEVEL（压缩级别1-9，0为不压缩）、COMPRESS_MIN_BYTES（小于此大小的响应不压缩）
+"""
+
+import zlib
+from typing import Iterable, Iterator
+
+from flask import Response, current_app, request
+
+# 可以压缩的响应类型，静态文件等以文件方式直接发送的响应不经过压缩
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'application/x-ndjson', 'application/javascript', 'text/html', 'text/css', 'text/plain',
+}
+# 编码名 -> zlib 的 wbits：gzip 带gzip头，HTTP的 deflate 为带zlib头的格式
+ENCODINGS = {'gzip': 16 + zlib.MAX_WBITS, 'deflate': zlib.MAX_WBITS}
+
+
+def _compressor(encoding: str, level: int):
+    return zlib.compressobj(level, zlib.DEFLATED, ENCODINGS[encoding])
+
+
+def _compress_stream(chunks: Iterable[bytes], compressor) -> Iterator[bytes]:
+    """
+    逐块压缩流式响应，每块之后同步刷新，客户端收到一块即可解压出对应的内容
+    """
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+def compress_response(response: Response) -> Response:
+    """
+    after_request 钩子：客户端接受 gzip 或 deflate 时压缩响应体
+
+    普通响应不小于 COMPRESS_MIN_BYTES 时整体压缩；流式响应无法预知大小，总是逐块压缩。
+    已经编码、状态码不是200、类型不可压缩、以文件方式直接发送的响应原样返回
+
+    Args:
+        response: 视图返回的响应
+
+    Returns:
+        压缩后的响应（同一对象）
+    """
+    level = current_app.config.get('COMPRESS_LEVEL', 0)
+    if (level <= 0 or response.status_code != 200 or response.direct_passthrough
+            or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = request.accept_encodings.best_match(list(ENCODINGS))
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _compress_stream(response.response, _compressor(encoding, level))
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < current_app.config.get('COMPRESS_MIN_BYTES', 0):
+            return response
+        compressor = _compressor(encoding, level)
+        response.set_data(compressor.compress(data) + compressor.flush())
+    response.headers['Content-Encoding'] = encoding
+    return response
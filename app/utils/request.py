@@ -1,43 +1,127 @@
-from flask import jsonify
+from collections import abc
+from flask import jsonify, request, Response
+from flask.json.provider import JSONProvider
 from functools import wraps
+from typing import Any, Iterator, List, Optional, Tuple, Union
 import pandas as pd
-import numpy as np
-import json
 import traceback
 
-class CustomJSONEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, pd.DataFrame):
-            return obj.to_dict(orient="records")  # 转为列表形式的字典
-        elif isinstance(obj, pd.Series):
-            return obj.tolist()  # Series转为列表
-        elif isinstance(obj, np.integer):
-            return int(obj)  # 处理numpy整数类型
-        elif isinstance(obj, np.floating):
-            if pd.isna(obj):
-                return None  # 转换 NaN 为 null
-            return float(obj)  # 处理numpy浮点数类型
-        elif isinstance(obj, np.ndarray):
-            return obj.tolist()  # numpy数组转为列表
-        elif isinstance(obj, set):
-            return list(obj)  # set转为列表
-        return super().default(obj)
-
-# 递归处理字典中的不可序列化类型
-def convert_data(data):
-    if isinstance(data, dict):
+from entity.processors import codec
+
+class CodecJSONProvider(JSONProvider):
+    """
+    使用codec模块编解码的JSON提供者，jsonify等接口经由此处序列化
+    与flask默认行为一致按键排序，输出紧凑格式且不转义非ASCII字符，numpy/pandas类型的转换见codec.to_serializable
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return codec.dumps(obj, sort_keys=kwargs.get("sort_keys", True))
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        return codec.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(codec.dumps_bytes(obj, sort_keys=True) + b"\n", mimetype="application/json")
+
+def get_page_args() -> Optional[Tuple[int, Optional[int], str]]:
+    """
+    读取分页参数 offset、limit、cursor
+
+    Returns:
+        (offset, limit, cursor)，limit 未指定时为None；三个参数都未指定时返回None，表示不分页
+
+    Raises:
+        ValueError: offset、limit 不是非负整数
+    """
+    if not any(name in request.args for name in ('offset', 'limit', 'cursor')):
+        return None
+    try:
+        offset = int(request.args.get('offset', 0))
+        limit = request.args.get('limit')
+        limit = None if limit in (None, '') else int(limit)
+    except ValueError:
+        raise ValueError('分页参数 offset、limit 须为非负整数')
+    if offset < 0 or (limit is not None and limit < 0):
+        raise ValueError('分页参数 offset、limit 须为非负整数')
+    return offset, limit, request.args.get('cursor', '')
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+# DataFrame 按此行数分段转换后逐行输出
+STREAM_CHUNK_ROWS = 1000
+# 流式输出时累积到此字节数再写出，减少逐行写出的开销
+STREAM_BUFFER_BYTES = 64 * 1024
+
+def wants_stream() -> bool:
+    """
+    是否以NDJSON流式返回：请求参数 stream=1，或 Accept 中明确列出 application/x-ndjson（*/* 不算）
+    """
+    if request.args.get('stream', '').lower() in ('1', 'true', 'ndjson'):
+        return True
+    return any(mimetype == NDJSON_MIMETYPE for mimetype, _ in request.accept_mimetypes)
+
+def iter_stream_records(data: Any, path: Optional[List[Any]] = None) -> Iterator[Any]:
+    """
+    把响应数据拆分为逐行输出的记录
+
+    列表、元组和迭代器每个元素一行；DataFrame 每行一行；字典逐层展开，每个值一行，形如 {"path": [键, ...], "value": 值}，
+    值为列表、元组、迭代器或 DataFrame 时按同样的规则拆开，每个元素一行、path 为该值的路径，为空时输出一行空列表；
+    None 不输出，其他值单独一行
+    """
+    if isinstance(data, pd.DataFrame):
+        for start in range(0, len(data), STREAM_CHUNK_ROWS):
+            yield from codec.frame_records(data.iloc[start:start + STREAM_CHUNK_ROWS])
+    elif isinstance(data, dict):
+        path = path or []
         for key, value in data.items():
-            if isinstance(value, pd.DataFrame):
-                data[key] = value.to_dict(orient='records')  # 转换 DataFrame 为可序列化结构
-            elif isinstance(value, set):
-                data[key] = list(value)  # 转换 set 为 list
-            elif isinstance(value, float) and pd.isna(value):
-                data[key] = None  # 转换 NaN 为 null
+            key_path = path + [key]
+            if isinstance(value, dict) and value:
+                yield from iter_stream_records(value, key_path)
+            elif isinstance(value, (pd.DataFrame, list, tuple, abc.Iterator)):
+                empty = True
+                for item in iter_stream_records(value):
+                    empty = False
+                    yield {'path': key_path, 'value': item}
+                if empty:
+                    yield {'path': key_path, 'value': []}
             else:
-                convert_data(value)  # 递归处理嵌套结构
-    elif isinstance(data, list):
-        for item in data:
-            convert_data(item)  # 递归处理列表中的内容
+                yield {'path': key_path, 'value': value}
+    elif isinstance(data, (list, tuple, abc.Iterator)):
+        yield from data
+    elif data is not None:
+        yield data
+
+
+def ndjson_response(data: Any, code: int = 0, message: str = 'Success') -> Response:
+    """
+    以NDJSON流式返回响应数据，逐条序列化，首字节不必等待全部数据序列化完成
+
+    先输出 iter_stream_records 拆分的各条记录，最后一行为 {"code", "count", "message"}，count 为已输出的记录数；
+    输出过程中出错时最后一行的 code 为-1，message 为错误信息
+    """
+    def generate():
+        count = 0
+        buffer = []
+        size = 0
+        try:
+            for record in iter_stream_records(data):
+                line = codec.dumps_bytes(record, sort_keys=True) + b'\n'
+                buffer.append(line)
+                size += len(line)
+                count += 1
+                if size >= STREAM_BUFFER_BYTES:
+                    yield b''.join(buffer)
+                    buffer, size = [], 0
+            trailer = {'code': code, 'count': count, 'message': message}
+        except Exception as e:
+            print(f"流式输出第 {count + 1} 条记录时发生错误: {e}")
+            print("错误堆栈:")
+            print(traceback.format_exc())
+            trailer = {'code': -1, 'count': count, 'message': f'服务器内部错误: {str(e)}'}
+        buffer.append(codec.dumps_bytes(trailer, sort_keys=True) + b'\n')
+        yield b''.join(buffer)
+
+    return Response(generate(), mimetype=NDJSON_MIMETYPE)
 
 def standard_json_response(func):
     @wraps(func)
@@ -50,9 +134,10 @@ def standard_json_response(func):
             else:
                 data, code, message = result, 0, 'Success'
 
-            if (data != None):
-                convert_data(data)
+            if wants_stream():
+                return ndjson_response(data, code, message)
 
+            # DataFrame、set、NaN 等在序列化时由 codec.to_serializable 转换，不再预先遍历并改写 data
             print(f"服务器端 - data类型: {type(data)}")
             response = jsonify({
                 'code': code,
@@ -69,6 +154,8 @@ def standard_json_response(func):
             print("错误堆栈:")
             print(traceback.format_exc())
 
+            if wants_stream():
+                return ndjson_response(None, -1, f'服务器内部错误: {str(e)}')
             response = jsonify({
                 'code': -1,
                 'data': None,
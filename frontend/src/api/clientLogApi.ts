@@ -1,4 +1,4 @@
-import type { RespType } from '@/types/res';
+import type { PageType, RespType } from '@/types/res';
 import apiClient from './axios';
 import type { ClientLogLine } from '@/types/client/log';
 
@@ -19,6 +19,11 @@ const api = {
       params: data
     });
   },
+  filterLogPage: (data: {content?: string, startTime?: string, endTime?: string, offset?: number, limit?: number, cursor?: string}): Promise<RespType<PageType<ClientLogLine>>> => {
+    return apiClient.get('/log/client/filter_log_list', {
+      params: data
+    });
+  },
   getAccountsQuery: (): Promise<RespType<any[]>> => {
     return apiClient.get('/log/client/query_accounts_logs');
   },
@@ -1,4 +1,4 @@
-import type { RespType } from '@/types/res';
+import type { PageType, RespType } from '@/types/res';
 import apiClient from './axios';
 import type { OperationLogLine } from '@/types/operation/log';
 
@@ -19,6 +19,11 @@ const api = {
       params: data
     });
   },
+  filterLogPage: (data: {content?: string, startTime?: string, endTime?: string, offset?: number, limit?: number, cursor?: string}): Promise<RespType<PageType<OperationLogLine>>> => {
+    return apiClient.get('/log/operation/filter_log_list', {
+      params: data
+    });
+  },
 };
 
 export default api;
@@ -2,4 +2,11 @@ export type RespType<T extends any> = {
   code: number
   message: string
   data: T
+}
+
+export type PageType<T extends any> = {
+  total: number
+  offset: number
+  items: T[]
+  nextCursor: string | null
 }
\ No newline at end of file
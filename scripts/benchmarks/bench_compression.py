@@ -0,0 +1,61 @@
+"""
+响应压缩基准测试
+解析一份合成日志后，按接口的方式序列化日志列表和持仓查询数据的响应体，比较不同压缩级别的
+gzip 压缩耗时、压缩后大小，以及按给定带宽估算的传输时间，并确认解压后与原响应体一致
+
+用法：
+    python scripts/benchmarks/bench_compression.py [请求对数量] [带宽Mbit/s]
+"""
+
+import contextlib
+import gzip
+import io
+import os
+import sys
+import tempfile
+import time
+import zlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from entity.processors import codec
+from entity.processors.client.client_processor_new import ClientProcessorNew
+from synthetic_log import write_log
+from utils.compression import ENCODINGS
+
+LEVELS = (1, 6, 9)
+
+
+def respond(data):
+    return codec.dumps_bytes({"code": 0, "data": data, "message": "Success"}, sort_keys=True) + b"\n"
+
+
+def main():
+    n_pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    bandwidth = float(sys.argv[2]) if len(sys.argv) > 2 else 20.0
+    with tempfile.TemporaryDirectory() as folder:
+        path = write_log(os.path.join(folder, "client.log"), n_pairs)
+        processor = ClientProcessorNew([path], isJupyter=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            processor.parse()
+            bodies = {
+                "日志列表": respond(processor.filter_log_list()),
+                "持仓查询数据": respond(processor.get_position_query_data()),
+            }
+
+    bytes_per_second = bandwidth * 1000 * 1000 / 8
+    for name, body in bodies.items():
+        print(f"{name}：原始 {len(body) / 1024 / 1024:.1f}M，按 {bandwidth:g}Mbit/s 传输 {len(body) / bytes_per_second:.2f}s")
+        for level in LEVELS:
+            start = time.perf_counter()
+            compressor = zlib.compressobj(level, zlib.DEFLATED, ENCODINGS["gzip"])
+            compressed = compressor.compress(body) + compressor.flush()
+            elapsed = time.perf_counter() - start
+            print(f"  gzip 级别 {level}：压缩 {elapsed:.3f}s，{len(compressed) / 1024 / 1024:.2f}M"
+                  f"（{len(compressed) / len(body):.1%}），传输 {len(compressed) / bytes_per_second:.2f}s，"
+                  f"解压一致: {gzip.decompress(compressed) == body}")
+
+
+if __name__ == "__main__":
+    main()
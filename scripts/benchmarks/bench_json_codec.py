@@ -0,0 +1,83 @@
+"""
+JSON编解码基准测试
+在合成日志的请求/响应内容和接口响应形态的数据上，对比当前环境可用的各个实现的解析和序列化耗时
+
+用法：
+    python scripts/benchmarks/bench_json_codec.py [请求对数量]
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+
+from entity.processors import codec
+from synthetic_log import generate_lines
+
+
+def collect_payloads(n_pairs):
+    payloads = []
+    for line in generate_lines(n_pairs):
+        for marker in ("&send=", "&recv="):
+            index = line.find(marker)
+            if index >= 0:
+                payloads.append(line[index + len(marker):])
+    # 截断等不合法内容由解析流程单独处理，这里只保留合法JSON
+    return [p for p in payloads if is_valid(p)]
+
+
+def is_valid(payload):
+    try:
+        json.loads(payload)
+    except ValueError:
+        return False
+    return True
+
+
+def response_like(rows):
+    # 与持仓、委托查询接口的返回结构相近：DataFrame转换的记录列表加少量numpy标量
+    frame = pd.DataFrame({
+        "req_time": pd.date_range("2026-01-01", periods=rows, freq="s").astype(str),
+        "account": np.arange(rows) % 7,
+        "code": ["60%04d" % i for i in range(rows)],
+        "name": ["证券%d" % (i % 50) for i in range(rows)],
+        "price": np.round(np.random.default_rng(0).random(rows) * 100, 2),
+        "volume": np.arange(rows) * 100,
+    })
+    return {"code": 0, "data": {"list": frame, "total": np.int64(rows)}, "message": "Success"}
+
+
+def best_of(func, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        cost = time.perf_counter() - start
+        best = cost if best is None else min(best, cost)
+    return best
+
+
+def main():
+    n_pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    payloads = collect_payloads(n_pairs)
+    total = sum(len(p) for p in payloads) / 1024 / 1024
+    response = response_like(5000)
+    print(f"日志内容: {len(payloads)} 段，{total:.1f}M 字符；可用实现: {', '.join(codec.available_backends())}")
+
+    for name, (loads, dumps, dumps_bytes) in codec.BACKENDS.items():
+        decoded = [loads(p) for p in payloads]
+        loads_cost = best_of(lambda: [loads(p) for p in payloads])
+        dumps_cost = best_of(lambda: [dumps(d) for d in decoded])
+        response_cost = best_of(lambda: dumps_bytes(response, sort_keys=True))
+        print(f"{name:8s} 解析 {loads_cost:.3f}s ({total / loads_cost:.0f}M/s)，"
+              f"序列化 {dumps_cost:.3f}s，接口响应 {response_cost * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
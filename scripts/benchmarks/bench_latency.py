@@ -0,0 +1,85 @@
+"""
+请求耗时统计基准测试
+直接构造大量请求对和路由索引（不经过日志解析），测量计算各路由耗时数组和生成耗时报告的时间，
+并与逐个请求对计算的结果核对；再用跟踪模式确认增量刷新后的报告与重新完整解析一致
+
+用法：
+    python scripts/benchmarks/bench_latency.py [请求对数量] [路由数量]
+"""
+
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from entity.processors.client import log_time
+from entity.processors.client.client_processor_new import ClientProcessorNew
+from entity.processors.client.latency_processor import LatencyProcessor
+from entity.processors.client.models import ProcessingState, RequestPair
+from synthetic_log import generate_lines, write_log
+
+
+def build(n_pairs, n_routes):
+    rnd = random.Random(5)
+    state = ProcessingState()
+    req_pairs = {}
+    start = log_time.pack("20250415 09:00:00.000")
+    for i in range(n_pairs):
+        key = "r%07d" % i
+        pair = RequestPair()
+        req_us = start + i * 1000
+        pair.req_time = log_time.render(req_us)
+        pair.rsp_time = log_time.render(req_us + int(rnd.lognormvariate(3, 1.2)) * 1000)
+        req_pairs[key] = pair
+        route = rnd.randrange(n_routes)
+        state.route_index.add(("pb", "svc%d" % (route % 7), "act%d" % route), key, 0)
+    return state, req_pairs
+
+
+def parse(path, follow):
+    processor = ClientProcessorNew([path], isJupyter=True, follow=follow)
+    with contextlib.redirect_stdout(io.StringIO()):
+        processor.parse()
+    return processor
+
+
+def main():
+    n_pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    n_routes = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    state, req_pairs = build(n_pairs, n_routes)
+
+    processor = LatencyProcessor(state, req_pairs)
+    start = time.perf_counter()
+    processor.parse_latency()
+    parsed = time.perf_counter()
+    report = processor.get_latency_report(top=20)
+    reported = time.perf_counter()
+    print(f"{n_pairs} 个请求对、{n_routes} 个路由：计算耗时数组 {parsed - start:.3f}s，生成报告 {reported - parsed:.3f}s")
+
+    expected = sorted(((log_time.to_micros(pair.rsp_time) - log_time.to_micros(pair.req_time)) // 1000
+                       for pair in req_pairs.values()), reverse=True)[:20]
+    assert [item["rtt_ms"] for item in report["slowest"]] == expected
+    assert sum(item["count"] for item in report["histogram"]) == n_pairs
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = write_log(os.path.join(folder, "client.log"), 20000)
+        follower = parse(path, True)
+        for i in range(3):
+            lines = generate_lines(300, seed=200 + i, start="20250415 %02d:00:00.000" % (12 + i))
+            with open(path, "ab") as f:
+                f.write("".join(line + "\r\n" for line in lines).encode("gb2312", errors="ignore"))
+            with contextlib.redirect_stdout(io.StringIO()):
+                follower.refresh()
+        full = parse(path, False)
+        same = follower.get_request_latency(top=0)["summary"] == full.get_request_latency(top=0)["summary"]
+        print(f"跟踪模式刷新后的耗时统计与重新完整解析一致: {same}")
+
+
+if __name__ == "__main__":
+    main()
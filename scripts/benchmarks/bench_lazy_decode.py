@@ -0,0 +1,73 @@
+"""
+请求对延迟解码基准测试
+以行情为主的合成日志上对比：延迟解码的完整解析，与解析后把所有内容全部解码（等价于原来入库时全量json.loads）的耗时和驻留内存
+
+用法：
+    python scripts/benchmarks/bench_lazy_decode.py [请求对数量] [行情权重] [行情数据行数]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from entity.processors.client.client_processor_new import ClientProcessorNew
+from synthetic_log import generate_lines
+
+
+def parse(content):
+    processor = ClientProcessorNew([content], isJupyter=False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        processor.parse()
+    return processor
+
+
+def decode_all(processor):
+    for pair in processor.req_pairs.values():
+        pair["request"]
+        pair["response"]
+
+
+def measure_time(content, eager, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        processor = parse(content)
+        if eager:
+            decode_all(processor)
+        cost = time.perf_counter() - start
+        best = cost if best is None else min(best, cost)
+    return best
+
+
+def measure_memory(content, eager):
+    tracemalloc.start()
+    processor = parse(content)
+    if eager:
+        decode_all(processor)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    decoded = sum(pair.is_decoded("response") for pair in processor.req_pairs.values())
+    return current, decoded, len(processor.req_pairs)
+
+
+def main():
+    n_pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    market_weight = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    market_rows = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    content = "\n".join(generate_lines(n_pairs, market_weight=market_weight, market_rows=market_rows))
+    print(f"合成日志: {len(content) / 1024 / 1024:.1f}M 字符")
+
+    for title, eager in (("延迟解码", False), ("全部解码", True)):
+        cost = measure_time(content, eager)
+        memory, decoded, total = measure_memory(content, eager)
+        print(f"{title}: 解析 {cost:.3f}s，驻留内存 {memory / 1024 / 1024:.1f}M，已解码响应 {decoded}/{total}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+模块按需解析基准测试
+比较解析后立即解析全部模块（原实现）与只解析首屏用到的请求统计和资金模块的耗时，
+并确认后台预解析后各模块的结果与按需解析一致
+
+用法：
+    python scripts/benchmarks/bench_lazy_modules.py [请求对数量]
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from entity.processors.client.client_processor_new import ClientProcessorNew
+from synthetic_log import write_log
+
+
+def normalize(result):
+    """转换为可比较的JSON文本，DataFrame按记录展开"""
+    return json.dumps(result, sort_keys=True, ensure_ascii=False,
+                      default=lambda value: value.to_dict("records") if hasattr(value, "to_dict") else str(value))
+
+
+def first_screen(processor):
+    return processor.show_request_statics(), processor.get_fund_query_data()
+
+
+def timed_parse(path, eager):
+    processor = ClientProcessorNew([path], isJupyter=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        processor.parse()
+        parsed = time.perf_counter()
+        if eager:
+            processor.warm_up(background=False)
+        first_screen(processor)
+        shown = time.perf_counter()
+    return processor, parsed - start, shown - start
+
+
+def main():
+    n_pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with tempfile.TemporaryDirectory() as folder:
+        path = write_log(os.path.join(folder, "client.log"), n_pairs)
+        eager, base_cost, eager_cost = timed_parse(path, True)
+        lazy, _, lazy_cost = timed_parse(path, False)
+        print(f"基础解析 {base_cost:.3f}s；到首屏：解析全部模块 {eager_cost:.3f}s，按需解析 {lazy_cost:.3f}s")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            lazy.warm_up()
+            lazy._warm_up_thread.join()
+            same = all(normalize(getattr(lazy, name)()) == normalize(getattr(eager, name)()) for name in (
+                "get_basket_query_data", "get_algorithm_query_data", "get_condition_summary_data",
+                "get_position_query_data", "get_order_query_data", "get_trade_query_data",
+            ))
+        print(f"后台预解析后与解析全部模块的结果一致: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+日志列表缓存基准测试
+解析一份合成日志后，比较每次过滤都重新生成日志列表（原实现）与复用已生成的日志列表时，连续多次过滤的耗时，
+并确认两种方式的过滤结果一致
+
+用法：
+    python scripts/benchmarks/bench_log_list.py [请求对数量] [过滤次数]
+"""
+
+import contextlib
+import dataclasses
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from entity.processors.client.client_processor_new import ClientProcessorNew
+from synthetic_log import write_log
+
+# 模拟在搜索框中逐字输入
+KEYWORDS = ("q", "qu", "que", "quer", "query")
+
+
+def timed_filters(processor, times, rebuild):
+    results = []
+    start = time.perf_counter()
+    for i in range(times):
+        if rebuild:
+            processor.base_processor.reset_log_list()
+        results = processor.filter_log_list(content=KEYWORDS[i % len(KEYWORDS)])
+    return (time.perf_counter() - start) / times, [dataclasses.asdict(record) for record in results]
+
+
+def main():
+    n_pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    times = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    with tempfile.TemporaryDirectory() as folder:
+        path = write_log(os.path.join(folder, "client.log"), n_pairs)
+        processor = ClientProcessorNew([path], isJupyter=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            processor.parse()
+            first = time.perf_counter()
+            processor.filter_log_list()
+            first = time.perf_counter() - first
+            rebuilt, expected = timed_filters(processor, times, True)
+            cached, results = timed_filters(processor, times, False)
+    print(f"日志列表 {len(processor.state.parsed_log_list)} 条，首次生成 {first:.3f}s")
+    print(f"每次过滤重新生成 {rebuilt:.3f}s/次，复用日志列表 {cached:.3f}s/次，结果一致: {results == expected}")
+
+
+if __name__ == "__main__":
+    main()
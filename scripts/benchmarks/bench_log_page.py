@@ -0,0 +1,64 @@
+"""
+日志列表分页基准测试
+解析一份合成日志后，比较返回全部过滤结果（原接口）与按游标逐页返回时，过滤加序列化响应的耗时和响应大小，
+并确认逐页取完后与全部结果一致
+
+用法：
+    python scripts/benchmarks/bench_log_page.py [请求对数量] [每页记录数]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from entity.processors import codec
+from entity.processors.client.client_processor_new import ClientProcessorNew
+from entity.processors.timeline import paginate
+from synthetic_log import write_log
+
+CONTENTS = ("", "query")
+
+
+def respond(data):
+    """与接口一致，序列化 {'code','data','message'} 响应体"""
+    return codec.dumps_bytes({"code": 0, "data": data, "message": "Success"}, sort_keys=True)
+
+
+def main():
+    n_pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    with tempfile.TemporaryDirectory() as folder:
+        path = write_log(os.path.join(folder, "client.log"), n_pairs)
+        processor = ClientProcessorNew([path], isJupyter=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            processor.parse()
+            processor.filter_log_list(content="query")
+
+    for content in CONTENTS:
+        start = time.perf_counter()
+        body = respond(processor.filter_log_list(content))
+        full = time.perf_counter() - start
+
+        start = time.perf_counter()
+        page = paginate(processor.filter_log_list(content), 0, limit)
+        first_body = respond(page)
+        first = time.perf_counter() - start
+
+        items, cursor, pages = list(page["items"]), page["nextCursor"], 1
+        while cursor:
+            page = paginate(processor.filter_log_list(content), 0, limit, cursor)
+            items.extend(page["items"])
+            cursor, pages = page["nextCursor"], pages + 1
+        print(f"{content or '(无内容条件)'}：共 {page['total']} 条，全部返回 {full:.3f}s、{len(body) / 1024 / 1024:.1f}M；"
+              f"每页 {limit} 条 {first * 1000:.1f}ms、{len(first_body) / 1024:.1f}K，"
+              f"逐页取完 {pages} 页，结果一致: {items == processor.filter_log_list(content)}")
+
+
+if __name__ == "__main__":
+    main()
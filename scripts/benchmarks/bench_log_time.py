@@ -0,0 +1,50 @@
+"""
+日志时间基准测试
+对比按时间字符串逐个 strptime 排序（原查询时间列表的做法）、按字符串排序与按解析时转换好的微秒数排序的耗时，
+以及批量转换一列时间字符串的耗时
+
+用法：
+    python scripts/benchmarks/bench_log_time.py [时间数量]
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "app"))
+
+from entity.processors.client import log_time
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    rnd = random.Random(3)
+    t0 = datetime(2025, 4, 15, 9)
+    texts = [(t0 + timedelta(milliseconds=rnd.randrange(8 * 3600 * 1000))).strftime(log_time.LOG_TIME_FORMAT)[:-3]
+             for _ in range(count)]
+
+    packed, pack_cost = timed(lambda: [log_time.pack(text) for text in texts])
+    by_strptime, strptime_cost = timed(lambda: sorted(texts, key=lambda t: datetime.strptime(t, log_time.LOG_TIME_FORMAT)))
+    by_text, text_cost = timed(lambda: sorted(texts))
+    by_micros, micros_cost = timed(lambda: sorted(packed))
+    rendered, render_cost = timed(lambda: [log_time.render(value) for value in by_micros])
+    series, series_cost = timed(lambda: log_time.micros_series(pd.Series(texts)))
+
+    assert rendered == by_strptime == by_text
+    assert series.tolist() == packed
+    print(f"{count} 个时间：解析时转换 {pack_cost:.3f}s，还原为字符串 {render_cost:.3f}s，批量转换一列 {series_cost:.3f}s")
+    print(f"排序：strptime {strptime_cost:.3f}s，字符串 {text_cost:.3f}s，微秒数 {micros_cost:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
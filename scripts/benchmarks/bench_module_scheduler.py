@@ -0,0 +1,83 @@
+"""
+模块调度基准测试
+解析一份合成日志后，按依赖预解析全部模块，输出各模块的开始时间和耗时，
+并与按 MODULES 顺序逐个访问各模块比较耗时和结果；两者解析顺序相同，预解析只是按依赖排列并记录耗时
+
+用法：
+    python scripts/benchmarks/bench_module_scheduler.py [请求对数量]
+"""
+
+import contextlib
+import gc
+import io
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from entity.processors.client.client_processor_new import ClientProcessorNew
+from bench_lazy_modules import normalize
+from synthetic_log import write_log
+
+RESULTS = (
+    "get_fund_query_data", "get_basket_query_data", "get_algorithm_query_data", "get_condition_summary_data",
+    "get_position_query_data", "get_order_query_data", "get_trade_query_data",
+)
+REPEAT = 2
+
+
+def timed_warm_up(parsed):
+    # 从基础解析后的副本开始，各模块都未解析
+    processor = pickle.loads(parsed)
+    gc.collect()
+    with contextlib.redirect_stdout(io.StringIO()):
+        processor.warm_up(background=False)
+        timings = processor.show_module_timings()
+        results = [normalize(getattr(processor, name)()) for name in RESULTS]
+    wall = (timings["start"] + timings["seconds"]).max()
+    return wall, timings, results
+
+
+def timed_access(parsed):
+    processor = pickle.loads(parsed)
+    gc.collect()
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for name in ClientProcessorNew.MODULES:
+            getattr(processor, name)
+        cost = time.perf_counter() - start
+        results = [normalize(getattr(processor, name)()) for name in RESULTS]
+    return cost, results
+
+
+def main():
+    n_pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with tempfile.TemporaryDirectory() as folder:
+        path = write_log(os.path.join(folder, "client.log"), n_pairs)
+        processor = ClientProcessorNew([path], isJupyter=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            processor.parse()
+        parsed = pickle.dumps(processor)
+
+    # 同一进程中后运行的一方受前一个处理器释放内存的影响更慢，每轮交换先后顺序，各取最短耗时
+    accessed, scheduled = [], []
+    for i in range(REPEAT * 2):
+        if i % 2 == 0:
+            cost, expected = timed_access(parsed)
+            accessed.append(cost)
+        cost, timings, results = timed_warm_up(parsed)
+        scheduled.append(cost)
+        if i % 2 == 1:
+            cost, expected = timed_access(parsed)
+            accessed.append(cost)
+    accessed, scheduled = min(accessed), min(scheduled)
+    print(timings.to_string(float_format="{:.3f}".format))
+    print(f"逐个访问 {accessed:.3f}s，按依赖预解析 {scheduled:.3f}s，结果一致: {results == expected}")
+
+
+if __name__ == "__main__":
+    main()
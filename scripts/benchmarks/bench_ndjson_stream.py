@@ -0,0 +1,84 @@
+"""
+NDJSON流式响应基准测试
+按不同规模解析合成日志并生成日志列表，比较一次序列化完整响应体（原实现）与NDJSON逐条输出时，
+首字节耗时、总耗时和序列化期间的内存峰值，并确认逐行解析后与完整响应的数据一致；
+另外确认分页结果 {total, offset, items, nextCursor} 流式输出时 items 中每条记录单独一行
+
+用法：
+    python scripts/benchmarks/bench_ndjson_stream.py [请求对数量,...]
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from entity.processors import codec
+from entity.processors.client.client_processor_new import ClientProcessorNew
+from entity.processors.timeline import paginate
+from synthetic_log import write_log
+from utils.request import ndjson_response
+
+PAGE_LIMIT = 200
+
+
+def measure(produce):
+    """
+    返回(首字节耗时, 总耗时, 内存峰值)；各块取出后即丢弃，与服务器写出到连接一致，完整响应时响应体本身计入峰值。
+    tracemalloc 会拖慢内存分配，内存峰值单独运行一次统计
+    """
+    start = time.perf_counter()
+    first = None
+    for _ in produce():
+        if first is None:
+            first = time.perf_counter() - start
+    total = time.perf_counter() - start
+    tracemalloc.start()
+    for _ in produce():
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return first, total, peak
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1].split(",")] if len(sys.argv) > 1 else [25000, 50000, 100000]
+    for n_pairs in sizes:
+        with tempfile.TemporaryDirectory() as folder:
+            path = write_log(os.path.join(folder, "client.log"), n_pairs)
+            processor = ClientProcessorNew([path], isJupyter=True)
+            with contextlib.redirect_stdout(io.StringIO()):
+                processor.parse()
+                records = processor.filter_log_list()
+
+        def whole():
+            yield codec.dumps_bytes({"code": 0, "data": records, "message": "Success"}, sort_keys=True)
+
+        def streamed():
+            return ndjson_response(records).response
+
+        first, total, peak = measure(whole)
+        s_first, s_total, s_peak = measure(streamed)
+        lines = [json.loads(line) for line in b"".join(streamed()).splitlines()]
+        same = lines[:-1] == json.loads(next(whole()))["data"] and lines[-1]["code"] == 0
+        print(f"日志列表 {len(records)} 条：完整响应 首字节 {first:.3f}s、共 {total:.3f}s、峰值 {peak / 1024 / 1024:.1f}M；"
+              f"NDJSON 首字节 {s_first * 1000:.2f}ms、共 {s_total:.3f}s、峰值 {s_peak / 1024 / 1024:.2f}M，结果一致: {same}")
+
+        page = paginate(records, 0, PAGE_LIMIT)
+        lines = [json.loads(line) for line in b"".join(ndjson_response(page).response).splitlines()][:-1]
+        items = [line["value"] for line in lines if line["path"] == ["items"]]
+        scalars = {line["path"][0]: line["value"] for line in lines if line["path"] != ["items"]}
+        per_item = (items == json.loads(codec.dumps(page["items"], sort_keys=True))
+                    and scalars == {"total": page["total"], "offset": 0, "nextCursor": page["nextCursor"]})
+        print(f"  分页 {PAGE_LIMIT} 条/页：NDJSON 输出 {len(lines)} 行，items 每条记录一行: {per_item}")
+
+
+if __name__ == "__main__":
+    main()
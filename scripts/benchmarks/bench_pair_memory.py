@@ -0,0 +1,63 @@
+"""
+请求对内存基准测试
+解析一份合成日志后，统计 req_pairs 中每个请求对的驻留字节数：未解码、全部解码后，
+以及转换为普通字典（每个请求对一个含五个键的字典和两个解码后的内容）时的对照
+
+用法：
+    python scripts/benchmarks/bench_pair_memory.py [请求对数量]
+"""
+
+import contextlib
+import gc
+import io
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from entity.processors.client.base_processor import BaseProcessor
+from synthetic_log import write_log
+
+
+def traced():
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def main():
+    n_pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 40000
+    with tempfile.TemporaryDirectory() as folder:
+        path = write_log(os.path.join(folder, "client.log"), n_pairs)
+        processor = BaseProcessor(True)
+        tracemalloc.start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            processor.parse([path])
+        req_pairs = processor.req_pairs
+        processor.req_pairs = None
+        count = len(req_pairs)
+        undecoded = traced()
+
+        for pair in req_pairs.values():
+            pair["request"], pair["response"]
+        decoded = traced()
+
+        # 普通字典与请求对共用解码后的内容，释放请求对后只剩字典表示
+        plain = {req_id: pair.to_dict() for req_id, pair in req_pairs.items()}
+        req_pairs = None
+        as_dict = traced()
+
+        plain = None
+        base = traced()
+        tracemalloc.stop()
+
+    print(f"合成日志请求对 {count}")
+    print(f"未解码: {(undecoded - base) / count:.0f} 字节/请求对")
+    print(f"全部解码后: {(decoded - base) / count:.0f} 字节/请求对")
+    print(f"普通字典表示: {(as_dict - base) / count:.0f} 字节/请求对")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+并行解析基准测试
+把合成日志写成一个或多个文件，依次用1、2、4……个进程解析（单个大文件按换行切分为与进程数相同的段），
+对比耗时并确认请求对与依次解析一致
+
+用法：
+    python scripts/benchmarks/bench_parallel_parse.py [文件数] [每个文件的请求对数量] [最大进程数]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from entity.processors.client.base_processor import BaseProcessor
+from entity.processors.client.parallel_parse import parse_files
+from synthetic_log import write_log
+
+
+def parse(paths, workers):
+    processor = BaseProcessor(isJupyter=True)
+    processor.config.parse_workers = workers
+    processor.config.parse_pool_min_bytes = 0
+    processor.config.parse_shard_min_bytes = 1024 * 1024
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        parse_files(processor, paths)
+    return time.perf_counter() - start, processor
+
+
+def same_pairs(a, b):
+    return list(a.req_pairs) == list(b.req_pairs) and all(
+        a.req_pairs[key].to_dict() == b.req_pairs[key].to_dict() for key in a.req_pairs
+    )
+
+
+def main():
+    n_files = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    n_pairs = int(sys.argv[2]) if len(sys.argv) > 2 else 80000
+    max_workers = int(sys.argv[3]) if len(sys.argv) > 3 else (os.cpu_count() or 1)
+
+    with tempfile.TemporaryDirectory() as folder:
+        paths = [
+            write_log(os.path.join(folder, "client_%d.log" % i), n_pairs, seed=i + 1, start="20250415 %02d:00:00.000" % (9 + i))
+            for i in range(n_files)
+        ]
+        total = sum(os.path.getsize(path) for path in paths) / 1024 / 1024
+        print(f"合成日志: {n_files} 个文件，共 {total:.1f}M，CPU核数 {os.cpu_count()}")
+
+        baseline, serial = parse(paths, 1)
+        print(f"1 进程: {baseline:.3f}s")
+        workers = 2
+        while workers <= max_workers:
+            cost, pooled = parse(paths, workers)
+            print(f"{workers} 进程: {cost:.3f}s（{baseline / cost:.2f}倍），请求对一致: {same_pairs(serial, pooled)}")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+解析缓存基准测试
+对同一份合成日志，对比完整解析（基础解析+请求统计）与命中解析缓存后反序列化的耗时，并确认两者的请求统计一致；
+另外给出后台写入缓存时上传接口需要等待的时间，以及命中缓存后各模块仍需解析的耗时（模块在首次访问时解析，不在缓存中）
+
+用法：
+    python scripts/benchmarks/bench_parse_cache.py [请求对数量]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from entity.processors.client.client_processor_new import ClientProcessorNew
+from entity.processors.client.parse_cache import ParseCache
+from synthetic_log import write_log
+
+
+def main():
+    n_pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 40000
+    with tempfile.TemporaryDirectory() as folder:
+        path = write_log(os.path.join(folder, "client.log"), n_pairs)
+        cache = ParseCache(os.path.join(folder, "cache"), 1024 * 1024 * 1024)
+        print(f"合成日志: {os.path.getsize(path) / 1024 / 1024:.1f}M")
+
+        with open(path, "rb") as f:
+            start = time.perf_counter()
+            with cache.prepare([f]) as (key, file_list):
+                hashed = time.perf_counter()
+                processor = ClientProcessorNew(file_list, isJupyter=False)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    processor.parse()
+                parsed = time.perf_counter()
+                thread = cache.store(key, processor, background=True)
+                returned = time.perf_counter()
+            thread.join()
+            stored = time.perf_counter()
+        print(f"计算哈希 {hashed - start:.3f}s，完整解析 {parsed - hashed:.3f}s，"
+              f"后台写入缓存：等待 {returned - parsed:.3f}s，写入完成 {stored - parsed:.3f}s，"
+              f"缓存文件 {os.path.getsize(cache._path(key)) / 1024 / 1024:.1f}M")
+
+        with open(path, "rb") as f:
+            start = time.perf_counter()
+            with cache.prepare([f]) as (key, _):
+                cached = cache.load(key)
+            cost = time.perf_counter() - start
+        with contextlib.redirect_stdout(io.StringIO()):
+            same = cached.show_request_statics() == processor.show_request_statics()
+        print(f"命中缓存（含计算哈希） {cost:.3f}s，为完整解析的 {cost / (parsed - hashed):.1%}，请求统计一致: {same}")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            cached.warm_up(background=False)
+            modules = time.perf_counter() - start
+        print(f"命中缓存后解析全部模块 {modules:.3f}s（不论是否命中，模块都在首次访问时解析）")
+
+
+if __name__ == "__main__":
+    main()
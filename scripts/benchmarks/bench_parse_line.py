@@ -0,0 +1,102 @@
+"""
+日志行头部解析基准测试
+对比原有的 in 扫描 + split('|') + split('&send=') 路径与分词器的每秒处理行数
+
+两条路径都在整行中查找 new_transmit_、|timeout|；原有路径还要按分隔符和内容标记整行分割、复制出各段，
+分词器只用正则匹配头部、从请求ID之后查找内容标记并返回偏移。分割的耗时随整行长度增长，
+因此同时给出原始合成日志和加宽内容后的结果
+
+用法：
+    python scripts/benchmarks/bench_parse_line.py [请求对数量] [重复次数] [内容加宽倍数]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from entity.processors.client.line_tokenizer import tokenize_line, LINE_NORMAL
+from synthetic_log import generate_lines
+
+SPLIT_MAP = {"request": "&send=", "response": "&recv="}
+
+
+def legacy_header(line):
+    """原有解析路径：三次 in 扫描，整行按 | 分割，再按内容标记分割"""
+    if "new_transmit_" in line:
+        return None
+    elif "|timeout|" in line:
+        return None
+    elif "|" not in line:
+        return None
+    try:
+        parts = line.split('|')
+        req_time = parts[1]
+        req_type = parts[2]
+        req_id = parts[4]
+    except Exception:
+        return None
+    split_line = line.split(SPLIT_MAP.get(req_type, "&send="))
+    payload = split_line[1] if len(split_line) > 1 else ""
+    return req_time, req_type, req_id, payload
+
+
+def tokenizer_header(line):
+    """分词器路径：一次扫描得到偏移量后切片"""
+    kind, req_time, req_type, req_id, payload_start = tokenize_line(line)
+    if kind != LINE_NORMAL:
+        return None
+    payload = line[payload_start:] if payload_start >= 0 else ""
+    return req_time, req_type, req_id, payload
+
+
+def widen_payloads(lines, factor):
+    """在内容末尾追加占位字段，模拟查询响应等长内容"""
+    if factor <= 1:
+        return lines
+    filler = ',"pad":[' + ",".join(['{"SecurityID":"600000","OrderPrice":10.01,"OrderQty":100}'] * factor) + "]"
+    widened = []
+    for line in lines:
+        if line.endswith("}"):
+            line = line[:-1] + filler + "}"
+        widened.append(line)
+    return widened
+
+
+def bench(funcs, lines, repeat):
+    """两条路径交替计时，各取最好的一次，减少机器负载波动对比值的影响"""
+    best = [None] * len(funcs)
+    for _ in range(repeat):
+        for i, func in enumerate(funcs):
+            start = time.perf_counter()
+            for line in lines:
+                func(line)
+            cost = time.perf_counter() - start
+            best[i] = cost if best[i] is None else min(best[i], cost)
+    return [len(lines) / cost for cost in best]
+
+
+def main():
+    n_pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    factor = int(sys.argv[3]) if len(sys.argv) > 3 else 30
+    base_lines = generate_lines(n_pairs)
+
+    for title, lines in (("原始合成日志", base_lines), (f"内容加宽{factor}倍", widen_payloads(base_lines, factor))):
+        # 两条路径解析结果应一致
+        for line in lines:
+            if legacy_header(line) != tokenizer_header(line):
+                print(f"结果不一致: {line[:120]}")
+                break
+
+        legacy, tokenizer = bench((legacy_header, tokenizer_header), lines, repeat)
+        avg_len = sum(len(line) for line in lines) / len(lines)
+        print(f"{title}: {len(lines)} 行，平均 {avg_len:.0f} 字符")
+        print(f"  原有路径: {legacy:,.0f} 行/秒")
+        print(f"  分词器:   {tokenizer:,.0f} 行/秒 ({tokenizer / legacy:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+查询数据响应序列化基准测试
+解析一份合成日志后，对持仓、委托、成交查询数据，比较原实现（convert_data 遍历并把其中的 DataFrame 改写为
+to_dict(orient="records") 的结果，再序列化响应体）与序列化时直接转换 DataFrame 的耗时，并确认响应内容一致；
+另外比较单个大DataFrame的转换耗时
+
+用法：
+    python scripts/benchmarks/bench_query_response.py [请求对数量]
+"""
+
+import contextlib
+import copy
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from entity.processors import codec
+from entity.processors.client.client_processor_new import ClientProcessorNew
+from synthetic_log import write_log
+
+QUERIES = ("get_position_query_data", "get_order_query_data", "get_trade_query_data")
+
+
+def convert_data(data):
+    """原实现：递归把字典中的 DataFrame 改写为按行的字典列表"""
+    if isinstance(data, dict):
+        for key, value in data.items():
+            if isinstance(value, pd.DataFrame):
+                data[key] = value.to_dict(orient='records')
+            elif isinstance(value, set):
+                data[key] = list(value)
+            elif isinstance(value, float) and pd.isna(value):
+                data[key] = None
+            else:
+                convert_data(value)
+    elif isinstance(data, list):
+        for item in data:
+            convert_data(item)
+
+
+def respond(data):
+    return codec.dumps_bytes({"code": 0, "data": data, "message": "Success"}, sort_keys=True)
+
+
+def collect_frames(data, frames):
+    if isinstance(data, pd.DataFrame):
+        frames.append(data)
+    elif isinstance(data, dict):
+        for value in data.values():
+            collect_frames(value, frames)
+    return frames
+
+
+def main():
+    n_pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    with tempfile.TemporaryDirectory() as folder:
+        path = write_log(os.path.join(folder, "client.log"), n_pairs)
+        processor = ClientProcessorNew([path], isJupyter=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            processor.parse()
+            payloads = {name: getattr(processor, name)() for name in QUERIES}
+
+    print(f"序列化后端 {codec.BACKEND}")
+    for name, data in payloads.items():
+        # 原实现会改写数据，在副本上计时
+        legacy_data = copy.deepcopy(data)
+        start = time.perf_counter()
+        convert_data(legacy_data)
+        expected = respond(legacy_data)
+        legacy = time.perf_counter() - start
+
+        start = time.perf_counter()
+        body = respond(data)
+        direct = time.perf_counter() - start
+        frames = collect_frames(data, [])
+        print(f"{name}：{len(frames)} 个DataFrame，响应 {len(body) / 1024 / 1024:.1f}M，"
+              f"原实现 {legacy:.3f}s，直接转换 {direct:.3f}s，结果一致: {json.loads(body) == json.loads(expected)}")
+
+    # 多个查询结果合并为一个大DataFrame，部分价格缺失
+    frames = [frame for frame in collect_frames(payloads["get_position_query_data"], []) if len(frame)]
+    big = pd.concat(frames * 5, ignore_index=True)
+    big.loc[::7, big.select_dtypes("float").columns] = np.nan
+    start = time.perf_counter()
+    expected = codec.dumps_bytes(big.to_dict(orient="records"), sort_keys=True)
+    legacy = time.perf_counter() - start
+    start = time.perf_counter()
+    body = codec.dumps_bytes(big, sort_keys=True)
+    direct = time.perf_counter() - start
+    print(f"单个DataFrame {big.shape}：to_dict 后序列化 {legacy:.3f}s，直接转换 {direct:.3f}s，"
+          f"结果一致: {json.loads(body) == json.loads(expected)}")
+
+
+if __name__ == "__main__":
+    main()
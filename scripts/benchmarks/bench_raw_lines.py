@@ -0,0 +1,79 @@
+"""
+原始行存储基准测试
+在含大量超时、跳过、无请求ID行的合成日志上，对比诊断列表保存行文本（web模式）与只保存行位置（jupyter模式）的驻留内存，
+以及全部读取一遍行文本的耗时
+
+用法：
+    python scripts/benchmarks/bench_raw_lines.py [请求对数量] [每个请求对附带的噪声行数]
+"""
+
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from entity.processors.client.base_processor import BaseProcessor
+from synthetic_log import generate_lines
+
+NOISE = [
+    "0x1f2e|20250415 09:30:00.000|request|INFO|{rid}|timeout|ws://127.0.0.1:8080/api&send={{\"servicename\": \"rpc.quota\", \"padding\": \"{pad}\"}}",
+    "heartbeat ok {pad}",
+    "0x1f2e|20250415 09:30:00.000|request|INFO||ws://127.0.0.1:8080/api&send={{\"event\": \"ui\", \"padding\": \"{pad}\"}}",
+]
+
+
+def write_noisy_log(path, n_pairs, noise):
+    rng = random.Random(11)
+    with open(path, "wb") as f:
+        for i, line in enumerate(generate_lines(n_pairs)):
+            f.write((line + "\r\n").encode("gb2312", errors="ignore"))
+            for j in range(noise):
+                text = rng.choice(NOISE).format(rid="t%d_%d" % (i, j), pad="x" * rng.randint(100, 400))
+                f.write((text + "\r\n").encode("gb2312"))
+
+
+DIAGNOSTIC_LISTS = ("illegal_reqs", "timeout_reqs", "skipped_reqs", "new_transmit_reqs", "lines_without_reqid")
+
+
+def measure(path, is_jupyter):
+    tracemalloc.start()
+    processor = BaseProcessor(is_jupyter)
+    with contextlib.redirect_stdout(io.StringIO()):
+        if is_jupyter:
+            processor.parse([path])
+        else:
+            with open(path, "rb") as f:
+                processor.parse([f])
+    processor.req_pairs = {}
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    chars = sum(len(line) for name in ("timeout_reqs", "skipped_reqs", "lines_without_reqid")
+                for line in getattr(processor.state, name))
+    cost = time.perf_counter() - start
+    lines = sum(len(getattr(processor.state, name)) for name in DIAGNOSTIC_LISTS)
+    return current, lines, chars, cost
+
+
+def main():
+    n_pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    noise = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "noisy.log")
+        write_noisy_log(path, n_pairs, noise)
+        print(f"合成日志: {os.path.getsize(path) / 1024 / 1024:.1f}M")
+        for title, is_jupyter in (("保存行文本", False), ("保存行位置", True)):
+            memory, lines, chars, cost = measure(path, is_jupyter)
+            print(f"{title}: 诊断行 {lines}，解析后状态驻留 {memory / 1024 / 1024:.1f}M，读取全部行文本 {chars / 1024 / 1024:.1f}M字符耗时 {cost:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
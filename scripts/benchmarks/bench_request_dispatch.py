@@ -0,0 +1,75 @@
+"""
+请求分发基准测试
+解析一份合成日志后，比较各模块分别遍历全部请求对筛选所需请求（原实现）与在请求统计的同一遍历中按订阅的请求类别分发的耗时
+
+用法：
+    python scripts/benchmarks/bench_request_dispatch.py [请求对数量] [重复次数]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from entity.processors.client.account_processor import AccountProcessor
+from entity.processors.client.algorithm_processor import AlgorithmProcessor
+from entity.processors.client.base_processor import BaseProcessor
+from entity.processors.client.statistics_processor import StatisticsProcessor
+from synthetic_log import write_log
+
+KINDS = AccountProcessor.REQUEST_KINDS + AlgorithmProcessor.REQUEST_KINDS
+
+
+def scan_separately(req_pairs):
+    """原实现：统计之外，三个筛选各自遍历全部请求对，循环开头的取值与原实现一致"""
+    upload = [key for key, value in req_pairs.items() if "upload_fund_info" in value.text("request")]
+    portfolio = []
+    for key, value in req_pairs.items():
+        checkstr = value.text("request")
+        if "list_account_portfolio" in checkstr and "with_permission" in checkstr:
+            portfolio.append(key)
+    algorithm = []
+    for key, value in req_pairs.items():
+        protocol = value.get("protocol", "")
+        req_time = value["req_time"]
+        rsp_time = value["rsp_time"]
+        if protocol == "json":
+            if value.request_field("method") == "new_instmanage":
+                algorithm.append(key)
+    return {"upload_fund_info": upload, "list_account_portfolio": portfolio, "new_instmanage": algorithm}
+
+
+def measure(processor, repeat, subscribe):
+    statistics = StatisticsProcessor(processor.state, processor.req_pairs)
+    if subscribe:
+        statistics.subscribe(KINDS)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        statistics.parse_request_statistics()
+        kinds = dict(processor.state.route_index.kinds) if subscribe else scan_separately(processor.req_pairs)
+    return (time.perf_counter() - start) / repeat, kinds
+
+
+def main():
+    n_pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 40000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    with tempfile.TemporaryDirectory() as folder:
+        path = write_log(os.path.join(folder, "client.log"), n_pairs)
+        processor = BaseProcessor(True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            processor.parse([path])
+    print(f"请求对 {len(processor.req_pairs)}，订阅的请求类别 {len(KINDS)}")
+
+    separate, expected = measure(processor, repeat, False)
+    dispatched, kinds = measure(processor, repeat, True)
+    same = all(kinds.get(name, []) == keys for name, keys in expected.items())
+    print(f"统计后各自遍历筛选 {separate:.3f}s，统计时一并分发 {dispatched:.3f}s，筛选结果一致: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+请求统计基准测试
+解析一份合成日志后，分别在请求对未解码和全部解码后测量请求统计（分类并建立路由索引）一遍的耗时，以及展示请求统计的耗时
+
+用法：
+    python scripts/benchmarks/bench_request_statistics.py [请求对数量] [展示次数]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from entity.processors.client.base_processor import BaseProcessor
+from entity.processors.client.statistics_processor import StatisticsProcessor
+from synthetic_log import write_log
+
+
+def measure(processor, repeat):
+    statistics = StatisticsProcessor(processor.state, processor.req_pairs)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        statistics.parse_request_statistics()
+        parsed = time.perf_counter()
+        for _ in range(repeat):
+            result = statistics.show_request_statics()
+        shown = time.perf_counter()
+    return parsed - start, (shown - parsed) / repeat, result
+
+
+def main():
+    n_pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 40000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    with tempfile.TemporaryDirectory() as folder:
+        path = write_log(os.path.join(folder, "client.log"), n_pairs)
+        processor = BaseProcessor(True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            processor.parse([path])
+    print(f"请求对 {len(processor.req_pairs)}")
+
+    cost, show, raw_result = measure(processor, repeat)
+    print(f"未解码：统计 {cost:.3f}s，展示一次 {show * 1000:.2f}ms")
+
+    # 内容长度按原文在日志中的字节数统计，中文内容多于字符数
+    route_index = processor.state.route_index
+    total = sum(route_index.totals(route)[1] for route in route_index)
+    counted = [pair for pair in processor.req_pairs.values() if pair.route_key is not None]
+    expected = sum(len(pair.raw_text(req_type).encode(processor.config.encoding))
+                   for pair in counted for req_type in ("request", "response"))
+    chars = sum(len(pair.raw_text(req_type)) for pair in counted for req_type in ("request", "response"))
+    print(f"内容总字节数 {total}（字符数 {chars}），与按日志编码计算一致: {total == expected}")
+
+    for pair in processor.req_pairs.values():
+        pair["request"], pair["response"]
+        # 重新分类，不使用上一轮登记到路由索引的结果
+        pair.route_key = None
+    processor.state.counts = processor.state.counts_pb = processor.state.counts_json = processor.state.counts_funid = 0
+    cost, show, decoded_result = measure(processor, repeat)
+    print(f"全部解码后：统计 {cost:.3f}s，展示一次 {show * 1000:.2f}ms，与未解码时结果一致: {raw_result == decoded_result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+跟踪模式增量刷新基准测试
+先解析一份合成日志，再多次向文件追加少量日志（每次末尾留半行），对比每次 refresh 与重新完整解析的耗时，
+并确认最终的请求统计与重新完整解析一致
+
+用法：
+    python scripts/benchmarks/bench_tail_refresh.py [初始请求对数量] [每次追加的请求对数量] [追加次数]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from entity.processors.client.client_processor_new import ClientProcessorNew
+from synthetic_log import generate_lines, write_log
+
+
+def encode(lines):
+    return "".join(line + "\r\n" for line in lines).encode("gb2312", errors="ignore")
+
+
+def parse(path, follow):
+    processor = ClientProcessorNew([path], isJupyter=True, follow=follow)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        processor.parse()
+    return time.perf_counter() - start, processor
+
+
+def statics(processor):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return sorted(map(str, processor.show_request_statics()))
+
+
+def main():
+    n_pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 40000
+    n_append = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    rounds = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = write_log(os.path.join(folder, "client.log"), n_pairs)
+        cost, follower = parse(path, True)
+        print(f"初始日志 {os.path.getsize(path) / 1024 / 1024:.1f}M，跟踪模式首次解析 {cost:.3f}s")
+
+        tail = b""
+        for i in range(rounds):
+            data = tail + encode(generate_lines(n_append, seed=100 + i, start="20250415 %02d:00:00.000" % (12 + i)))
+            # 每次留下最后半行，下一次再写完
+            cut = len(data) - 40
+            with open(path, "ab") as f:
+                f.write(data[:cut])
+            tail = data[cut:]
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                completed = follower.refresh()
+            print(f"第{i + 1}次追加 {cut / 1024:.0f}K：refresh {time.perf_counter() - start:.3f}s，新增完整请求对 {len(completed)}")
+
+        with open(path, "ab") as f:
+            f.write(tail)
+        with contextlib.redirect_stdout(io.StringIO()):
+            follower.refresh()
+        cost, full = parse(path, False)
+        print(f"重新完整解析 {cost:.3f}s，请求统计一致: {statics(follower) == statics(full)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+日志内容索引基准测试
+按不同规模解析合成日志并生成日志列表，比较逐条匹配与先用三字节组索引缩小候选范围的检索耗时，
+并确认两种方式的结果一致；另外核对不带 expr: 前缀时 & 和开头的 ! 按字面匹配，与原来逐项查找子串的结果一致
+
+用法：
+    python scripts/benchmarks/bench_text_index.py [请求对数量,...] [重复次数]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from entity.processors.client.client_processor_new import ClientProcessorNew
+from entity.processors.text_index import TrigramIndex, filter_records
+from synthetic_log import write_log
+
+QUERIES = ("cond2995", "expr:/cond29\\d5/", "expr:资金不足&tokA", "query")
+# 不带前缀的条件按 ~ 分隔后逐项查找子串，内容中含有 & ! / 本身
+LITERAL_CONTENTS = ("side=B&qty=100", "!cond2995 skipped", "path /cond29\\d5/ ok", "cond2995 filled", "plain")
+LITERAL_QUERIES = ("side=B&qty=100", "!cond2995", "/cond29\\d5/~side=B", "&qty~plain", "B&q")
+
+
+def timed(records, content, index, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = filter_records(records, content, index)
+    return (time.perf_counter() - start) / repeat, result
+
+
+def legacy_filter(records, content):
+    """原实现：~分隔的各项任意一项是内容的子串即可"""
+    texts = content.split("~")
+    return [record for record in records if any(text in record.content for text in texts)]
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1].split(",")] if len(sys.argv) > 1 else [25000, 50000, 100000]
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    for n_pairs in sizes:
+        with tempfile.TemporaryDirectory() as folder:
+            path = write_log(os.path.join(folder, "client.log"), n_pairs)
+            processor = ClientProcessorNew([path], isJupyter=True)
+            with contextlib.redirect_stdout(io.StringIO()):
+                processor.parse()
+                records = processor.filter_log_list()
+        start = time.perf_counter()
+        index = TrigramIndex([record.content for record in records])
+        built = time.perf_counter() - start
+        size = (index.blocks.nbytes + index.offsets.nbytes) / 1024 / 1024
+        print(f"日志列表 {len(records)} 条，建立索引 {built:.3f}s，索引 {size:.1f}M")
+        for content in QUERIES:
+            scanned, expected = timed(records, content, None, repeat)
+            indexed, result = timed(records, content, index, repeat)
+            print(f"  {content:<14} 命中 {len(result):>6}，逐条匹配 {scanned * 1000:7.1f}ms，"
+                  f"使用索引 {indexed * 1000:7.1f}ms，结果一致: {result == expected}")
+
+
+    # 内容含有 & ! / 的记录，数量超过建立索引的下限，逐条匹配和使用索引各核对一次
+    records = [SimpleNamespace(content=f"{i} {text}") for i in range(5000) for text in LITERAL_CONTENTS]
+    index = TrigramIndex([record.content for record in records])
+    for content in LITERAL_QUERIES:
+        expected = legacy_filter(records, content)
+        same = [filter_records(records, content, item) == expected for item in (None, index)]
+        print(f"  {content:<20} 按字面匹配 {len(expected):>6}，与原实现一致（逐条、使用索引）: {same}")
+
+
+if __name__ == "__main__":
+    main()
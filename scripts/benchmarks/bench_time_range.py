@@ -0,0 +1,69 @@
+"""
+时间范围过滤基准测试
+按不同规模解析合成日志并生成日志列表，比较逐条比较时间（原实现）与在按时间排序的日志列表上二分查找的耗时，
+时间范围固定为日志中间约1000条记录，同时指定内容条件时只在范围内过滤；并确认结果与逐条比较时间、匹配内容一致
+
+用法：
+    python scripts/benchmarks/bench_time_range.py [请求对数量,...] [重复次数]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from entity.processors.client import log_time
+from entity.processors.client.client_processor_new import ClientProcessorNew
+from entity.processors.text_index import LogQuery
+from synthetic_log import write_log
+
+CONTENTS = ("", "query", "cond2995&!fund")
+WINDOW = 1000
+
+
+def filter_linear(records, content, start_time, end_time):
+    """原实现：逐条比较时间，再逐条匹配内容"""
+    start_us, end_us = log_time.to_micros(start_time), log_time.to_micros(end_time)
+    result = [log for log in records if start_us <= log.time_us <= end_us]
+    if content != "":
+        query = LogQuery(content)
+        result = [log for log in result if query.matches(log.content)]
+    return result
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1].split(",")] if len(sys.argv) > 1 else [25000, 50000, 100000]
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    for n_pairs in sizes:
+        with tempfile.TemporaryDirectory() as folder:
+            path = write_log(os.path.join(folder, "client.log"), n_pairs)
+            processor = ClientProcessorNew([path], isJupyter=True)
+            with contextlib.redirect_stdout(io.StringIO()):
+                processor.parse()
+                records = processor.filter_log_list()
+                # 内容索引在首次检索全部日志时建立，耗时见 bench_text_index.py，这里不计入
+                processor.filter_log_list(content="query")
+        middle = len(records) // 2
+        start_time, end_time = records[middle].time, records[middle + WINDOW].time
+        print(f"日志列表 {len(records)} 条，时间范围 {start_time} - {end_time}")
+        for content in CONTENTS:
+            scanned, expected = timed(lambda: filter_linear(records, content, start_time, end_time), repeat)
+            sliced, result = timed(lambda: processor.filter_log_list(content, start_time, end_time), repeat)
+            print(f"  {content or '(无内容条件)':<16} 命中 {len(result):>5}，逐条比较 {scanned * 1000:7.2f}ms，"
+                  f"二分查找 {sliced * 1000:7.3f}ms，结果一致: {result == expected}")
+
+
+if __name__ == "__main__":
+    main()
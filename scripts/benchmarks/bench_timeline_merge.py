@@ -0,0 +1,93 @@
+"""
+时间线归并基准测试
+解析一份合成日志后，比较原三指针合并（请求、响应、推送三个列表，任一列表取完后其余直接拼接）
+与按来源k路归并生成日志列表的耗时，检查结果是否按时间排序；再与合成的操作日志归并为一条时间线
+
+用法：
+    python scripts/benchmarks/bench_timeline_merge.py [请求对数量] [操作日志行数]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from entity.processors.client.client_processor_new import ClientProcessorNew
+from entity.processors.operation.operation_processor import OperationProcessor
+from entity.processors.timeline import merge_by_time
+from synthetic_log import write_log
+
+
+def merge_three_pointer(request_records, response_records, push_data):
+    """原实现：三个列表都未取完时取时间最小的，之后按请求、响应、推送依次拼接剩余部分"""
+    i, j, k = 0, 0, 0
+    merged = []
+    while i < len(request_records) and j < len(response_records) and k < len(push_data):
+        req_time, rsp_time, push_time = request_records[i].time_us, response_records[j].time_us, push_data[k].time_us
+        if req_time <= rsp_time and req_time <= push_time:
+            merged.append(request_records[i])
+            i += 1
+        elif rsp_time <= req_time and rsp_time <= push_time:
+            merged.append(response_records[j])
+            j += 1
+        else:
+            merged.append(push_data[k])
+            k += 1
+    merged.extend(request_records[i:])
+    merged.extend(response_records[j:])
+    merged.extend(push_data[k:])
+    return merged
+
+
+def operation_log(n_lines):
+    lines = []
+    for i in range(n_lines):
+        second, millis = divmod(i * 37, 1000)
+        minute, second = divmod(second, 60)
+        stamp = f"20250415 09:{minute:02d}:{second:02d}:{millis:03d}"
+        lines.append(f"{stamp}:000 {stamp}\t算法管理-算法交易窗口\t点击菜单：卖出F{i % 10}")
+    return "\n".join(lines)
+
+
+def is_sorted(records):
+    return all(a.time_us <= b.time_us for a, b in zip(records, records[1:]))
+
+
+def main():
+    n_pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    n_operations = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    with tempfile.TemporaryDirectory() as folder:
+        path = write_log(os.path.join(folder, "client.log"), n_pairs)
+        processor = ClientProcessorNew([path], isJupyter=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            processor.parse()
+            processor.filter_log_list()
+    parts = processor.state.log_list_parts
+    pushes = sorted((record for name, records in parts.items() if name not in ("request", "response")
+                     for record in records), key=lambda record: record.time_us)
+
+    start = time.perf_counter()
+    merged = merge_three_pointer(parts["request"], parts["response"], pushes)
+    three_pointer = time.perf_counter() - start
+    start = time.perf_counter()
+    timeline = list(merge_by_time(*parts.values()))
+    k_way = time.perf_counter() - start
+    print(f"日志列表 {len(timeline)} 条，来源 {len(parts)} 个")
+    print(f"三指针合并 {three_pointer:.3f}s（按时间排序: {is_sorted(merged)}），"
+          f"k路归并 {k_way:.3f}s（按时间排序: {is_sorted(timeline)}）")
+
+    operation = OperationProcessor([operation_log(n_operations)])
+    operation.parse()
+    start = time.perf_counter()
+    combined = list(merge_by_time(processor.filter_log_list(), operation.filter_log_list()))
+    print(f"与 {len(operation.state.log_list)} 行操作日志归并 {time.perf_counter() - start:.3f}s，"
+          f"共 {len(combined)} 条，按时间排序: {is_sorted(combined)}")
+
+
+if __name__ == "__main__":
+    main()
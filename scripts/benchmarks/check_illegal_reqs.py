@@ -0,0 +1,133 @@
+"""
+非法请求与跳过行记录核对
+在合成日志中混入各类不合法的请求/响应内容（多余的逗号、非法转义、被截断、未知行类型等）和不含分隔符的行，
+分别用原实现（逐行 json.loads，失败时把整行记入 illegal_reqs）和当前解析器在web、jupyter模式下解析，
+核对 illegal_reqs 的行文本、顺序、异常，skipped_reqs 的行文本，以及清理空请求后保留的请求ID是否一致；
+LF和CRLF行尾、文件末尾有无换行各核对一次（web模式按 \n 分割，以换行结尾时最后有一个空行，jupyter模式没有）
+
+原实现在jupyter模式下以文本方式读取文件，行尾的 \r\n 转换为 \n 并保留在行中；
+当前解析器按二进制分块读取，行文本不含换行符，核对时去掉原实现行尾的 \n。
+内容末尾缺少值时异常信息中的位置会因这个 \n 不同，因此异常只核对类型
+
+用法：
+    python scripts/benchmarks/check_illegal_reqs.py [请求对数量] [混入的非法行数]
+"""
+
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from entity.processors.client.client_processor_new import ClientProcessorNew
+from synthetic_log import generate_lines
+
+SPLIT_MAP = {"request": "&send=", "response": "&recv="}
+
+
+def corrupt(line, kind):
+    """把一行的内容改为不合法的JSON"""
+    if kind == "trailing_comma":
+        return line[:-1] + ",}"
+    if kind == "bad_escape":
+        return line[:-1] + ',"x":"\\q"}'
+    if kind == "bad_literal":
+        return line[:-1] + ',"x":tru}'
+    if kind == "trailing_data":
+        return line + "}"
+    # 未知的行类型
+    parts = line.split("|")
+    parts[2] = "notify"
+    return "|".join(parts)
+
+
+def legacy_parse(lines):
+    """原实现：只保留与 illegal_reqs、skipped_reqs 和空请求清理相关的逻辑"""
+    illegal, skipped, pairs = [], [], {}
+    for line in lines:
+        if "new_transmit_" in line or "|timeout|" in line:
+            continue
+        if "|" not in line:
+            skipped.append(line)
+            continue
+        try:
+            parts = line.split("|")
+            req_type, req_id = parts[2], parts[4]
+        except Exception:
+            continue
+        if req_id == "":
+            continue
+        pair = pairs.setdefault(req_id, {"request": "", "response": ""})
+        try:
+            split_line = line.split(SPLIT_MAP[req_type])
+            req_split = split_line[1] if (len(split_line) > 1 and len(split_line[1]) > 2) else '{}'
+            req_split = req_split.replace("******", "}]}}}},")
+            req_split = req_split.replace("\r\n", "")
+            pair[req_type] = json.loads(req_split)
+        except Exception as e:
+            illegal.append((line, type(e).__name__))
+    kept = [key for key, value in pairs.items()
+            if len(json.dumps(value["request"])) > 2 and len(json.dumps(value["response"])) > 2]
+    return illegal, skipped, kept
+
+
+def legacy_lines(content, path, jupyter):
+    """原实现读取的日志行：web模式按 \n 分割文件内容，jupyter模式以文本方式逐行读取文件"""
+    if not jupyter:
+        return content.split("\n")
+    with open(path, "r", encoding="gb2312", errors="ignore") as f:
+        return list(f)
+
+
+def strip_newline(line):
+    return line[:-1] if line.endswith("\n") else line
+
+
+def current_parse(files, jupyter):
+    processor = ClientProcessorNew(files, isJupyter=jupyter)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        processor.parse()
+        cost = time.perf_counter() - start
+    illegal = [(item["line"], type(item["e"]).__name__) for item in processor.state.illegal_reqs]
+    return illegal, list(processor.state.skipped_reqs), list(processor.req_pairs), cost
+
+
+def main():
+    n_pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    n_bad = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    lines = generate_lines(n_pairs)
+    rnd = random.Random(11)
+    kinds = ("trailing_comma", "bad_escape", "bad_literal", "trailing_data", "unknown_type")
+    candidates = [i for i, line in enumerate(lines) if line.endswith("}") and ("&send=" in line or "&recv=" in line)]
+    for i in rnd.sample(candidates, min(n_bad, len(candidates))):
+        lines[i] = corrupt(lines[i], rnd.choice(kinds))
+    # 不含分隔符的行：空行和多行内容的续行
+    for i in sorted(rnd.sample(range(len(lines)), n_bad // 10), reverse=True):
+        lines.insert(i, rnd.choice(("", "    at com.example.Client.send(Client.java:42)")))
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "client.log")
+        for newline in ("\n", "\r\n"):
+            for tail in ("", newline):
+                content = newline.join(lines) + tail
+                with open(path, "wb") as f:
+                    f.write(content.encode("gb2312", errors="ignore"))
+                print(f"合成日志 {len(lines)} 行，行尾 {newline!r}，末尾{'有' if tail else '无'}换行")
+                for title, files, jupyter in (("web", [content], False), ("jupyter", [path], True)):
+                    expected, expected_skipped, expected_kept = legacy_parse(legacy_lines(content, path, jupyter))
+                    expected = [(strip_newline(line), e) for line, e in expected]
+                    expected_skipped = [strip_newline(line) for line in expected_skipped]
+                    illegal, skipped, kept, cost = current_parse(files, jupyter)
+                    print(f"  {title}：解析 {cost:.3f}s，非法请求 {len(illegal)} 条（原实现 {len(expected)} 条），"
+                          f"与原实现一致: {illegal == expected}，跳过的行 {len(skipped)} 条，"
+                          f"与原实现一致: {skipped == expected_skipped}，保留的请求对一致: {kept == expected_kept}")
+
+
+if __name__ == "__main__":
+    main()
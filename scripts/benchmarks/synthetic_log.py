@@ -0,0 +1,174 @@
+"""
+合成客户端日志生成器
+用于基准测试和回归对比，按真实日志的行格式生成请求、响应、推送和各类异常行
+"""
+
+import json
+import random
+from datetime import datetime, timedelta
+
+FUND_TOKENS = ["tokA", "tokB", "tokC"]
+CLIENT_TOKENS = {"ctA": "tokA", "ctB": "tokB", "ctC": "tokC"}
+
+
+def _line(ts, req_type, req_id, marker, payload):
+    return "0x1f2e|%s|%s|INFO|%s|ws://127.0.0.1:8080/api%s%s" % (
+        ts, req_type, req_id, marker, json.dumps(payload, ensure_ascii=False))
+
+
+def _pair(lines, ts, rsp_ts, req_id, request, response):
+    lines.append((ts, _line(ts, "request", req_id, "&send=", request)))
+    lines.append((rsp_ts, _line(rsp_ts, "response", req_id, "&recv=", response)))
+
+
+def generate_lines(n_pairs=2000, seed=7, start="20250415 09:00:00.000", market_weight=3, market_rows=1):
+    """
+    生成合成日志行
+
+    Args:
+        n_pairs: 请求响应对数量（近似）
+        seed: 随机种子
+        start: 起始时间
+        market_weight: 行情订阅在请求类型中的权重，调大可模拟以行情为主的日志
+        market_rows: 每个行情响应的数据行数
+
+    Returns:
+        日志行列表（不含换行符），按时间排序
+    """
+    rnd = random.Random(seed)
+    t0 = datetime.strptime(start, "%Y%m%d %H:%M:%S.%f")
+    lines = []
+
+    def fmt(dt):
+        return dt.strftime("%Y%m%d %H:%M:%S.") + "%03d" % (dt.microsecond // 1000)
+
+    # 账户映射
+    for i, (ct, tok) in enumerate(CLIENT_TOKENS.items()):
+        ts = t0 + timedelta(milliseconds=i * 3)
+        _pair(lines, fmt(ts), fmt(ts + timedelta(milliseconds=40)), "acc-up-%d-%d" % (seed, i),
+              {"method": "graphql", "params": {"action": "query", "query": 'mutation{account_fn{upload_fund_info(x:1,fund_token:"%s"){fund_info}}}' % tok}, "useraccount": "tester"},
+              {"result": {"data": {"account_fn": {"upload_fund_info": {"fund_info": [{"fund_token": ct, "permission_code": "P%d" % i, "account_name": "账户%d" % i}]}}}}})
+    ts = t0 + timedelta(milliseconds=20)
+    edges = [{"portfolios": [{"fund_token": tok}], "user_id": "u1", "account_code": "A%d" % i, "account_name": "账户%d" % i,
+              "alias": "别名", "broker_name": "券商", "qsid": "q%d" % i, "trade_type": "normal"} for i, tok in enumerate(FUND_TOKENS)]
+    _pair(lines, fmt(ts), fmt(ts + timedelta(milliseconds=80)), "acc-list-%d" % seed,
+          {"method": "graphql", "params": {"action": "query", "query": "{account_fn{list_account_portfolio(with_permission:true){edges}}}"}},
+          {"result": {"data": {"account_fn": {"list_account_portfolio": {"edges": edges}}}}})
+
+    kinds = ["md"] * market_weight + ["hb", "asset", "stock", "order", "trade", "rzrq_pos", "rzrq_asset",
+             "insert", "basket", "qbasket", "algo_q", "algo_new", "cond_create", "ipo", "fin"]
+    ms = 200
+    for n in range(n_pairs):
+        ms += rnd.randint(1, 30)
+        ts = t0 + timedelta(milliseconds=ms)
+        rsp = ts + timedelta(milliseconds=rnd.randint(1, 400))
+        kind = rnd.choice(kinds)
+        rid = "r%d-%07d" % (seed, n)
+        tok = rnd.choice(FUND_TOKENS)
+        if kind == "md":
+            req = {"servicename": "rpc.marketdata", "method": "subscribe", "params": {"codes": ["600%03d" % rnd.randint(0, 999)]}, "id": rid}
+            rspd = {"result": {"code": 0, "data": [{"p": rnd.random() * 10, "v": rnd.randint(1, 1000)} for _ in range(market_rows)]}}
+        elif kind == "hb":
+            req = {"servicename": "heartbeat.svc", "params": {"action": "ping"}, "id": rid}
+            rspd = {"result": {"code": 0}}
+        elif kind == "asset":
+            req = {"servicename": "rpc.trader.stock", "method": "query_account_asset", "params": {"fund_token": tok}}
+            if rnd.random() < 0.1:
+                rspd = {"error": {"code": 500, "message": "超时"}}
+            else:
+                rspd = {"result": {"account_asset": [{"available_value": 1000.5, "balance_value": 2000, "currency_msg": "人民币", "frozen_value": 0,
+                                                      "market_value": 300.25, "total_assets": 5000, "total_net_value": 4000}]}}
+        elif kind == "stock":
+            req = {"servicename": "rpc.trader.stock", "method": "query_account_stock", "params": {"fund_token": tok}}
+            rspd = {"result": {"account_stock": [{"security_id": "600%03d" % k, "security_name": "股票%d" % k, "actual_amt": 100 * k,
+                                                  "available_stock_balance": 100, "cost_price": 1.5 + k, "frozen_qty": 0, "market": 1,
+                                                  "market_name": "上海", "market_price": 2.0, "market_value": 200.0, "stock_balance": 100,
+                                                  "yield": 0.1} for k in range(rnd.randint(0, 4))]}}
+        elif kind == "order":
+            req = {"servicename": "rpc.trader.stock", "method": "query_order", "params": {"fund_token": tok}}
+            rspd = {"result": {"orders": [{"symbol": "600000", "symbol_name": "浦发", "order_no": "o%d" % n, "price": 10.1, "quantity": 100}]}}
+        elif kind == "trade":
+            req = {"servicename": "rpc.trader.stock", "method": "query_trade", "params": {"fund_token": tok}}
+            rspd = {"result": {"trades": [{"symbol": "600000", "order_no": "o%d" % n, "price": 10.1, "quantity": 100}]}}
+        elif kind == "rzrq_pos":
+            req = {"method": "stockrzrq", "params": {"FunID": 501002, "fund_token": tok}}
+            rspd = {"result": {"Array": [{"SecurityID": "000001", "SecurityName": "平安", "AccountSecPosition": 10, "CostPrice": 12.3}]}}
+        elif kind == "rzrq_asset":
+            req = {"method": "stockrzrq", "params": {"FunID": 501001, "fund_token": tok}}
+            rspd = {"result": {"Array": [{"EnableBalance": 1.0, "AvailableValue": 2.0, "TotalAssets": 3.0}]}}
+        elif kind == "insert":
+            req = {"servicename": "rpc.order.manager", "method": "insert_order_jgb", "params": {"fund_token": tok, "symbol": "600000", "price": 10.0, "quantity": 100, "side": "B", "order_source": "x"}}
+            rspd = {"result": {"code": 0}} if rnd.random() < 0.8 else {"error": {"code": 7, "message": "资金不足"}}
+        elif kind == "basket":
+            inst = "inst%d" % n
+            req = {"method": "basket", "params": {"action": "BasketOrder", "InstanceID": inst, "ClientOrderType": "T%d" % rnd.randint(0, 2), "Side": "B", "Note": "",
+                                                  "OrderBase": [{"SecurityID": "600%03d" % k, "fund_token": tok, "MarketID": 1, "Side": "B", "OrderQty": 100, "OrderPrice": 1.0, "PriceType": 0} for k in range(3)]}}
+            rspd = {"result": {"code": 0}}
+            for k in range(2):
+                pts = ts + timedelta(milliseconds=5 + k)
+                ct = [c for c, t in CLIENT_TOKENS.items() if t == tok][0]
+                lines.append((fmt(pts), _line(fmt(pts), "response", "", "&recv=", {"method": "basket_order_push", "params": {"data": {
+                    "MarketID": 1, "SecurityID": "600%03d" % k, "InstanceID": inst, "fund_token": ct, "Side": "B", "OrderPrice": 1.0, "OrderQty": 100,
+                    "TradeVolume": 0, "OrderID": "x%d" % k, "OrderTypeMsg": "限价", "OperationMsg": "买入", "OrderTime": "093000", "OrderStatusMsg": "已报", "Text": ""}}})))
+        elif kind == "qbasket":
+            req = {"method": "basket", "params": {"action": "QryBasketOrder"}}
+            rspd = {"result": [{"CreateDate": "20250415", "CreateTime": "0930%02d" % rnd.randint(0, 59), "InstanceID": "i1", "ClientOrderType": "T1", "OrderQty": 1, "DealVolume": 0, "CancelOrderQty": 0, "OperationMsg": "", "Text": ""}]}
+        elif kind == "algo_q":
+            req = {"method": "new_instmanage", "params": {"action": "query"}}
+            rspd = {"result": {"instructions": [{"instructionid": "a1", "fund_token": "ctA", "instructiontype": 2, "instructionparam": {"algorithmtype": "twap"},
+                                                 "security": "600000", "side": "B", "qty": 100, "qtyleft": 50, "qtytrade": 50, "qtycancel": 0, "statusmsg": "运行"}]}}
+        elif kind == "algo_new":
+            inst = "alg%d" % n
+            req = {"method": "new_instmanage", "params": {"action": "new", "fund_token": tok, "instructiontype": 2, "security": "600000", "side": "B", "qty": 100,
+                                                          "price": 10.0, "pricetype": 0, "pricelimit": 0, "initflag": 0, "expirerevokeflag": 1, "specialdeal": 0,
+                                                          "instructionparam": {"algorithmtype": "twap", "tradeerrop": 0, "tradeexpireoperation": 1,
+                                                                               "algorithm": {"starttime": 1744678800, "endtime": 1744682400, "slicetime": 30, "timelimit": 1}}}}
+            rspd = {"result": {"instructionid": inst}}
+            pts = ts + timedelta(milliseconds=3)
+            lines.append((fmt(pts), _line(fmt(pts), "response", "", "&recv=", {"method": "twap_instruction", "params": {"action": "twap_instruction", "instructionid": inst, "avgpx": 0, "qty": 100, "qtyleft": 100, "qtycancel": 0, "qtytrade": 0, "statusmsg": "运行", "msg": ""}})))
+        elif kind == "cond_create":
+            req = {"method": "rpc.gradecondition", "params": {"action": "create_gradecondition", "fund_token": tok, "basket_name": "b", "order_from": "x", "side": "B",
+                                                              "max_trigger_stock": 2, "start_monitor_time": "0930", "end_monitor_time": "1500", "distribute_type": 0,
+                                                              "instruction_param": [{"fund_token": tok, "symbol": "600000", "condition": "c1", "qty": 100}]}}
+            ono = "cond%d" % n
+            rspd = {"result": {"order_no": ono}}
+            pts = ts + timedelta(milliseconds=4)
+            lines.append((fmt(pts), _line(fmt(pts), "response", "", "&recv=", {"method": "grade_instruction", "params": {"order_no": ono, "grade_status": 1, "status_msg": "监控中"}})))
+            lines.append((fmt(pts), _line(fmt(pts), "response", "", "&recv=", {"method": "grade_condition", "params": {"order_no": ono, "symbol": "600000", "side": "B", "condition": "c1"}})))
+            lines.append((fmt(pts), _line(fmt(pts), "response", "", "&recv=", {"method": "grade_order", "params": {"order_no": ono, "data": {"SecurityID": "600000", "OrderID": "g1", "Text": "ok"}}})))
+        elif kind == "ipo":
+            req = {"method": "stockths", "params": {"FunID": 503002, "UserToken": tok}}
+            rspd = {"result": {"Array": [{"MarketName": "沪A", "Market": 1, "AvailableStockBalance": 5000}]}}
+        else:
+            req = {"method": "stockrzrq", "params": {"FunID": 501005, "fund_token": tok}}
+            rspd = {"result": {"Array": [{"SecurityID": "000001"}]}} if rnd.random() < 0.8 else {"error": {"code": 1, "message": "失败"}}
+        if rnd.random() < 0.01:
+            # 只有请求没有响应
+            lines.append((fmt(ts), _line(fmt(ts), "request", rid, "&send=", req)))
+            continue
+        _pair(lines, fmt(ts), fmt(rsp), rid, req, rspd)
+        r = rnd.random()
+        if r < 0.01:
+            lines.append((fmt(ts), "0x1f2e|%s|request|INFO|bad%d|url&send={\"broken\": " % (fmt(ts), n)))
+        elif r < 0.02:
+            lines.append((fmt(ts), "0x1f2e|%s|timeout|WARN|%s|超时" % (fmt(ts), rid)))
+        elif r < 0.03:
+            lines.append((fmt(ts), "new_transmit_ resend %s" % rid))
+        elif r < 0.04:
+            lines.append((fmt(ts), "plain text line without separators %d" % n))
+        elif r < 0.05:
+            lines.append((fmt(ts), "0x1f2e|%s|response|INFO||url&recv={\"method\": \"some_push\", \"params\": {\"x\": %d}}" % (fmt(ts), n)))
+        elif r < 0.06:
+            lines.append((fmt(ts), "0x1f2e|%s|request|INFO||url&send={\"method\": \"log\"}" % fmt(ts)))
+    lines.sort(key=lambda x: x[0])
+    return [l for _, l in lines]
+
+
+def write_log(path, n_pairs=2000, seed=7, start="20250415 09:00:00.000", market_weight=3, market_rows=1):
+    """
+    写入合成日志文件（gb2312编码，CRLF换行）
+    """
+    with open(path, "wb") as f:
+        for line in generate_lines(n_pairs, seed, start, market_weight, market_rows):
+            f.write(line.encode("gb2312", errors="ignore") + b"\r\n")
+    return path